@@ -1,22 +1,49 @@
 # -*- coding: utf-8 -*-
+import argparse
 import logging
 from server.thread_manager import ThreadManager
-from navigation.navigation import navigation
-from utils.config import shared_lock
+from utils.config import SERVER_CONFIG, SHARED, TRACKING_CONFIG
+from utils.log_setup import setup_logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--server", choices=["flask", "async"], default=SERVER_CONFIG['control_server'],
+                        help="제어 엔드포인트(/info, /get_move)를 서비스할 서버")
+    parser.add_argument("--tracking", choices=["manual", "pure_pursuit", "stanley"], default=TRACKING_CONFIG['mode'],
+                        help="조향 목표 결정 방식 (manual은 Dash 슬라이더 사용)")
+    parser.add_argument("--headless", action="store_true", default=SERVER_CONFIG['headless'],
+                        help="Dash 대시보드 없이 제어 엔드포인트만 띄운다 (빠른 시작/재시작용)")
+    parser.add_argument("--dash", choices=["thread", "process"], default=SERVER_CONFIG['dash_mode'],
+                        help="대시보드 실행 방식 (process는 별도 프로세스 + 공유 메모리로 제어 지연에 영향 없음)")
+    parser.add_argument("--port", type=int, default=None,
+                        help="제어 서버 포트 (기본값 SERVER_CONFIG['flask_port'])")
+    parser.add_argument("--autotune", action="store_true",
+                        help="시작 전에 오프라인 게인 탐색으로 속도/조향 PID 게인을 정한다")
+    return parser.parse_args()
+
 def main():
+    args = parse_args()
+    setup_logging()
     logger.info("Starting application")
     # SHARED 초기화 (필요 시 추가)
     logger.info("SHARED data has been reset")
     
-    thread_manager = ThreadManager(shared_lock)
-    navigation.start()
-    thread_manager.start_flask()
-    thread_manager.start_dash()
+    SHARED['tracking_mode'] = args.tracking
+    if args.autotune:
+        from controller.pid_tuner import autotune
+        for kind in ("speed", "steer"):
+            autotune(SHARED, kind)
+    # 대시 프로세스(spawn)가 app을 다시 import할 때 차량/Navigation을 만들지 않도록 여기서 import한다
+    from navigation.vehicle_registry import registry
+    thread_manager = ThreadManager()
+    registry.start()
+    thread_manager.start_control(args.server, args.port)
+    if not args.headless:
+        thread_manager.start_dash(args.dash)
     thread_manager.join()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,47 +1,130 @@
+# -*- coding: utf-8 -*-
 import logging
+import numpy as np
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+INF = float('inf')
+
+# 여러 PID 채널의 게인/적분/이전 오차를 NumPy 배열로 보관하고 한 번에 계산한다.
+# wrap 채널은 오차를 [-180, 180) 도로 감싼다 (각도 제어).
+# 적분은 ±integral_limit로 잘리고, 출력이 포화된 방향으로는 더 적분하지 않는다 (anti-windup).
+# 미분은 1차 저역 통과 필터를 거친다 (derivative_alpha=1이면 필터 없음).
+class PIDBank:
+    def __init__(self, n, kp=0.0, ki=0.0, kd=0.0, wrap=False, integral_limit=INF, output_limit=INF,
+                 derivative_alpha=1.0):
+        self.n = n
+        self.kp = np.full(n, kp, dtype=np.float64)
+        self.ki = np.full(n, ki, dtype=np.float64)
+        self.kd = np.full(n, kd, dtype=np.float64)
+        self.wrap = np.broadcast_to(np.asarray(wrap, dtype=bool), (n,)).copy()
+        self.integral_limit = np.full(n, integral_limit, dtype=np.float64)
+        self.output_limit = np.full(n, output_limit, dtype=np.float64)
+        self.derivative_alpha = np.full(n, derivative_alpha, dtype=np.float64)
+        self.integral = np.zeros(n, dtype=np.float64)
+        self.previous_error = np.zeros(n, dtype=np.float64)
+        self.derivative = np.zeros(n, dtype=np.float64)
+
+    # {"이름": {"channel": i, "integral_limit": ..., ...}} 형식의 설정으로 bank 생성
+    @classmethod
+    def from_config(cls, config):
+        bank = cls(max(cfg['channel'] for cfg in config.values()) + 1)
+        for cfg in config.values():
+            bank.set_limits(cfg['channel'], cfg.get('integral_limit'), cfg.get('output_limit'),
+                            cfg.get('derivative_alpha'))
+        return bank
+
+    def set_gains(self, idx, kp, ki, kd):
+        self.kp[idx] = kp
+        self.ki[idx] = ki
+        self.kd[idx] = kd
+
+    def set_limits(self, idx, integral_limit=None, output_limit=None, derivative_alpha=None):
+        if integral_limit is not None:
+            self.integral_limit[idx] = integral_limit
+        if output_limit is not None:
+            self.output_limit[idx] = output_limit
+        if derivative_alpha is not None:
+            self.derivative_alpha[idx] = derivative_alpha
+
+    def reset(self, idx=slice(None)):
+        self.integral[idx] = 0.0
+        self.previous_error[idx] = 0.0
+        self.derivative[idx] = 0.0
+
+    # idx 채널들을 한 번에 계산 (setpoint, measured, dt는 스칼라 또는 채널 수 길이의 배열)
+    def step(self, setpoint, measured, dt, idx=slice(None)):
+        error = np.asarray(setpoint, dtype=np.float64) - np.asarray(measured, dtype=np.float64)
+        error = np.where(self.wrap[idx], np.mod(error + 180.0, 360.0) - 180.0, error)
+        dt = np.asarray(dt, dtype=np.float64)
+        ilim = self.integral_limit[idx]
+        integral = np.clip(self.integral[idx] + error * dt, -ilim, ilim)
+        raw_derivative = np.divide(error - self.previous_error[idx], dt,
+                                   out=np.zeros_like(error * dt), where=dt > 0)
+        alpha = self.derivative_alpha[idx]
+        derivative = alpha * raw_derivative + (1.0 - alpha) * self.derivative[idx]
+        kp, ki, kd = self.kp[idx], self.ki[idx], self.kd[idx]
+        output = kp * error + ki * integral + kd * derivative
+
+        olim = self.output_limit[idx]
+        clamped = np.clip(output, -olim, olim)
+        windup = (clamped != output) & (np.sign(error) == np.sign(output))
+        if np.any(windup):
+            integral = np.where(windup, self.integral[idx], integral)
+            clamped = np.clip(kp * error + ki * integral + kd * derivative, -olim, olim)
+
+        self.integral[idx] = integral
+        self.previous_error[idx] = error
+        self.derivative[idx] = derivative
+        return clamped
+
+    # 채널 하나만 계산 (step과 같은 식, 반환값은 float)
+    def step_channel(self, i, setpoint, measured, dt):
+        return float(self.step(setpoint, measured, dt, idx=i))
+
+# PIDBank의 한 채널을 기존 PIDController 인터페이스로 감싼다 (bank가 없으면 1채널 bank를 만든다)
 class PIDController:
-    def __init__(self, kp=0.07, ki=0.0, kd=0.0, dt=1.0):
-        self.kp = kp
-        self.ki = ki
-        self.kd = kd
+    wrap = False
+
+    def __init__(self, kp=0.07, ki=0.0, kd=0.0, dt=1.0, bank=None, channel=0):
+        if bank is None:
+            bank, channel = PIDBank(1), 0
+        self.bank = bank
+        self.channel = channel
         self.dt = dt
-        self.integral = 0.0
-        self.previous_error = 0.0
+        bank.wrap[channel] = self.wrap
+        bank.set_gains(channel, kp, ki, kd)
+
+    @property
+    def kp(self):
+        return float(self.bank.kp[self.channel])
+
+    @property
+    def ki(self):
+        return float(self.bank.ki[self.channel])
+
+    @property
+    def kd(self):
+        return float(self.bank.kd[self.channel])
+
+    @property
+    def integral(self):
+        return float(self.bank.integral[self.channel])
+
+    @property
+    def previous_error(self):
+        return float(self.bank.previous_error[self.channel])
 
     def update_gains(self, kp, ki, kd, dt):
-        self.kp = kp
-        self.ki = ki
-        self.kd = kd
+        self.bank.set_gains(self.channel, kp, ki, kd)
         self.dt = dt
 
     def compute(self, setpoint, measured_value):
-        try:
-            error = setpoint - measured_value
-            self.integral += error * self.dt
-            derivative = (error - self.previous_error) / self.dt if self.dt > 0 else 0.0
-            output = self.kp * error + self.ki * self.integral + self.kd * derivative
-            self.previous_error = error
-            logger.debug(f"PID compute: error={error}, integral={self.integral}, derivative={derivative}, output={output}")
-            return output
-        except Exception as e:
-            logger.error(f"Error in PID compute: {str(e)}")
-            return 0.0
+        return self.bank.step_channel(self.channel, setpoint, measured_value, self.dt)
+
+    def reset(self):
+        self.bank.reset(self.channel)
 
 class PIDDegController(PIDController):
-    def compute(self, setpoint, measured_value):
-        try:
-            error = setpoint - measured_value
-            error = ((error + 180) % 360) - 180
-            self.integral += error * self.dt
-            derivative = (error - self.previous_error) / self.dt if self.dt > 0 else 0.0
-            output = self.kp * error + self.ki * self.integral + self.kd * derivative
-            self.previous_error = error
-            logger.debug(f"PIDDeg compute: error={error}, integral={self.integral}, derivative={derivative}, output={output}")
-            return output
-        except Exception as e:
-            logger.error(f"Error in PIDDeg compute: {str(e)}")
-            return 0.0
\ No newline at end of file
+    wrap = True
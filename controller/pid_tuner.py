@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+# 오프라인 PID 게인 탐색 / 자동 튜닝
+# SpeedPlan/SteeringPlan과 같은 플랜트 모델을 PIDBank로 수천 개 게인 조합에 대해 한 번에 시뮬레이션하고,
+# 계단 응답(오버슈트, 정착 시간)과 경로 응답(추종 오차)으로 점수를 매긴다.
+#
+# 사용법:
+#   python -m controller.pid_tuner --kind speed --workers 8
+#   python -m controller.pid_tuner --kind steer --output data/steer_pid.json
+import argparse
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from controller.pid_controller import PIDBank
+from utils.config import PID_BANK_CONFIG, TUNER_CONFIG
+
+logger = logging.getLogger(__name__)
+
+METRICS = ("overshoot", "settling_time", "tracking_error")
+SHARED_KEYS = {"speed": "vel_pid", "steer": "steer_pid"}
+
+def gain_grid(kp_values, ki_values, kd_values):
+    kp, ki, kd = np.meshgrid(kp_values, ki_values, kd_values, indexing='ij')
+    return np.column_stack([kp.ravel(), ki.ravel(), kd.ravel()])
+
+def default_grid(kind):
+    ranges = TUNER_CONFIG[kind]
+    return gain_grid(*(np.linspace(*ranges[name]) for name in ('kp', 'ki', 'kd')))
+
+# 경로 응답 목표값 (속도: 구간별 목표 속도, 조향: 지도 heading을 일정 속도로 따라갈 때의 값)
+def route_targets(kind, steps, map_data=None):
+    if kind == "speed":
+        profile = np.array(TUNER_CONFIG['speed']['route'], dtype=np.float64)
+        return profile[np.minimum(np.arange(steps) * len(profile) // steps, len(profile) - 1)]
+    if map_data is None or len(map_data) < 2:
+        return np.zeros(steps)
+    from utils.map_loader import MAP_COLUMNS
+    heading = np.asarray(map_data[:, MAP_COLUMNS['heading']], dtype=np.float64)
+    idx = np.linspace(0, len(heading) - 1, steps).astype(np.int64)
+    return heading[idx]
+
+# N개 게인 조합의 응답을 한 번에 계산 (targets: 시간 순서의 목표값, 반환: steps x N)
+def simulate(kind, gains, targets, dt, initial=0.0):
+    gains = np.asarray(gains, dtype=np.float64)
+    n = len(gains)
+    cfg = PID_BANK_CONFIG[kind]
+    bank = PIDBank(n, wrap=(kind == "steer"), integral_limit=cfg['integral_limit'],
+                   output_limit=cfg['output_limit'], derivative_alpha=cfg['derivative_alpha'])
+    bank.set_gains(slice(None), gains[:, 0], gains[:, 1], gains[:, 2])
+    current = np.full(n, initial, dtype=np.float64)
+    response = np.empty((len(targets), n), dtype=np.float64)
+    for t, target in enumerate(targets):
+        output = bank.step(target, current, dt)
+        if kind == "speed":
+            # SpeedPlan과 같은 플랜트: km/h 출력만큼 속도 변경, ±60 km/h 제한
+            current = np.clip(current + output, -60.0, 60.0)
+        else:
+            current = np.mod(current + output + 180.0, 360.0) - 180.0
+        response[t] = current
+    return response
+
+def _tracking_error(kind, targets, response):
+    error = targets[:, None] - response
+    if kind == "steer":
+        error = np.mod(error + 180.0, 360.0) - 180.0
+    return error
+
+# 계단 응답 + 경로 응답 점수 (N x 3: overshoot[%], settling_time[s], tracking_error[평균 절대 오차])
+def evaluate(kind, gains, dt, step_steps, route):
+    cfg = TUNER_CONFIG[kind]
+    step_size = cfg['step']
+    step_targets = np.full(step_steps, step_size, dtype=np.float64)
+    step_error = _tracking_error(kind, step_targets, simulate(kind, gains, step_targets, dt))
+    overshoot = np.maximum(0.0, (-step_error * np.sign(step_size)).max(axis=0)) / abs(step_size) * 100.0 + 0.0
+    outside = np.abs(step_error) > TUNER_CONFIG['settle_band'] * abs(step_size)
+    # 마지막으로 허용 구간을 벗어난 시점 다음이 정착 시각 (끝까지 벗어나 있으면 시뮬레이션 길이)
+    last_outside = np.where(outside.any(axis=0), step_steps - 1 - np.argmax(outside[::-1], axis=0), -1)
+    settling_time = (last_outside + 1) * dt
+    route_error = np.abs(_tracking_error(kind, route, simulate(kind, gains, route, dt))).mean(axis=0)
+    metrics = np.column_stack([overshoot, settling_time, route_error])
+    return np.where(np.isfinite(metrics), metrics, np.inf)
+
+def _evaluate_chunk(args):
+    return evaluate(*args)
+
+# 게인 조합을 chunk_size 단위로 나눠 프로세스 풀에서 병렬 평가 (workers=1이면 현재 프로세스에서)
+def sweep(kind, gains, dt=None, duration=None, map_data=None, workers=None,
+          chunk_size=TUNER_CONFIG['chunk_size']):
+    dt = dt if dt is not None else TUNER_CONFIG['dt']
+    duration = duration if duration is not None else TUNER_CONFIG['duration']
+    steps = max(1, int(round(duration / dt)))
+    route = route_targets(kind, steps, map_data)
+    gains = np.asarray(gains, dtype=np.float64)
+    chunks = [(kind, gains[i:i + chunk_size], dt, steps, route) for i in range(0, len(gains), chunk_size)]
+    workers = workers if workers is not None else TUNER_CONFIG['workers'] or os.cpu_count() or 1
+    if workers <= 1 or len(chunks) <= 1:
+        results = [_evaluate_chunk(chunk) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as pool:
+            results = list(pool.map(_evaluate_chunk, chunks))
+    return np.concatenate(results) if results else np.empty((0, len(METRICS)))
+
+# 어떤 지표에서도 더 나쁘지 않고 하나 이상에서 더 좋은 조합이 없는 후보들의 인덱스
+def pareto_front(metrics):
+    metrics = np.asarray(metrics, dtype=np.float64)
+    order = np.lexsort(metrics.T[::-1])
+    front = []
+    for i in order:
+        if not np.isfinite(metrics[i]).all():
+            continue
+        if front:
+            kept = metrics[front]
+            if np.any(np.all(kept <= metrics[i], axis=1) & np.any(kept < metrics[i], axis=1)):
+                continue
+        front.append(i)
+    return np.array(front, dtype=np.int64)
+
+# 지표별로 정규화한 가중합이 가장 작은 후보 (weights 기본값은 TUNER_CONFIG)
+def best_index(metrics, candidates=None, weights=None):
+    metrics = np.asarray(metrics, dtype=np.float64)
+    candidates = pareto_front(metrics) if candidates is None else np.asarray(candidates)
+    if len(candidates) == 0:
+        return None
+    weights = np.array([(weights or TUNER_CONFIG['weights'])[name] for name in METRICS])
+    subset = metrics[candidates]
+    low, high = subset.min(axis=0), subset.max(axis=0)
+    normalized = (subset - low) / np.where(high > low, high - low, 1.0)
+    return int(candidates[np.argmin(normalized @ weights)])
+
+def to_gains(row):
+    return {"kp": float(row[0]), "ki": float(row[1]), "kd": float(row[2])}
+
+def publish_gains(shared, kind, gains):
+    with shared.section('tuning') as state:
+        state[SHARED_KEYS[kind]] = dict(gains)
+    logger.info("PID tuner - published %s gains: %s", kind, gains)
+
+# 탐색 후 최적 게인을 shared에 반영하고 (게인, 지표, 파레토 전선) 결과를 돌려준다
+def autotune(shared, kind, gains=None, workers=None, publish=True):
+    gains = default_grid(kind) if gains is None else np.asarray(gains, dtype=np.float64)
+    started = time.perf_counter()
+    metrics = sweep(kind, gains, map_data=shared.get('map_data', None), workers=workers)
+    front = pareto_front(metrics)
+    best = best_index(metrics, front)
+    logger.info("PID tuner - %s: %d candidates, %d on Pareto front, %.2fs",
+                kind, len(gains), len(front), time.perf_counter() - started)
+    if best is None:
+        logger.warning("PID tuner - %s: no stable candidate found", kind)
+        return None
+    result = {
+        "kind": kind,
+        "best": dict(to_gains(gains[best]), **dict(zip(METRICS, map(float, metrics[best])))),
+        "pareto": [dict(to_gains(gains[i]), **dict(zip(METRICS, map(float, metrics[i])))) for i in front]
+    }
+    if publish:
+        publish_gains(shared, kind, to_gains(gains[best]))
+    return result
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--kind", choices=["speed", "steer"], default="speed")
+    parser.add_argument("--workers", type=int, default=None, help="프로세스 수 (기본: CPU 수)")
+    parser.add_argument("--output", default=None, help="결과(최적 게인 + 파레토 전선)를 저장할 JSON 경로")
+    parser.add_argument("--top", type=int, default=10, help="출력할 파레토 후보 수")
+    args = parser.parse_args()
+
+    from utils.config import SHARED
+    result = autotune(SHARED, args.kind, workers=args.workers, publish=False)
+    if result is None:
+        return
+    print(f"best {args.kind}: {result['best']}")
+    for row in sorted(result['pareto'], key=lambda r: r['tracking_error'])[:args.top]:
+        print("  " + "  ".join(f"{k}={v:.4g}" for k, v in row.items()))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -1,24 +1,39 @@
 # -*- coding: utf-8 -*-
 import numpy as np
 import logging
+from navigation.map_index import shared_index
+from navigation.position_handler import control_position
 
 logger = logging.getLogger(__name__)
 
 class LocalizationEvaluator:
-    def __init__(self, shared, shared_lock):
+    def __init__(self, shared):
         self.shared = shared
-        self.shared_lock = shared_lock
+        self.map_index = None
+        self._update_index(self.shared.get('map_points', None))
+
+    def _update_index(self, map_points):
+        # 지도는 로드 시 한 번만 인덱싱하고, 지도가 바뀐 경우에만 다시 만든다
+        if map_points is None or len(map_points) == 0:
+            self.map_index = None
+        elif self.map_index is None or self.map_index.source is not map_points:
+            self.map_index = shared_index(map_points, self.shared.get('map_distance', None))
 
     def evaluate(self):
-        with self.shared_lock:
-            player_pos = self.shared.get('playerPos', {'x': 0, 'z': 0, 'y': 0})
-            map_points = self.shared.get('map_points', np.array([]))
-            if map_points.size > 0:
-                distances = np.linalg.norm(map_points[:, :2] - np.array([player_pos['x'], player_pos['z']]), axis=1)
-                min_distance = np.min(distances)
-                nearest_idx = np.argmin(distances)
-                self.shared['error_distance'] = min_distance
-                self.shared['nearest_point'] = map_points[nearest_idx, :2]
+        with self.shared.section('control') as state:
+            player_pos = control_position(state)
+            map_points = state.get('map_points', None)
+            self._update_index(map_points)
+            if self.map_index is not None:
+                x, z = player_pos['x'], player_pos['z']
+                nearest_idx, min_distance = self.map_index.nearest(x, z)
+                state['error_distance'] = min_distance
+                state['nearest_point'] = map_points[nearest_idx, :2]
+                state['nearest_idx'] = nearest_idx
+                state['cross_track_error'] = self.map_index.cross_track(x, z, nearest_idx)
+                state['map_progress'] = float(self.map_index.arc_length[nearest_idx])
             else:
-                self.shared['error_distance'] = 0.0
-                self.shared['nearest_point'] = None
\ No newline at end of file
+                state['error_distance'] = 0.0
+                state['nearest_point'] = None
+                state['nearest_idx'] = None
+                state['cross_track_error'] = 0.0
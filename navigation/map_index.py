@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+import copy
+import logging
+import threading
+import numpy as np
+from utils.config import MAP_INDEX_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# 지도 점들에 대한 균일 그리드 해시 + 직전 매칭점 기준 구간 탐색
+class MapIndex:
+    def __init__(self, map_points, arc_length=None, cell_size=MAP_INDEX_CONFIG['cell_size'],
+                 max_ring=MAP_INDEX_CONFIG['max_ring'], window_behind=MAP_INDEX_CONFIG['window_behind'],
+                 window_ahead=MAP_INDEX_CONFIG['window_ahead'], lost_distance=MAP_INDEX_CONFIG['lost_distance']):
+        self.source = map_points
+        self.points = np.asarray(map_points, dtype=np.float64)[:, :2]
+        if arc_length is None:
+            seg = np.linalg.norm(np.diff(self.points, axis=0), axis=1)
+            arc_length = np.concatenate(([0.0], np.cumsum(seg)))
+        self.arc_length = np.asarray(arc_length, dtype=np.float64)
+        self.cell_size = float(cell_size)
+        self.max_ring = max_ring
+        self.window_behind = window_behind
+        self.window_ahead = window_ahead
+        self.lost_distance = lost_distance
+        self.last_idx = None
+        self._build_grid()
+
+    def _build_grid(self):
+        self.origin = self.points.min(axis=0)
+        cells = np.floor((self.points - self.origin) / self.cell_size).astype(np.int64)
+        order = np.lexsort((cells[:, 1], cells[:, 0]))
+        sorted_cells = cells[order]
+        change = np.any(np.diff(sorted_cells, axis=0) != 0, axis=1)
+        starts = np.concatenate(([0], np.nonzero(change)[0] + 1))
+        ends = np.concatenate((starts[1:], [len(order)]))
+        self.cells = {
+            (int(sorted_cells[s, 0]), int(sorted_cells[s, 1])): order[s:e]
+            for s, e in zip(starts, ends)
+        }
+
+    def _search(self, idx, x, z):
+        d = self.points[idx] - (x, z)
+        dist = np.hypot(d[:, 0], d[:, 1])
+        k = int(np.argmin(dist))
+        return int(idx[k]), float(dist[k])
+
+    def _window_nearest(self, x, z):
+        s = self.arc_length[self.last_idx]
+        lo = int(np.searchsorted(self.arc_length, s - self.window_behind, side='left'))
+        hi = int(np.searchsorted(self.arc_length, s + self.window_ahead, side='right'))
+        return self._search(np.arange(lo, max(hi, lo + 1)), x, z)
+
+    def _grid_nearest(self, x, z):
+        cx, cz = np.floor((np.array((x, z)) - self.origin) / self.cell_size).astype(np.int64)
+        best_idx, best_dist = -1, np.inf
+        for ring in range(self.max_ring + 1):
+            # ring 칸의 점들은 최소 (ring - 1) * cell_size 이상 떨어져 있다
+            if best_idx >= 0 and best_dist <= (ring - 1) * self.cell_size:
+                break
+            found = []
+            for i in range(cx - ring, cx + ring + 1):
+                for j in range(cz - ring, cz + ring + 1):
+                    if max(abs(i - cx), abs(j - cz)) != ring:
+                        continue
+                    bucket = self.cells.get((int(i), int(j)))
+                    if bucket is not None:
+                        found.append(bucket)
+            if found:
+                idx, dist = self._search(np.concatenate(found), x, z)
+                if dist < best_dist:
+                    best_idx, best_dist = idx, dist
+        if best_idx >= 0 and best_dist <= self.max_ring * self.cell_size:
+            return best_idx, best_dist
+        return None
+
+    def nearest(self, x, z):
+        if self.last_idx is not None:
+            idx, dist = self._window_nearest(x, z)
+            if dist <= self.lost_distance:
+                self.last_idx = idx
+                return idx, dist
+            logger.debug("MapIndex - lost track at %s (%.2f m), re-searching", self.last_idx, dist)
+        result = self._grid_nearest(x, z)
+        if result is None:
+            result = self._search(np.arange(len(self.points)), x, z)
+        self.last_idx = result[0]
+        return result
+
+    def cross_track(self, x, z, idx):
+        # 진행 방향 기준 오른쪽이 양수
+        i = min(idx, len(self.points) - 2)
+        if i < 0:
+            return 0.0
+        a = self.points[i]
+        t = self.points[i + 1] - a
+        norm = np.hypot(t[0], t[1])
+        if norm == 0:
+            return 0.0
+        return float(((x - a[0]) * t[1] - (z - a[1]) * t[0]) / norm)
+
+    def reset(self):
+        self.last_idx = None
+
+    # 그리드/좌표 배열은 읽기 전용으로 공유하고 탐색 상태(last_idx)만 따로 갖는 사본
+    def fork(self):
+        forked = copy.copy(self)
+        forked.last_idx = None
+        return forked
+
+_shared_lock = threading.Lock()
+_shared_base = None
+
+# 같은 지도를 쓰는 차량들은 그리드를 한 번만 만들고 fork()한 인덱스를 받는다
+def shared_index(map_points, arc_length=None):
+    global _shared_base
+    with _shared_lock:
+        if _shared_base is None or _shared_base.source is not map_points:
+            _shared_base = MapIndex(map_points, arc_length)
+        return _shared_base.fork()
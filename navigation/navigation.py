@@ -1,93 +1,268 @@
 # -*- coding: utf-8 -*-
 import threading
+import time
 import logging
 import numpy as np
+from controller.pid_controller import PIDBank
 from navigation.rddf import Rddf
 from navigation.speed_plan import SpeedPlan
-from navigation.steering_plan import SteeringPlan
-from navigation.position_handler import PositionHandler
+from navigation.steering_plan import SteeringPlan, target_yaw
+from navigation.position_handler import PositionHandler, control_position
 from navigation.localization_evaluator import LocalizationEvaluator
-from utils.config import SHARED, shared_lock
+from navigation.obstacle_map import ObstacleMap, parse_obstacle
+from navigation.path_planner import GridPlanner
+from navigation.path_tracker import PathTracker
+from navigation.scheduler import RateScheduler
+from utils.config import GRAPH_CONFIG, OBSTACLE_CONFIG, PID_BANK_CONFIG, SCHEDULER_CONFIG, SHARED, VEHICLE_CONFIG
+from utils.event_bus import BUS
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class PathPlanning:
+    def __init__(self, shared):
+        self.shared = shared
+        self.planner = None
+
+    def _get_planner(self, map_points):
+        if map_points is None or len(map_points) < 2:
+            return None
+        if self.planner is None or self.planner.map_points is not map_points:
+            self.planner = GridPlanner(map_points)
+        return self.planner
+
     def calculate_path(self):
-        with shared_lock:
-            current_pos = SHARED.get('playerPos', {'x': 0, 'z': 0, 'y': 0})
+        with self.shared.section('planning') as state:
+            current_pos = state.get('playerPos', {'x': 0, 'z': 0, 'y': 0})
             start = (current_pos['x'], current_pos['z'])
-            destination = SHARED.get('destination', None)
+            destination = state.get('destination', None)
 
             if not destination:
                 logger.warning("No destination set, using temporary destination (100, 100, 0)")
-                SHARED['destination'] = (100, 100, 0)
-                destination = SHARED['destination']
+                state['destination'] = (100, 100, 0)
+                destination = state['destination']
 
             dest_x, dest_y, dest_z = destination
             end = (dest_x, dest_z)
-            SHARED['path'] = [start, end]
-            logger.info(f"Calculated path: {SHARED['path']}")
+
+            # 시작 칸, 목적지, 장애물 버전이 같으면 캐시된 경로를 그대로 쓴다
+            path = None
+            planner = self._get_planner(state.get('map_points', None))
+            if planner is not None:
+                planner.set_obstacles(state.get('obstacles', []), state.get('obstacles_version', 0))
+                path = planner.plan(start, end)
+            if path is None:
+                logger.debug("Grid planner found no path, using straight line")
+                path = [start, end]
+
+            # 바뀐 경우에만 발행해 스냅샷 버전이 불필요하게 오르지 않게 한다
+            if path != state.get('path'):
+                state['path'] = path
+                logger.debug("Calculated path: %d points", len(path))
 
 class Navigation:
-    def __init__(self):
-        self.path_planning = PathPlanning()
-        self.rddf = Rddf()
-        self.speed_plan = SpeedPlan(SHARED, shared_lock)
-        self.steering_plan = SteeringPlan(SHARED, shared_lock)
-        self.position_handler = PositionHandler(SHARED, shared_lock)
-        self.localization_evaluator = LocalizationEvaluator(SHARED, shared_lock)
+    def __init__(self, shared=SHARED, rddf_writer=None, vehicle_id=VEHICLE_CONFIG['default_id'], bus=BUS):
+        self.shared = shared
+        self.vehicle_id = vehicle_id
+        self.bus = bus
+        self._published_pid = (None, None)
+        self.path_planning = PathPlanning(shared)
+        self.rddf = Rddf(shared, rddf_writer)
+        self.pid_bank = PIDBank.from_config(PID_BANK_CONFIG)
+        self.speed_plan = SpeedPlan(shared, self.pid_bank, PID_BANK_CONFIG['speed']['channel'])
+        self.steering_plan = SteeringPlan(shared, self.pid_bank, PID_BANK_CONFIG['steer']['channel'])
+        self.position_handler = PositionHandler(shared)
+        self.localization_evaluator = LocalizationEvaluator(shared)
+        self.path_tracker = PathTracker(shared)
+        self.obstacle_map = ObstacleMap()
+        self.scheduler = self._build_scheduler()
         self.running = False
+        self._last_move_time = None
+        # 마지막으로 예측 궤적에서 장애물을 본 시각 (정지 해제 히스테리시스용)
+        self._obstacle_seen_at = None
+
+    # 계획/위치 추정/제어를 각자의 주기로 실행 (dt는 실제 경과 시간)
+    def _build_scheduler(self, clock=time.monotonic, sleep=None):
+        scheduler = RateScheduler(clock=clock, sleep=sleep, max_catch_up=SCHEDULER_CONFIG['max_catch_up'])
+        policy = SCHEDULER_CONFIG['overrun_policy']
+        scheduler.add_task("planning", SCHEDULER_CONFIG['planning_hz'],
+                           lambda dt: self.path_planning.calculate_path(), policy)
+        scheduler.add_task("localization", SCHEDULER_CONFIG['localization_hz'],
+                           lambda dt: self.localize(), policy)
+        scheduler.add_task("control", SCHEDULER_CONFIG['control_hz'],
+                           lambda dt: self.control_step(dt), policy)
+        scheduler.add_task("trajectory_lod", SCHEDULER_CONFIG['lod_hz'],
+                           lambda dt: self.rddf.update_lod(), policy)
+        return scheduler
 
     def start(self):
         self.running = True
         threading.Thread(target=self.run, daemon=True).start()
 
     def run(self):
-        while self.running:
-            with shared_lock:
-                self.path_planning.calculate_path()
-                self.localization_evaluator.evaluate()
-            threading.Event().wait(0.1)
-
-    def get_move(self, dt=0.1):
-        with shared_lock:
-            # 위치 및 오차 업데이트
+        self.scheduler.run()
+        self.running = False
+
+    def update_info(self, data):
+        with self.shared.section('telemetry') as state:
+            # 변화량은 직전 /info 샘플(pre_playerPos) 기준. 첫 샘플은 이전 위치가 없으므로 변화량 0
+            previous = state['pre_playerPos'] if len(state['vel_data']) else data.get('playerPos', state['pre_playerPos'])
+            state['playerPos'] = data.get('playerPos', previous)
+            state['tank_cur_vel_ms'] = data.get('playerSpeed', 0.0)
+            state['vel_data'].append((state['tank_cur_vel_ms'] * 3.6,))
+            state['del_playerPos'].append((state['playerPos']['x'] - previous['x'], state['playerPos']['z'] - previous['z']))
+            state['tank_cur_yaw_deg'] = data.get('playerBodyX', 0.0)
+            state['pre_playerPos'] = state['playerPos'].copy()
+            last_command = state.get('last_command') or {}
+            self.rddf.save(self.rddf.add_info(data), yaw=data.get('playerBodyX'), command=last_command.get('command'))
+            pose = state['playerPos']
+        self.position_handler.ingest(data)
+        if len(self.bus):
+            self.bus.publish("pose", self.vehicle_id, {
+                "x": pose['x'], "z": pose['z'], "y": pose.get('y', 0),
+                "speed": data.get('playerSpeed', 0.0), "yaw": data.get('playerBodyX', 0.0)
+            })
+
+    # /obstacles 일괄 갱신: {"clear": bool, "remove": [id, ...], "upsert": [{"id", "x", "z", "radius"}, ...]}
+    # 해시는 바뀐 장애물만 고치고, 계획기/그래프용 목록과 obstacles_version은 실제로 바뀐 경우에만 발행한다.
+    def update_obstacles(self, data):
+        if not isinstance(data, dict):
+            raise ValueError("obstacle update must be an object")
+        upserts = [parse_obstacle(entry) for entry in data.get('upsert') or ()]
+        removes = data.get('remove') or ()
+        with self.shared.section('planning') as state:
+            changed = self.obstacle_map.apply(upserts, removes, bool(data.get('clear')))
+            if changed:
+                state['obstacles'] = self.obstacle_map.snapshot()
+                state['obstacles_version'] = state.get('obstacles_version', 0) + 1
+            version = state.get('obstacles_version', 0)
+            obstacles = state.get('obstacles', [])
+        if changed and len(self.bus):
+            self.bus.publish("obstacles", self.vehicle_id, {
+                "version": version, "count": len(obstacles),
+                "obstacles": [list(o) for o in obstacles[:GRAPH_CONFIG['max_obstacles']]]
+            })
+        logger.debug("Obstacles updated: %d changed, %d total", changed, len(self.obstacle_map))
+        return {"changed": changed, "count": len(self.obstacle_map), "version": version}
+
+    # 예측 궤적이 장애물과 겹치면 장애물 id, 아니면 None (장애물이 없으면 검사하지 않는다)
+    def check_obstacles(self, state):
+        if not len(self.obstacle_map):
+            return None
+        pos = control_position(state)
+        yaw = state.get('est_yaw_deg')
+        if yaw is None:
+            yaw = state.get('tank_cur_yaw_deg', 0.0)
+        speed = state.get('est_speed_ms')
+        if speed is None:
+            speed = state.get('tank_cur_vel_ms', 0.0)
+        hit = self.obstacle_map.footprint_collides(pos['x'], pos['z'], yaw, speed,
+                                                   state.get('est_yaw_rate_deg') or 0.0)
+        return hit[1] if hit is not None else None
+
+    def localize(self):
+        with self.shared.section('control'):
             self.position_handler.update_position()
             self.localization_evaluator.evaluate()
 
+    # 제어 한 주기: 결과 명령은 last_command로 발행해 get_move가 바로 돌려줄 수 있게 한다
+    def control_step(self, dt, localize=False):
+        command = self._control_step(dt, localize)
+        if len(self.bus):
+            self._publish_control(command)
+        return command
+
+    # 게인 dict는 제자리에서 수정하지 않고 교체되므로 참조가 바뀌었을 때만 pid 이벤트를 보낸다
+    def _publish_control(self, command):
+        state = self.shared.snapshot()
+        self.bus.publish("command", self.vehicle_id, dict(
+            command,
+            target_speed_kh=state.get('tank_tar_vel_kh', 0.0),
+            target_yaw=target_yaw(state),
+            error_distance=state.get('error_distance', 0.0),
+            cross_track_error=state.get('cross_track_error', 0.0),
+            blocking_obstacle=state.get('blocking_obstacle')
+        ))
+        pid = (state.get('vel_pid'), state.get('steer_pid'))
+        if pid[0] is not self._published_pid[0] or pid[1] is not self._published_pid[1]:
+            self._published_pid = pid
+            self.bus.publish("pid", self.vehicle_id, {"vel_pid": dict(pid[0] or {}), "steer_pid": dict(pid[1] or {})})
+
+    def _control_step(self, dt, localize=False):
+        with self.shared.section('control') as state:
+            if localize:
+                self.localize()
+
+            # 경로 추종 모드에서는 지도 기준으로 목표 yaw를 갱신
+            self.path_tracker.update()
+
             # 속도와 조향 계산
             speed = self.speed_plan.plan(dt)
             yaw = self.steering_plan.plan(dt)
 
             # 목적지 도달 여부 확인
-            destination = SHARED.get('destination', None)
-            error_distance = SHARED.get('error_distance', float('inf'))
-            logger.info(f"Navigation - Error Distance: {error_distance}, Destination: {destination}, Player Pos: {SHARED['playerPos']}")
+            destination = state.get('destination', None)
+            error_distance = state.get('error_distance', float('inf'))
+            logger.info("Navigation - Error Distance: %s, Destination: %s, Player Pos: %s", error_distance, destination, control_position(state))
+            # 운전자가 정한 목표값(tuning 구역)은 그대로 두고, 도달해 있는 동안 매 주기 정지 명령을 낸다
             if destination and error_distance < 0.5:
-                SHARED['tank_tar_vel_kh'] = 0
-                SHARED['tank_cur_vel_ms'] = 0
-                SHARED['tank_tar_yaw_deg'] = 0
-                SHARED['tank_cur_yaw_deg'] = 0
+                state['cmd_speed_ms'] = 0.0
+                state['cmd_yaw_deg'] = 0.0
                 self.speed_plan.reset()
                 self.steering_plan.reset()
                 logger.info("Destination reached, stopping and resetting PID controllers.")
-                return {"command": "STOP", "speed": 0, "yaw": 0}
+                state['last_command'] = {"command": "STOP", "speed": 0, "yaw": 0}
+                return state['last_command']
+
+            # 정지 거리 안의 예측 궤적에 장애물이 있으면 정지.
+            # 한 번 멈추면 장애물이 clear_hold초 동안 계속 안 보일 때까지 정지를 유지한다 (STOP/W 반복 방지)
+            blocking = self.check_obstacles(state)
+            now = self.position_handler.clock()
+            if blocking is not None:
+                self._obstacle_seen_at = now
+            elif (state.get('blocking_obstacle') is not None and
+                  now - self._obstacle_seen_at < OBSTACLE_CONFIG['clear_hold']):
+                blocking = state['blocking_obstacle']
+            if blocking != state.get('blocking_obstacle'):
+                if blocking is not None:
+                    logger.warning("Obstacle %s within %.1f s of travel, stopping", blocking, OBSTACLE_CONFIG['stop_horizon'])
+                else:
+                    logger.info("Obstacle %s cleared, resuming", state['blocking_obstacle'])
+                state['blocking_obstacle'] = blocking
+            if blocking is not None:
+                state['last_command'] = {"command": "STOP", "speed": 0, "yaw": state['cmd_yaw_deg']}
+                return state['last_command']
 
             # 속도에 따라 명령 생성
-            if abs(SHARED['tank_cur_vel_ms']) < 0.1:
+            if abs(state['cmd_speed_ms']) < 0.1:
                 command = "STOP"
             else:
                 command = "W"
 
-            logger.info(f"Navigation - Get Move - Command: {command}, Speed: {SHARED['tank_cur_vel_ms'] * 3.6} km/h, Yaw: {SHARED['tank_cur_yaw_deg']} deg")
-            return {
+            logger.info("Navigation - Get Move - Command: %s, Speed: %s km/h, Yaw: %s deg",
+                        command, state['cmd_speed_ms'] * 3.6, state['cmd_yaw_deg'])
+            state['last_command'] = {
                 "command": command,
-                "speed": SHARED['tank_cur_vel_ms'],
-                "yaw": SHARED['tank_cur_yaw_deg']
+                "speed": state['cmd_speed_ms'],
+                "yaw": state['cmd_yaw_deg']
             }
+            return state['last_command']
+
+    def get_move(self, dt=None):
+        # 스케줄러가 돌고 있으면 제어 작업이 마지막으로 계산한 명령을 돌려준다
+        if self.running:
+            command = self.shared.get('last_command', None)
+            if command is not None:
+                return command
+        now = time.monotonic()
+        if dt is None:
+            dt = now - self._last_move_time if self._last_move_time is not None else 1.0 / SCHEDULER_CONFIG['control_hz']
+        self._last_move_time = now
+        return self.control_step(dt, localize=True)
 
     def shutdown(self):
         self.running = False
+        self.scheduler.stop()
+        self.rddf.close()
 
 navigation = Navigation()
\ No newline at end of file
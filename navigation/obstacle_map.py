@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+import logging
+import math
+import threading
+from utils.config import OBSTACLE_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# 장애물 정보를 해석한다: {"id", "x", "z", "radius"} 또는 [id, x, z, radius]
+def parse_obstacle(entry):
+    if isinstance(entry, dict):
+        oid, x, z, r = entry.get('id'), entry.get('x'), entry.get('z'), entry.get('radius', 0.0)
+    elif isinstance(entry, (list, tuple)) and len(entry) in (3, 4):
+        oid, x, z = entry[:3]
+        r = entry[3] if len(entry) > 3 else 0.0
+    else:
+        raise ValueError(f"invalid obstacle: {entry!r}")
+    if oid is None or x is None or z is None:
+        raise ValueError(f"obstacle needs id, x, z: {entry!r}")
+    r = float(r or 0.0)
+    if r < 0:
+        raise ValueError(f"negative obstacle radius: {entry!r}")
+    return str(oid), float(x), float(z), r
+
+def _segment_distance(px, pz, x0, z0, x1, z1):
+    dx, dz = x1 - x0, z1 - z0
+    length2 = dx * dx + dz * dz
+    t = 0.0 if length2 == 0 else max(0.0, min(1.0, ((px - x0) * dx + (pz - z0) * dz) / length2))
+    return math.hypot(px - (x0 + t * dx), pz - (z0 + t * dz))
+
+# 원형 장애물의 균일 그리드 해시. 장애물은 원이 걸치는 모든 셀에 등록되므로
+# 질의는 질의 영역이 닿는 셀만 보면 된다. 삽입/삭제는 해당 장애물의 셀만 고친다.
+# 쓰기와 질의는 락으로 직렬화한다 (/obstacles 스레드와 제어 스레드).
+class ObstacleMap:
+    def __init__(self, cell_size=OBSTACLE_CONFIG['cell_size'], max_obstacles=OBSTACLE_CONFIG['max_obstacles'],
+                 max_ring=OBSTACLE_CONFIG['max_ring']):
+        self.cell_size = float(cell_size)
+        self.max_obstacles = max_obstacles
+        self.max_ring = max_ring
+        self.items = {}   # id -> (x, z, radius)
+        self.cells = {}   # (ix, iz) -> {id, ...}
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.items)
+
+    def __contains__(self, oid):
+        return oid in self.items
+
+    def _cell(self, x, z):
+        return int(math.floor(x / self.cell_size)), int(math.floor(z / self.cell_size))
+
+    def _cover(self, x, z, r):
+        x0, z0 = self._cell(x - r, z - r)
+        x1, z1 = self._cell(x + r, z + r)
+        return [(i, j) for i in range(x0, x1 + 1) for j in range(z0, z1 + 1)]
+
+    def _insert(self, oid, x, z, r):
+        self.items[oid] = (x, z, r)
+        for cell in self._cover(x, z, r):
+            bucket = self.cells.get(cell)
+            if bucket is None:
+                bucket = self.cells[cell] = set()
+            bucket.add(oid)
+
+    def _remove(self, oid):
+        item = self.items.pop(oid, None)
+        if item is None:
+            return False
+        for cell in self._cover(*item):
+            bucket = self.cells.get(cell)
+            if bucket is not None:
+                bucket.discard(oid)
+                if not bucket:
+                    del self.cells[cell]
+        return True
+
+    def upsert(self, oid, x, z, r=0.0):
+        with self._lock:
+            item = self.items.get(oid)
+            if item == (x, z, r):
+                return False
+            if item is not None:
+                self._remove(oid)
+            elif len(self.items) >= self.max_obstacles:
+                raise ValueError(f"too many obstacles (max {self.max_obstacles})")
+            self._insert(oid, x, z, r)
+            return True
+
+    def remove(self, oid):
+        with self._lock:
+            return self._remove(oid)
+
+    def clear(self):
+        with self._lock:
+            changed = bool(self.items)
+            self.items.clear()
+            self.cells.clear()
+            return changed
+
+    # 일괄 갱신 (clear -> remove -> upsert 순서). 반환: 실제로 바뀐 장애물 수
+    # 용량은 고치기 전에 결과 개수로 확인해 일부만 반영된 채 실패하지 않게 한다 (전부 반영 또는 전부 거부).
+    def apply(self, upserts=(), removes=(), clear=False):
+        removes = [str(oid) for oid in removes]
+        with self._lock:
+            remaining = set() if clear else set(self.items)
+            remaining.difference_update(removes)
+            added = {oid for oid, _, _, _ in upserts} - remaining
+            if len(remaining) + len(added) > self.max_obstacles:
+                raise ValueError(f"too many obstacles (max {self.max_obstacles})")
+            changed = 0
+            if clear:
+                changed = len(self.items)
+                self.clear()
+            for oid in removes:
+                changed += self._remove(oid)
+            for oid, x, z, r in upserts:
+                changed += self.upsert(oid, x, z, r)
+            return changed
+
+    # 계획기/그래프용 [(x, z, radius), ...]
+    def snapshot(self):
+        with self._lock:
+            return list(self.items.values())
+
+    # 가장 가까운 장애물까지의 여유 거리 (중심 거리 - 반경, 안에 있으면 음수). 반환: (id, 여유 거리) 또는 None
+    def nearest(self, x, z, max_distance=math.inf):
+        with self._lock:
+            if not self.items:
+                return None
+            cx, cz = self._cell(x, z)
+            best_id, best = None, math.inf
+            seen = set()
+            for ring in range(self.max_ring + 1):
+                # ring 칸에 걸친 원은 최소 (ring - 1) * cell_size 이상 떨어져 있다
+                bound = (ring - 1) * self.cell_size
+                if bound > best or bound > max_distance:
+                    break
+                for i in range(cx - ring, cx + ring + 1):
+                    step = 1 if abs(i - cx) == ring else 2 * ring
+                    for j in range(cz - ring, cz + ring + 1, max(step, 1)):
+                        for oid in self.cells.get((i, j), ()):
+                            if oid in seen:
+                                continue
+                            seen.add(oid)
+                            ox, oz, r = self.items[oid]
+                            d = math.hypot(ox - x, oz - z) - r
+                            if d < best:
+                                best_id, best = oid, d
+            if best_id is None or best > max_distance:
+                return None
+            return best_id, best
+
+    # (x0, z0)-(x1, z1) 선분을 반경 radius로 훑을 때 처음 닿는 장애물 id (없으면 None)
+    def segment_collides(self, x0, z0, x1, z1, radius=0.0):
+        with self._lock:
+            if not self.items:
+                return None
+            # 선분 둘레 셀 중 선분과 (radius + 셀 대각선 절반) 이내인 것만 본다
+            reach = radius + self.cell_size * 0.7072
+            ix0, iz0 = self._cell(min(x0, x1) - radius, min(z0, z1) - radius)
+            ix1, iz1 = self._cell(max(x0, x1) + radius, max(z0, z1) + radius)
+            seen = set()
+            for i in range(ix0, ix1 + 1):
+                for j in range(iz0, iz1 + 1):
+                    bucket = self.cells.get((i, j))
+                    if not bucket:
+                        continue
+                    center_x, center_z = (i + 0.5) * self.cell_size, (j + 0.5) * self.cell_size
+                    if _segment_distance(center_x, center_z, x0, z0, x1, z1) > reach:
+                        continue
+                    for oid in bucket:
+                        if oid in seen:
+                            continue
+                        seen.add(oid)
+                        ox, oz, r = self.items[oid]
+                        if _segment_distance(ox, oz, x0, z0, x1, z1) < r + radius:
+                            return oid
+            return None
+
+    # 점열 (경로 또는 예측 궤적)을 따라 충돌 검사. 반환: (구간 번호, id) 또는 None
+    def path_collides(self, points, radius=0.0):
+        with self._lock:
+            if not self.items or not points:
+                return None
+            if len(points) == 1:
+                points = [points[0], points[0]]
+            for k, (a, b) in enumerate(zip(points, points[1:])):
+                oid = self.segment_collides(a[0], a[1], b[0], b[1], radius)
+                if oid is not None:
+                    return k, oid
+            return None
+
+    # 현재 자세에서 horizon초 동안 (속도, 선회율 일정) 지나갈 궤적이 장애물과 겹치는지.
+    # 정지 중에 궤적이 한 점으로 줄어 장애물이 사라져 보이지 않도록 최소 min_distance만큼은 내다본다.
+    def footprint_collides(self, x, z, yaw_deg, speed, yaw_rate_deg=0.0, horizon=OBSTACLE_CONFIG['stop_horizon'],
+                           radius=OBSTACLE_CONFIG['vehicle_radius'], steps=OBSTACLE_CONFIG['footprint_steps'],
+                           min_distance=OBSTACLE_CONFIG['min_lookahead']):
+        speed = math.copysign(max(abs(speed), min_distance / horizon), speed)
+        return self.path_collides(predict_footprint(x, z, yaw_deg, speed, yaw_rate_deg, horizon, steps), radius)
+
+# 등속/등선회 궤적 샘플 (+z가 0도, +x가 +90도)
+def predict_footprint(x, z, yaw_deg, speed, yaw_rate_deg=0.0, horizon=OBSTACLE_CONFIG['stop_horizon'],
+                      steps=OBSTACLE_CONFIG['footprint_steps']):
+    points = [(x, z)]
+    dt = horizon / max(steps, 1)
+    yaw = math.radians(yaw_deg)
+    rate = math.radians(yaw_rate_deg or 0.0)
+    for _ in range(max(steps, 1)):
+        x += speed * math.sin(yaw) * dt
+        z += speed * math.cos(yaw) * dt
+        yaw += rate * dt
+        points.append((x, z))
+    return points
@@ -0,0 +1,316 @@
+# -*- coding: utf-8 -*-
+import heapq
+import copy
+import logging
+import math
+import threading
+from collections import OrderedDict
+import numpy as np
+from utils.config import PLANNER_CONFIG
+
+logger = logging.getLogger(__name__)
+
+INF = float('inf')
+SQRT2 = math.sqrt(2.0)
+NEIGHBORS = [(-1, -1, SQRT2), (-1, 0, 1.0), (-1, 1, SQRT2), (0, -1, 1.0),
+             (0, 1, 1.0), (1, -1, SQRT2), (1, 0, 1.0), (1, 1, SQRT2)]
+
+# 지도 경로 주변은 비용 1, 그 밖은 off_road_cost, 장애물 칸은 통과 불가(inf)
+class OccupancyGrid:
+    def __init__(self, map_points, cell_size=PLANNER_CONFIG['cell_size'], margin=PLANNER_CONFIG['margin'],
+                 road_width=PLANNER_CONFIG['road_width'], off_road_cost=PLANNER_CONFIG['off_road_cost']):
+        points = np.asarray(map_points, dtype=np.float64)[:, :2]
+        self.cell_size = float(cell_size)
+        self.origin = points.min(axis=0) - margin
+        extent = points.max(axis=0) + margin - self.origin
+        self.nx, self.nz = (np.ceil(extent / self.cell_size).astype(int) + 1).tolist()
+        self.size = self.nx * self.nz
+
+        base = np.full((self.nx, self.nz), float(off_road_cost))
+        cells = np.floor((points - self.origin) / self.cell_size).astype(int)
+        reach = int(math.ceil(road_width / 2.0 / self.cell_size))
+        for dx in range(-reach, reach + 1):
+            for dz in range(-reach, reach + 1):
+                ix = np.clip(cells[:, 0] + dx, 0, self.nx - 1)
+                iz = np.clip(cells[:, 1] + dz, 0, self.nz - 1)
+                base[ix, iz] = 1.0
+        self.source = map_points
+        self.base_cost = base.ravel().tolist()
+        self.cost = self.base_cost
+        self.blocked = set()
+        # 장애물 (x, z, 반경) -> 막는 칸들, 칸 -> 그 칸을 막는 장애물 수
+        self._obstacle_cells = {}
+        self._block_count = {}
+
+    # 기본 비용은 공유하고, 장애물이 생기면 그때 비용 목록을 복사한다
+    def fork(self):
+        forked = copy.copy(self)
+        forked.cost = self.base_cost
+        forked.blocked = set()
+        forked._obstacle_cells = {}
+        forked._block_count = {}
+        return forked
+
+    def cell_of(self, x, z):
+        ix = int((x - self.origin[0]) // self.cell_size)
+        iz = int((z - self.origin[1]) // self.cell_size)
+        if 0 <= ix < self.nx and 0 <= iz < self.nz:
+            return ix * self.nz + iz
+        return None
+
+    def center(self, cell):
+        ix, iz = divmod(cell, self.nz)
+        return (float(self.origin[0] + (ix + 0.5) * self.cell_size),
+                float(self.origin[1] + (iz + 0.5) * self.cell_size))
+
+    def neighbors(self, cell):
+        ix, iz = divmod(cell, self.nz)
+        for dx, dz, step in NEIGHBORS:
+            jx, jz = ix + dx, iz + dz
+            if 0 <= jx < self.nx and 0 <= jz < self.nz:
+                yield jx * self.nz + jz, step
+
+    def edge_cost(self, a, b, step):
+        ca, cb = self.cost[a], self.cost[b]
+        if ca == INF or cb == INF:
+            return INF
+        return step * (ca + cb) * 0.5
+
+    def heuristic(self, a, b):
+        ax, az = divmod(a, self.nz)
+        bx, bz = divmod(b, self.nz)
+        dx, dz = abs(ax - bx), abs(az - bz)
+        return (dx + dz) + (SQRT2 - 2.0) * min(dx, dz)
+
+    def _cells_of(self, ox, oz, r):
+        cells = []
+        reach = int(math.ceil(r / self.cell_size))
+        for dx in range(-reach, reach + 1):
+            for dz in range(-reach, reach + 1):
+                if math.hypot(dx, dz) * self.cell_size > r + self.cell_size * 0.5:
+                    continue
+                cell = self.cell_of(ox + dx * self.cell_size, oz + dz * self.cell_size)
+                if cell is not None:
+                    cells.append(cell)
+        return cells
+
+    # 이전 목록과 비교해 사라진/새로 생긴 장애물의 칸만 고치고, 비용이 바뀐 칸들을 돌려준다
+    def set_obstacles(self, obstacles, radius=PLANNER_CONFIG['obstacle_radius']):
+        keys = set()
+        for obstacle in obstacles:
+            r = obstacle[2] + radius if len(obstacle) > 2 else radius
+            keys.add((float(obstacle[0]), float(obstacle[1]), float(r)))
+        touched = set()
+        for key in self._obstacle_cells.keys() - keys:
+            for cell in self._obstacle_cells.pop(key):
+                count = self._block_count[cell] - 1
+                if count:
+                    self._block_count[cell] = count
+                else:
+                    del self._block_count[cell]
+                    touched.add(cell)
+        for key in keys - self._obstacle_cells.keys():
+            cells = self._obstacle_cells[key] = self._cells_of(*key)
+            for cell in cells:
+                count = self._block_count.get(cell, 0)
+                self._block_count[cell] = count + 1
+                if not count:
+                    touched.add(cell)
+        # 같은 호출에서 풀렸다가 다시 막힌 칸은 바뀐 것이 아니다
+        changed = {cell for cell in touched if (cell in self._block_count) != (cell in self.blocked)}
+        if changed and self.cost is self.base_cost:
+            self.cost = list(self.base_cost)
+        for cell in changed:
+            if cell in self._block_count:
+                self.blocked.add(cell)
+                self.cost[cell] = INF
+            else:
+                self.blocked.discard(cell)
+                self.cost[cell] = self.base_cost[cell]
+        return changed
+
+_shared_lock = threading.Lock()
+_shared_grid = None
+
+# 같은 지도를 쓰는 차량들은 격자를 한 번만 만들고 fork()한 격자를 받는다
+def shared_grid(map_points):
+    global _shared_grid
+    with _shared_lock:
+        if _shared_grid is None or _shared_grid.source is not map_points:
+            _shared_grid = OccupancyGrid(map_points)
+            logger.info("Occupancy grid built: %dx%d cells", _shared_grid.nx, _shared_grid.nz)
+        return _shared_grid.fork()
+
+# D* Lite: 목표에서 시작점 방향으로 탐색해 두고, 시작 칸 이동이나 칸 비용 변화만 부분적으로 갱신한다
+class DStarLite:
+    def __init__(self, grid, start, goal, max_expansions=PLANNER_CONFIG['max_expansions']):
+        self.grid = grid
+        self.start = start
+        self.goal = goal
+        self.last = start
+        self.km = 0.0
+        self.max_expansions = max_expansions
+        self.g = {}
+        self.rhs = {goal: 0.0}
+        self.heap = []
+        self.keys = {}
+        self._push(goal)
+
+    def _key(self, cell):
+        m = min(self.g.get(cell, INF), self.rhs.get(cell, INF))
+        return (m + self.grid.heuristic(self.start, cell) + self.km, m)
+
+    def _push(self, cell):
+        key = self._key(cell)
+        self.keys[cell] = key
+        heapq.heappush(self.heap, (key, cell))
+
+    def _top_key(self):
+        while self.heap:
+            key, cell = self.heap[0]
+            if self.keys.get(cell) == key:
+                return key
+            heapq.heappop(self.heap)
+        return (INF, INF)
+
+    def _rescan(self, cell):
+        best = INF
+        for nxt, step in self.grid.neighbors(cell):
+            cost = self.grid.edge_cost(cell, nxt, step) + self.g.get(nxt, INF)
+            if cost < best:
+                best = cost
+        return best
+
+    def _queue(self, cell):
+        if self.g.get(cell, INF) != self.rhs.get(cell, INF):
+            self._push(cell)
+        else:
+            self.keys.pop(cell, None)
+
+    def _update_vertex(self, cell):
+        if cell != self.goal:
+            self.rhs[cell] = self._rescan(cell)
+        self._queue(cell)
+
+    # 확장한 칸의 g가 바뀌면 이웃 전체를 다시 훑지 않고, 그 칸을 거치는 값만 고친다
+    def compute(self):
+        expansions = 0
+        while self.heap:
+            # 시작 칸의 키는 휴리스틱이 0이다
+            g_start, rhs_start = self.g.get(self.start, INF), self.rhs.get(self.start, INF)
+            m = min(g_start, rhs_start)
+            if not (self._top_key() < (m + self.km, m) or rhs_start != g_start) or not self.heap:
+                break
+            expansions += 1
+            if expansions > self.max_expansions:
+                logger.warning("DStarLite - expansion budget exceeded (%d)", self.max_expansions)
+                return False
+            key_old, cell = heapq.heappop(self.heap)
+            if self.keys.get(cell) != key_old:
+                continue
+            key_new = self._key(cell)
+            if key_old < key_new:
+                self._push(cell)
+            elif self.g.get(cell, INF) > self.rhs.get(cell, INF):
+                g = self.g[cell] = self.rhs[cell]
+                del self.keys[cell]
+                for prev, step in self.grid.neighbors(cell):
+                    cost = self.grid.edge_cost(prev, cell, step) + g
+                    if prev != self.goal and cost < self.rhs.get(prev, INF):
+                        self.rhs[prev] = cost
+                        self._queue(prev)
+            else:
+                g_old = self.g.get(cell, INF)
+                self.g[cell] = INF
+                self._update_vertex(cell)
+                for prev, step in self.grid.neighbors(cell):
+                    if prev != self.goal and self.rhs.get(prev, INF) == self.grid.edge_cost(prev, cell, step) + g_old:
+                        self._update_vertex(prev)
+        return self.rhs.get(self.start, INF) < INF
+
+    def move_start(self, start):
+        if start == self.start:
+            return
+        self.km += self.grid.heuristic(self.last, start)
+        self.last = start
+        self.start = start
+
+    def update_cells(self, cells):
+        for cell in cells:
+            self._update_vertex(cell)
+            for prev, _ in self.grid.neighbors(cell):
+                self._update_vertex(prev)
+
+    def extract_path(self):
+        if self.g.get(self.start, INF) == INF:
+            return None
+        path = [self.start]
+        cell = self.start
+        for _ in range(self.grid.size):
+            if cell == self.goal:
+                return path
+            best, best_cost = None, INF
+            for nxt, step in self.grid.neighbors(cell):
+                cost = self.grid.edge_cost(cell, nxt, step) + self.g.get(nxt, INF)
+                if cost < best_cost:
+                    best, best_cost = nxt, cost
+            if best is None:
+                return None
+            path.append(best)
+            cell = best
+        return None
+
+def simplify(points):
+    # 같은 방향으로 이어지는 중간 점은 제거
+    if len(points) < 3:
+        return points
+    result = [points[0]]
+    for prev, cur, nxt in zip(points, points[1:], points[2:]):
+        d1 = (cur[0] - prev[0], cur[1] - prev[1])
+        d2 = (nxt[0] - cur[0], nxt[1] - cur[1])
+        if abs(d1[0] * d2[1] - d1[1] * d2[0]) > 1e-9:
+            result.append(cur)
+    result.append(points[-1])
+    return result
+
+class GridPlanner:
+    def __init__(self, map_points, cache_size=PLANNER_CONFIG['cache_size']):
+        self.grid = shared_grid(map_points)
+        self.map_points = map_points
+        self.cache = OrderedDict()
+        self.cache_size = cache_size
+        self.dstar = None
+        self.obstacles_version = None
+
+    def set_obstacles(self, obstacles, version):
+        if version == self.obstacles_version:
+            return
+        changed = self.grid.set_obstacles(obstacles)
+        self.obstacles_version = version
+        if changed and self.dstar is not None:
+            self.dstar.update_cells(changed)
+
+    # 반환값: 월드 좌표 (x, z) 경로, 경로가 없으면 None
+    def plan(self, start, end):
+        start_cell = self.grid.cell_of(*start)
+        goal_cell = self.grid.cell_of(*end)
+        if start_cell is None or goal_cell is None:
+            return None
+        # 캐시에는 칸 경로만 두고, 양 끝점은 매번 이번 호출의 start/end로 붙인다
+        key = (start_cell, goal_cell, self.obstacles_version)
+        cells = self.cache.get(key)
+        if cells is not None:
+            self.cache.move_to_end(key)
+        else:
+            # 새 목적지는 D* Lite를 처음부터 계산하고, 이후 시작 칸 이동/장애물 변화는 부분 수정
+            if self.dstar is None or self.dstar.goal != goal_cell:
+                self.dstar = DStarLite(self.grid, start_cell, goal_cell)
+            else:
+                self.dstar.move_start(start_cell)
+            cells = self.dstar.extract_path() if self.dstar.compute() else None
+            if cells is None:
+                return None
+            self.cache[key] = cells
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        return simplify([tuple(start)] + [self.grid.center(c) for c in cells[1:-1]] + [tuple(end)])
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+import logging
+import math
+from navigation.position_handler import control_position
+from utils.config import TRACKING_CONFIG
+from utils.map_loader import MAP_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+def wrap_deg(angle):
+    return ((angle + 180.0) % 360.0) - 180.0
+
+# 지도(map_data)를 따라가도록 목표 yaw(track_yaw_deg)를 계산한다.
+# LocalizationEvaluator가 매칭한 nearest_idx에서 시작하므로 매 틱 지도 전체를 훑지 않는다.
+class PathTracker:
+    def __init__(self, shared, lookahead_min=TRACKING_CONFIG['lookahead_min'],
+                 lookahead_gain=TRACKING_CONFIG['lookahead_gain'], lookahead_max=TRACKING_CONFIG['lookahead_max'],
+                 stanley_k=TRACKING_CONFIG['stanley_k'], stanley_soft=TRACKING_CONFIG['stanley_soft']):
+        self.shared = shared
+        self.lookahead_min = lookahead_min
+        self.lookahead_gain = lookahead_gain
+        self.lookahead_max = lookahead_max
+        self.stanley_k = stanley_k
+        self.stanley_soft = stanley_soft
+        self.map_data = None
+        self.spacing = 1.0
+
+    def _update_map(self, map_data):
+        if map_data is self.map_data:
+            return
+        self.map_data = map_data
+        if map_data is not None and len(map_data) > 1:
+            length = float(map_data[-1, MAP_COLUMNS['s']] - map_data[0, MAP_COLUMNS['s']])
+            self.spacing = max(length / (len(map_data) - 1), 1e-3)
+
+    # 점 간격이 거의 균일하므로 평균 간격으로 바로 인덱스를 추정한 뒤 몇 칸만 보정한다
+    def lookahead_index(self, idx, distance):
+        s = self.map_data[:, MAP_COLUMNS['s']]
+        last = len(s) - 1
+        target = s[idx] + distance
+        j = min(last, idx + int(distance / self.spacing))
+        while j < last and s[j] < target:
+            j += 1
+        while j > idx and s[j - 1] >= target:
+            j -= 1
+        return j
+
+    def pure_pursuit(self, x, z, idx, speed_ms):
+        distance = min(self.lookahead_max, self.lookahead_min + self.lookahead_gain * abs(speed_ms))
+        j = self.lookahead_index(idx, distance)
+        lx = float(self.map_data[j, MAP_COLUMNS['x']])
+        lz = float(self.map_data[j, MAP_COLUMNS['z']])
+        return math.degrees(math.atan2(lx - x, lz - z)), (lx, lz)
+
+    def stanley(self, idx, cross_track_error, speed_ms):
+        # cross_track_error는 경로 오른쪽이 양수이므로 왼쪽(음의 yaw)으로 보정한다
+        path_heading = float(self.map_data[idx, MAP_COLUMNS['heading']])
+        correction = math.degrees(math.atan2(self.stanley_k * cross_track_error, abs(speed_ms) + self.stanley_soft))
+        point = (float(self.map_data[idx, MAP_COLUMNS['x']]), float(self.map_data[idx, MAP_COLUMNS['z']]))
+        return path_heading - correction, point
+
+    def update(self):
+        with self.shared.section('control') as state:
+            mode = state.get('tracking_mode', 'manual')
+            if mode == 'manual':
+                # 수동 모드에서는 운전자가 정한 tank_tar_yaw_deg를 따른다
+                if state.get('track_yaw_deg') is not None:
+                    state['track_yaw_deg'] = None
+                return None
+            self._update_map(state.get('map_data', None))
+            idx = state.get('nearest_idx', None)
+            if self.map_data is None or idx is None:
+                return None
+            pos = control_position(state)
+            speed_ms = state.get('tank_cur_vel_ms', 0.0)
+            if mode == 'stanley':
+                target, point = self.stanley(idx, state.get('cross_track_error', 0.0), speed_ms)
+            elif mode == 'pure_pursuit':
+                target, point = self.pure_pursuit(pos['x'], pos['z'], idx, speed_ms)
+            else:
+                logger.warning("Unknown tracking mode: %s", mode)
+                return None
+            target = wrap_deg(target)
+            state['track_yaw_deg'] = target
+            state['lookahead_point'] = point
+            return target
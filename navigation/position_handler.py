@@ -1,22 +1,56 @@
 # -*- coding: utf-8 -*-
 import logging
+import threading
+import time
+from navigation.state_estimator import PoseEstimator
+from utils.config import ESTIMATOR_CONFIG
 
 logger = logging.getLogger(__name__)
 
+# 제어에 쓸 위치: 추정한 위치가 있으면 그것, 없으면 마지막 /info 위치
+def control_position(state):
+    pos = state.get('est_playerPos')
+    return pos if pos is not None else state.get('playerPos', {'x': 0, 'z': 0, 'y': 0})
+
 class PositionHandler:
-    def __init__(self, shared, shared_lock):
+    def __init__(self, shared, estimator=None, clock=time.monotonic, enabled=ESTIMATOR_CONFIG['enabled']):
         self.shared = shared
-        self.shared_lock = shared_lock
+        self.estimator = estimator if estimator is not None else PoseEstimator()
+        self.clock = clock
+        self.enabled = enabled
+        # /info 스레드와 스케줄러 스레드가 같은 추정기를 쓴다
+        self._lock = threading.Lock()
+
+    # /info 샘플을 추정기에 넣는다 (패킷 시각이 있으면 그 시각, 없으면 도착 시각)
+    def ingest(self, data, now=None):
+        pos = data.get('playerPos')
+        if not self.enabled or not pos:
+            return
+        now = self.clock() if now is None else now
+        with self._lock:
+            t = self.estimator.sample_time(data.get(ESTIMATOR_CONFIG['timestamp_key']), now)
+            self.estimator.update(t, pos['x'], pos['z'], data.get('playerBodyX', 0.0) or 0.0,
+                                  data.get('playerSpeed', 0.0) or 0.0)
 
-    def update_position(self):
-        with self.shared_lock:
-            self.shared['playerPos'] = self.shared['pre_playerPos']
+    # 추정기가 있으면 지금 시각까지 예측한 자세를 est_*로 쓴다 (측정값 playerPos는 telemetry 구역만 쓴다)
+    def update_position(self, now=None):
+        with self.shared.section('control') as state:
+            if not self.enabled or not self.estimator.initialized:
+                if state.get('est_playerPos') is not None:
+                    state['est_playerPos'] = None
+                return
+            now = self.clock() if now is None else now
+            with self._lock:
+                x, z, yaw, speed, yaw_rate, age = self.estimator.predict(now)
+            state['est_playerPos'] = {'x': x, 'z': z, 'y': state['pre_playerPos'].get('y', 0)}
+            state['est_yaw_deg'] = yaw
+            state['est_speed_ms'] = speed
+            state['est_yaw_rate_deg'] = yaw_rate
+            state['est_age_s'] = age
 
     def get_position(self):
-        with self.shared_lock:
-            pos = self.shared.get('playerPos', {'x': 0, 'z': 0, 'y': 0})
-            return (pos['x'], pos['z'], pos['y'])
+        pos = control_position(self.shared.snapshot())
+        return (pos['x'], pos['z'], pos['y'])
 
     def get_speed(self):
-        with self.shared_lock:
-            return self.shared.get('tank_cur_vel_ms', 0.0)
\ No newline at end of file
+        return self.shared.get('tank_cur_vel_ms', 0.0)
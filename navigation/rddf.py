@@ -1,18 +1,17 @@
 # -*- coding: utf-8 -*-
-import csv
-import os
 import logging
-import pandas as pd
+import time
+from navigation.rddf_writer import RddfRecord, make_rddf_writer
 from utils.config import SHARED
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
-import numpy as np
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class Rddf:
+    def __init__(self, shared=SHARED, writer=None):
+        self.shared = shared
+        self.writer = writer if writer is not None else make_rddf_writer()
+
     def add_info(self, info_data: dict):
         player_pos = info_data.get("playerPos", {})
         x = player_pos.get("x")
@@ -21,29 +20,26 @@ class Rddf:
         speed = info_data.get("playerSpeed")
         return [x, z, y, speed]
 
-    def save(self, data, filename="data/logs/rddf.csv", max_rows=1000):
+    # data: add_info()의 행 (또는 행 목록). 디스크 기록에는 시각, 차체 yaw, 마지막 명령을 함께 남긴다.
+    def save(self, data, t=None, yaw=None, command=None):
         try:
             if isinstance(data[0], (int, float)):
                 data = [data]
-            file_exists = os.path.exists(filename)
-            if file_exists:
-                df = pd.read_csv(filename)
-                df = pd.concat([df, pd.DataFrame(data, columns=["x", "z", "y", "speed"])])
-                df = df.tail(max_rows)
-                df.to_csv(filename, index=False)
-            else:
-                with open(filename, "w", newline="") as csvfile:
-                    writer = csv.writer(csvfile)
-                    writer.writerow(["x", "z", "y", "speed"])
-                    writer.writerows(data)
+            t = time.time() if t is None else t
+            # 디스크 기록은 백그라운드 스레드가 담당하고, 여기서는 큐와 메모리 링에만 넣는다
+            for row in data:
+                self.writer.put(RddfRecord(t, *row[:4], yaw, command))
+            # 메모리 링은 TimeSeriesBuffer (seq가 대시보드 증분 전송 기준)
+            self.shared['rddf_data'].extend(data)
+            return self.writer.filename
+        except Exception as e:
+            logger.error("Error saving RDDF: %s", e)
+            raise
 
-            if 'rddf_data' not in SHARED:
-                SHARED['rddf_data'] = []
-            SHARED['rddf_data'].extend(data)
-            SHARED['rddf_data'] = SHARED['rddf_data'][-max_rows:]
+    # 링을 넘는 전체 주행 궤적은 단순화 수준별로 따로 보관한다 (대시보드 LOD).
+    # 요청 경로가 아니라 스케줄러 작업에서 링에 쌓인 행을 한꺼번에 가져온다.
+    def update_lod(self):
+        self.shared['rddf_lod'].catch_up(self.shared['rddf_data'])
 
-            logger.info(f"Saved CSV file: {filename}")
-            return filename
-        except Exception as e:
-            logger.error(f"Error saving RDDF: {str(e)}")
-            raise
\ No newline at end of file
+    def close(self):
+        self.writer.close()
@@ -0,0 +1,310 @@
+# -*- coding: utf-8 -*-
+import atexit
+import csv
+import glob
+import logging
+import os
+import queue
+import threading
+import time
+from collections import namedtuple
+from utils.config import RDDF_CONFIG
+from utils.record_store import RecordStore
+
+logger = logging.getLogger(__name__)
+
+RDDF_COLUMNS = ["x", "z", "y", "speed"]
+
+# 쓰기 큐에 들어가는 한 행. CSV에는 RDDF_COLUMNS만, 세그먼트 저장소에는 전부 기록한다.
+RddfRecord = namedtuple("RddfRecord", ("t", "x", "z", "y", "speed", "yaw", "command"))
+
+# 세그먼트 저장소의 열 (시각은 epoch 초)
+RDDF_RECORD_COLUMNS = (
+    ("t", "f8"), ("x", "f4"), ("z", "f4"), ("y", "f4"), ("speed", "f4"), ("yaw", "f4"), ("command", "u1")
+)
+# command 열의 코드 (목록에 없는 명령은 0)
+COMMAND_CODES = ("", "STOP", "W", "S", "A", "D")
+_COMMAND_INDEX = {name: code for code, name in enumerate(COMMAND_CODES)}
+
+def encode_command(command):
+    return _COMMAND_INDEX.get(command, 0)
+
+def decode_commands(codes):
+    return [COMMAND_CODES[code] if code < len(COMMAND_CODES) else "" for code in codes]
+
+# RDDF 행을 큐에 넣고 백그라운드 스레드에서 CSV 파일 끝에 이어 쓴다
+class RddfWriter:
+    def __init__(self, filename=RDDF_CONFIG['filename'], queue_size=RDDF_CONFIG['queue_size'],
+                 batch_size=RDDF_CONFIG['batch_size'], flush_interval=RDDF_CONFIG['flush_interval'],
+                 fsync_interval=RDDF_CONFIG['fsync_interval'], rotate_bytes=RDDF_CONFIG['rotate_bytes'],
+                 rotate_seconds=RDDF_CONFIG['rotate_seconds'], backup_count=RDDF_CONFIG['backup_count'],
+                 restart_backoff=RDDF_CONFIG['restart_backoff'], max_restarts=RDDF_CONFIG['max_restarts']):
+        self.filename = filename
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.fsync_interval = fsync_interval
+        self.rotate_bytes = rotate_bytes
+        self.rotate_seconds = rotate_seconds
+        self.backup_count = backup_count
+        self.restart_backoff = restart_backoff
+        self.max_restarts = max_restarts
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.stats = {
+            "enqueued": 0,
+            "dropped": 0,
+            "written": 0,
+            "flushes": 0,
+            "fsyncs": 0,
+            "rotations": 0,
+            "errors": 0,
+            "restarts": 0,
+            "queue_high_water": 0
+        }
+        self._stats_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._file = None
+        self._writer = None
+        self._opened_at = 0.0
+        self._rows_in_file = 0
+        self._last_fsync = 0.0
+        self._dirty = False
+        # close() 뒤에는 put()이 스레드를 다시 띄우지 않는다
+        self._closed = False
+        # 연속 실패 횟수와 다음 재시작 가능 시각 (한 번이라도 기록에 성공하면 0으로 돌아간다)
+        self._failures = 0
+        self._retry_at = 0.0
+        atexit.register(self.close)
+
+    def start(self):
+        with self._start_lock:
+            self._closed = False
+            self._failures = 0
+            self._spawn()
+
+    def _spawn(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        if self._thread is not None:
+            with self._stats_lock:
+                self.stats['restarts'] += 1
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="rddf-writer", daemon=True)
+        self._thread.start()
+
+    # 기록 스레드가 오류로 끝났으면 backoff 뒤에 다시 띄운다 (큐에 남은 행부터 이어 쓴다).
+    # 연속 실패가 max_restarts를 넘으면 포기하고 False (행은 드롭한다).
+    def _ensure_running(self):
+        thread = self._thread
+        if thread is not None and thread.is_alive():
+            return True
+        with self._start_lock:
+            if self._closed:
+                return False
+            if self._failures > self.max_restarts:
+                return False
+            if self._thread is None or time.monotonic() >= self._retry_at:
+                self._spawn()
+        return True
+
+    def put(self, row):
+        # 요청 경로에서는 디스크를 건드리지 않는다. 큐가 가득 차거나 기록기가 닫혔으면 드롭하고 통계만 남긴다.
+        if not self._ensure_running():
+            with self._stats_lock:
+                self.stats['dropped'] += 1
+            return False
+        try:
+            self.queue.put_nowait(row)
+        except queue.Full:
+            with self._stats_lock:
+                self.stats['dropped'] += 1
+            return False
+        with self._stats_lock:
+            self.stats['enqueued'] += 1
+            size = self.queue.qsize()
+            if size > self.stats['queue_high_water']:
+                self.stats['queue_high_water'] = size
+        return True
+
+    def get_stats(self):
+        with self._stats_lock:
+            stats = dict(self.stats)
+        stats['queue_size'] = self.queue.qsize()
+        stats['running'] = int(self._thread is not None and self._thread.is_alive())
+        return stats
+
+    def close(self, timeout=5.0):
+        self._closed = True
+        self._stop.set()
+        thread = self._thread
+        if thread is not None and thread.is_alive() and thread is not threading.current_thread():
+            thread.join(timeout)
+
+    def _run(self):
+        try:
+            self._open()
+            while not self._stop.is_set() or not self.queue.empty():
+                batch = self._drain()
+                if batch:
+                    self._write(batch)
+                    self._failures = 0
+                self._maybe_fsync()
+                self._maybe_rotate()
+        except Exception as e:
+            self._failures += 1
+            self._retry_at = time.monotonic() + self.restart_backoff * 2 ** (self._failures - 1)
+            with self._stats_lock:
+                self.stats['errors'] += 1
+            if self._failures > self.max_restarts:
+                logger.error("Error in RDDF writer: %s (giving up after %d restarts, rows are dropped)",
+                             e, self.max_restarts)
+            else:
+                logger.error("Error in RDDF writer: %s (restarting in %.1f s)", e,
+                             self._retry_at - time.monotonic())
+        finally:
+            # 닫다가 난 오류가 스레드 밖으로 나가지 않게 한다
+            try:
+                self._close_file()
+            except Exception as e:
+                with self._stats_lock:
+                    self.stats['errors'] += 1
+                logger.error("Error closing RDDF log: %s", e)
+
+    def _drain(self):
+        batch = []
+        try:
+            batch.append(self.queue.get(timeout=self.flush_interval))
+        except queue.Empty:
+            return batch
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _open(self):
+        directory = os.path.dirname(self.filename)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        new_file = not os.path.exists(self.filename) or os.path.getsize(self.filename) == 0
+        self._file = open(self.filename, "a", newline="")
+        self._writer = csv.writer(self._file)
+        if new_file:
+            self._writer.writerow(RDDF_COLUMNS)
+        self._opened_at = time.monotonic()
+        self._last_fsync = self._opened_at
+        self._rows_in_file = 0
+
+    def _close_file(self):
+        if self._file is None:
+            return
+        try:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        finally:
+            self._file.close()
+            self._file = None
+            self._writer = None
+
+    def _write(self, batch):
+        self._writer.writerows((record.x, record.z, record.y, record.speed) for record in batch)
+        self._file.flush()
+        self._dirty = True
+        self._rows_in_file += len(batch)
+        with self._stats_lock:
+            self.stats['written'] += len(batch)
+            self.stats['flushes'] += 1
+
+    def _maybe_fsync(self):
+        now = time.monotonic()
+        if self._dirty and now - self._last_fsync >= self.fsync_interval:
+            os.fsync(self._file.fileno())
+            self._dirty = False
+            self._last_fsync = now
+            with self._stats_lock:
+                self.stats['fsyncs'] += 1
+
+    def _maybe_rotate(self):
+        if self._rows_in_file == 0:
+            return
+        too_big = self.rotate_bytes and self._file.tell() >= self.rotate_bytes
+        too_old = self.rotate_seconds and time.monotonic() - self._opened_at >= self.rotate_seconds
+        if not (too_big or too_old):
+            return
+        self._close_file()
+        # 백업은 "<파일명>.<시각>"이라 다른 로그 파일과 겹치지 않는다 (같은 초에 두 번 돌아도 마이크로초로 구분)
+        now = time.time()
+        base = f"{self.filename}.{time.strftime('%Y%m%d_%H%M%S', time.localtime(now))}_{int(now % 1 * 1e6):06d}"
+        backup, n = base, 1
+        while os.path.exists(backup):
+            backup, n = f"{base}_{n}", n + 1
+        os.replace(self.filename, backup)
+        backups = sorted(glob.glob(glob.escape(self.filename) + ".*"))
+        for old in backups[:max(0, len(backups) - self.backup_count)]:
+            os.remove(old)
+        self._open()
+        with self._stats_lock:
+            self.stats['rotations'] += 1
+        logger.info("Rotated RDDF log: %s", self.filename)
+
+# 같은 큐/스레드로 열 단위 세그먼트 저장소에 기록한다 (filename의 확장자를 뗀 경로가 세그먼트 디렉터리).
+# 행은 segment_block_rows개씩 모아 블록으로 쓰고, fsync 주기마다 모인 행을 블록으로 내려 쓴 뒤 fsync한다.
+# 시간 범위 조회: utils.record_store.read_range(writer.filename, t0, t1)
+class RddfSegmentWriter(RddfWriter):
+    def __init__(self, filename=RDDF_CONFIG['filename'], block_rows=RDDF_CONFIG['segment_block_rows'],
+                 segment_bytes=RDDF_CONFIG['segment_bytes'], segment_seconds=RDDF_CONFIG['rotate_seconds'],
+                 max_segments=RDDF_CONFIG['max_segments'], **kwargs):
+        super().__init__(os.path.splitext(filename)[0], **kwargs)
+        self.block_rows = block_rows
+        self.segment_bytes = segment_bytes
+        self.segment_seconds = segment_seconds
+        self.max_segments = max_segments
+        self.store = None
+
+    def _open(self):
+        if self.store is None:
+            self.store = RecordStore(self.filename, RDDF_RECORD_COLUMNS, self.block_rows, self.segment_bytes,
+                                     self.segment_seconds, self.max_segments)
+        self._opened_at = time.monotonic()
+        self._last_fsync = self._opened_at
+
+    def _close_file(self):
+        if self.store is not None:
+            self.store.close()
+            self._sync_store_stats()
+
+    def _write(self, batch):
+        self.store.extend((record.t, record.x, record.z, record.y, record.speed, record.yaw,
+                           encode_command(record.command)) for record in batch)
+        self._dirty = True
+        with self._stats_lock:
+            self.stats['written'] += len(batch)
+            self.stats['flushes'] += 1
+
+    def _maybe_fsync(self):
+        now = time.monotonic()
+        if self._dirty and now - self._last_fsync >= self.fsync_interval:
+            self.store.flush()
+            self.store.sync()
+            self._dirty = False
+            self._last_fsync = now
+            with self._stats_lock:
+                self.stats['fsyncs'] += 1
+            self._sync_store_stats()
+
+    # 세그먼트 교체는 저장소가 블록을 쓸 때 직접 한다
+    def _maybe_rotate(self):
+        pass
+
+    def _sync_store_stats(self):
+        with self._stats_lock:
+            self.stats['rotations'] = self.store.rolls
+            self.stats['blocks'] = self.store.blocks
+
+# RDDF_CONFIG['format']에 맞는 기록기 ("csv" 또는 "segments")
+def make_rddf_writer(filename=RDDF_CONFIG['filename']):
+    if RDDF_CONFIG['format'] == "segments":
+        return RddfSegmentWriter(filename)
+    return RddfWriter(filename)
@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+# 기록된 RDDF 로그를 가상 시계로 Navigation에 다시 흘려보내는 재생 엔진
+# /info와 같은 update_info 경로로 넣고, 계획/위치 추정/제어는 같은 RateScheduler 작업을 가상 시각으로 실행한다.
+# 출력 CSV는 입력과 설정이 같으면 바이트 단위로 같다.
+#
+# 사용법:
+#   python -m navigation.replay data/logs/rddf.csv
+#   python -m navigation.replay logs/*.csv --workers 8 --tracking pure_pursuit
+#   python -m navigation.replay data/logs/rddf.csv --speed 1   (실시간 재생)
+#   python -m navigation.replay data/logs/rddf               (세그먼트 디렉터리)
+import argparse
+import csv
+import logging
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from navigation.navigation import Navigation
+from navigation.rddf_writer import RDDF_COLUMNS
+from navigation.steering_plan import target_yaw
+from navigation.vehicle_registry import new_vehicle_state
+from utils.config import REPLAY_CONFIG, SHARED
+from utils.event_bus import EventBus
+from utils.record_store import read_range
+
+logger = logging.getLogger(__name__)
+
+REPLAY_COLUMNS = ["t", "x", "z", "speed", "yaw", "nearest_idx", "error_distance", "cross_track_error",
+                  "map_progress", "target_yaw", "command", "cmd_speed", "cmd_yaw"]
+
+class VirtualClock:
+    def __init__(self, start=0.0):
+        self.now = start
+
+    def __call__(self):
+        return self.now
+
+    def set(self, now):
+        self.now = now
+
+# 재생 중에는 RDDF를 다시 기록하지 않는다
+class DiscardWriter:
+    filename = None
+
+    def put(self, row):
+        pass
+
+    def close(self):
+        pass
+
+# RDDF CSV (x, z, y, speed) 또는 세그먼트 디렉터리 읽기.
+# 위치(x, z)가 빠진 행은 버리고, 높이(y)가 빠졌으면 0으로 본다. speed가 빠진 칸은 정지로 오해하지 않도록
+# NaN으로 남긴다 (예전 3열 로그는 speed 열이 통째로 없다). 재생할 때 이동 거리로 채운다.
+def load_rddf(path):
+    if os.path.isdir(path):
+        columns = read_range(path, columns=RDDF_COLUMNS)
+        if not columns:
+            return np.zeros((0, 4))
+        records = np.column_stack([columns[name] for name in RDDF_COLUMNS]).astype(np.float64)
+    else:
+        rows = []
+        with open(path, newline="", encoding="utf-8") as f:
+            reader = csv.reader(f)
+            next(reader, None)
+            for row in reader:
+                if len(row) < 2:
+                    continue
+                values = [float(v) if v not in ("", "None") else np.nan for v in row[:4]]
+                rows.append(values + [np.nan] * (4 - len(values)))
+        records = np.array(rows, dtype=np.float64).reshape(-1, 4)
+    missing = np.isnan(records[:, :2]).any(axis=1)
+    if missing.any():
+        logger.warning("Replay - %s: skipped %d rows without position", path, int(missing.sum()))
+        records = records[~missing]
+    records[:, 2] = np.nan_to_num(records[:, 2])
+    return records
+
+# 기록에는 차체 방향이 없으므로 이동 방향으로 추정한다 (+z가 0도, +x가 +90도)
+def derive_yaw(xz, min_step=0.05):
+    yaw = np.zeros(len(xz))
+    current = 0.0
+    for i in range(1, len(xz)):
+        dx, dz = xz[i] - xz[i - 1]
+        if math.hypot(dx, dz) >= min_step:
+            current = math.degrees(math.atan2(dx, dz))
+        yaw[i] = current
+    if len(yaw) > 1:
+        yaw[0] = yaw[1]
+    return yaw
+
+# speed가 NaN인 행은 샘플 간 이동 거리로 속도(m/s)를 추정한다
+def derive_speed(records, period):
+    speed = records[:, 3].copy()
+    missing = np.isnan(speed)
+    if missing.any():
+        step = np.zeros(len(records))
+        step[1:] = np.hypot(*np.diff(records[:, :2], axis=0).T) / period
+        if len(step) > 1:
+            step[0] = step[1]
+        speed[missing] = step[missing]
+    return speed
+
+class Replay:
+    def __init__(self, records, sample_hz=REPLAY_CONFIG['sample_hz'], speed=REPLAY_CONFIG['speed'],
+                 tracking_mode=None, destination=None):
+        self.records = records
+        self.sample_hz = sample_hz
+        self.speed = speed
+        self.clock = VirtualClock()
+        self.shared = new_vehicle_state(SHARED)
+        if tracking_mode is not None:
+            with self.shared.section('tuning') as state:
+                state['tracking_mode'] = tracking_mode
+        # 목적지는 기록의 마지막 점 (계획기가 실제 경로를 계산하도록)
+        if destination is None and len(records):
+            destination = (float(records[-1, 0]), float(records[-1, 2]), float(records[-1, 1]))
+        with self.shared.section('planning') as state:
+            state['destination'] = destination
+        # 재생 이벤트가 실시간 구독자에게 섞이지 않도록 따로 버스를 둔다
+        self.navigation = Navigation(self.shared, DiscardWriter(), "replay", EventBus())
+        self.navigation.scheduler = self.navigation._build_scheduler(clock=self.clock)
+        self.navigation.position_handler.clock = self.clock
+
+    def run(self, writer=None):
+        period = 1.0 / self.sample_hz
+        yaw = derive_yaw(self.records[:, :2])
+        speeds = derive_speed(self.records, period)
+        scheduler = self.navigation.scheduler
+        wall_start = time.monotonic()
+        errors = []
+        for i, (x, z, y, _) in enumerate(self.records):
+            speed = speeds[i]
+            t = i * period
+            if self.speed > 0:
+                delay = wall_start + t / self.speed - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+            self.clock.set(t)
+            self.navigation.update_info({
+                "playerPos": {"x": float(x), "z": float(z), "y": float(y)},
+                "playerSpeed": float(speed),
+                "playerBodyX": float(yaw[i])
+            })
+            scheduler.step(t)
+            state = self.shared.snapshot()
+            errors.append(state.get('error_distance', 0.0))
+            if writer is not None:
+                command = state.get('last_command') or {"command": "", "speed": 0.0, "yaw": 0.0}
+                nearest_idx = state.get('nearest_idx')
+                writer.writerow([
+                    f"{t:.3f}", f"{x:.6f}", f"{z:.6f}", f"{speed:.6f}", f"{yaw[i]:.6f}",
+                    "" if nearest_idx is None else int(nearest_idx),
+                    f"{state.get('error_distance', 0.0):.6f}", f"{state.get('cross_track_error', 0.0):.6f}",
+                    f"{state.get('map_progress', 0.0):.6f}", f"{target_yaw(state):.6f}",
+                    command['command'], f"{command['speed']:.6f}", f"{command['yaw']:.6f}"
+                ])
+        wall = time.monotonic() - wall_start
+        duration = len(self.records) * period
+        return {
+            "rows": len(self.records),
+            "duration_s": duration,
+            "wall_s": wall,
+            "realtime_factor": duration / wall if wall > 0 else float('inf'),
+            "mean_error": float(np.mean(errors)) if errors else 0.0,
+            "max_error": float(np.max(errors)) if errors else 0.0,
+            "scheduler": {name: stats['runs'] for name, stats in scheduler.get_stats().items()}
+        }
+
+def replay_file(path, output_dir=REPLAY_CONFIG['output_dir'], sample_hz=REPLAY_CONFIG['sample_hz'],
+                speed=REPLAY_CONFIG['speed'], tracking_mode=None):
+    records = load_rddf(path)
+    replay = Replay(records, sample_hz=sample_hz, speed=speed, tracking_mode=tracking_mode)
+    output = None
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+        output = os.path.join(output_dir, os.path.splitext(os.path.basename(path))[0] + "_replay.csv")
+        with open(output, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f, lineterminator="\n")
+            writer.writerow(REPLAY_COLUMNS)
+            summary = replay.run(writer)
+    else:
+        summary = replay.run()
+    summary.update(source=path, output=output)
+    return summary
+
+def _replay_job(args):
+    path, output_dir, sample_hz, speed, tracking_mode = args
+    return replay_file(path, output_dir, sample_hz, speed, tracking_mode)
+
+# 작업 프로세스는 제어 루프의 주기별 INFO 로그를 내지 않는다 (부모 프로세스의 로깅 설정은 건드리지 않음)
+def _init_worker():
+    logging.disable(logging.INFO)
+
+# 여러 로그를 프로세스 풀에서 동시에 재생 (결과는 입력 순서대로)
+def replay_batch(paths, output_dir=REPLAY_CONFIG['output_dir'], sample_hz=REPLAY_CONFIG['sample_hz'],
+                 speed=REPLAY_CONFIG['speed'], tracking_mode=None, workers=None):
+    jobs = [(path, output_dir, sample_hz, speed, tracking_mode) for path in paths]
+    workers = workers if workers is not None else REPLAY_CONFIG['workers'] or os.cpu_count() or 1
+    if workers <= 1 or len(jobs) <= 1:
+        return [_replay_job(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=min(workers, len(jobs)), initializer=_init_worker) as pool:
+        return list(pool.map(_replay_job, jobs))
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("paths", nargs="+", help="재생할 RDDF CSV 파일 또는 세그먼트 디렉터리들")
+    parser.add_argument("--output-dir", default=REPLAY_CONFIG['output_dir'], help="재생 결과 CSV 폴더 (빈 문자열이면 저장 안 함)")
+    parser.add_argument("--sample-hz", type=float, default=REPLAY_CONFIG['sample_hz'])
+    parser.add_argument("--speed", type=float, default=REPLAY_CONFIG['speed'], help="재생 배속 (0이면 최대 속도)")
+    parser.add_argument("--tracking", choices=["manual", "pure_pursuit", "stanley"], default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    for summary in replay_batch(args.paths, args.output_dir, args.sample_hz, args.speed, args.tracking, args.workers):
+        print(f"{summary['source']}: {summary['rows']} rows, {summary['duration_s']:.1f}s recorded in "
+              f"{summary['wall_s']:.3f}s ({summary['realtime_factor']:.0f}x), error mean={summary['mean_error']:.3f} m "
+              f"max={summary['max_error']:.3f} m -> {summary['output']}")
+
+if __name__ == "__main__":
+    main()
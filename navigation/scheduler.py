@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+import logging
+import threading
+import time
+from utils.histogram import Histogram
+
+logger = logging.getLogger(__name__)
+
+class ScheduledTask:
+    def __init__(self, name, rate_hz, fn, policy):
+        self.name = name
+        self.period = 1.0 / rate_hz
+        self.fn = fn
+        self.policy = policy
+        self.deadline = None
+        self.last_start = None
+        self.runs = 0
+        self.overruns = 0
+        self.skipped = 0
+        self.errors = 0
+        self.jitter_ms = Histogram()
+        self.exec_ms = Histogram()
+        self.period_ms = Histogram()
+
+    def stats(self):
+        return {
+            "period_s": self.period,
+            "runs": self.runs,
+            "overruns": self.overruns,
+            "skipped": self.skipped,
+            "errors": self.errors,
+            "jitter_ms": self.jitter_ms.snapshot(),
+            "exec_ms": self.exec_ms.snapshot(),
+            "period_ms": self.period_ms.snapshot()
+        }
+
+# 단조 시계 기반 고정 주기 스케줄러.
+# 각 작업은 절대 마감 시각(deadline)을 기준으로 돌기 때문에 주기 오차가 누적되지 않는다.
+# 마감을 넘긴 경우 policy="catch_up"은 밀린 실행을 바로 이어서 하고 (최대 max_catch_up회),
+# policy="skip"은 밀린 주기를 건너뛰고 다음 미래 슬롯으로 맞춘다.
+class RateScheduler:
+    def __init__(self, clock=time.monotonic, sleep=None, max_catch_up=3):
+        self.clock = clock
+        self.tasks = []
+        self.max_catch_up = max_catch_up
+        self._stop = threading.Event()
+        self._sleep = sleep if sleep is not None else self._stop.wait
+
+    def add_task(self, name, rate_hz, fn, policy="skip"):
+        if policy not in ("skip", "catch_up"):
+            raise ValueError(f"Unknown overrun policy: {policy}")
+        task = ScheduledTask(name, rate_hz, fn, policy)
+        self.tasks.append(task)
+        return task
+
+    def _run_task(self, task, now):
+        # dt는 고정값이 아니라 직전 실행 시작부터 실제로 흐른 시간
+        dt = now - task.last_start if task.last_start is not None else task.period
+        if task.last_start is not None:
+            task.period_ms.observe(dt * 1000.0)
+        task.jitter_ms.observe(max(0.0, now - task.deadline) * 1000.0)
+        task.last_start = now
+        try:
+            task.fn(dt)
+        except Exception as e:
+            task.errors += 1
+            logger.error("Scheduler - task %s failed: %s", task.name, e)
+        task.runs += 1
+        task.exec_ms.observe((self.clock() - now) * 1000.0)
+
+    def _advance(self, task, now):
+        task.deadline += task.period
+        if task.deadline > now:
+            return
+        task.overruns += 1
+        if task.policy == "skip":
+            missed = int((now - task.deadline) // task.period) + 1
+            task.skipped += missed
+            task.deadline += missed * task.period
+
+    # 현재 시각 기준으로 마감이 지난 작업들을 실행하고 다음 마감 시각을 돌려준다
+    def step(self, now=None):
+        explicit = now is not None
+        for task in self.tasks:
+            current = now if explicit else self.clock()
+            if task.deadline is None:
+                task.deadline = current
+            runs = 0
+            while task.deadline <= current:
+                if runs > self.max_catch_up:
+                    # catch_up 한도를 넘으면 남은 주기는 버린다
+                    missed = int((current - task.deadline) // task.period) + 1
+                    task.skipped += missed
+                    task.deadline += missed * task.period
+                    break
+                self._run_task(task, current)
+                runs += 1
+                current = now if explicit else self.clock()
+                self._advance(task, current)
+        return min(task.deadline for task in self.tasks) if self.tasks else None
+
+    def run(self):
+        self._stop.clear()
+        while not self._stop.is_set():
+            next_deadline = self.step()
+            if next_deadline is None:
+                break
+            delay = next_deadline - self.clock()
+            if delay > 0:
+                self._sleep(delay)
+
+    def stop(self):
+        self._stop.set()
+
+    def get_stats(self):
+        return {task.name: task.stats() for task in self.tasks}
@@ -1,43 +1,74 @@
 # -*- coding: utf-8 -*-
 import logging
-from navigation.pid_controller import PIDController
+from controller.pid_controller import PIDBank, PIDController
+from navigation.speed_profile import shared_profile
+from utils.config import PID_BANK_CONFIG, SPEED_PROFILE_CONFIG
 
 logger = logging.getLogger(__name__)
 
 class SpeedPlan:
-    def __init__(self, shared, shared_lock):
+    # bank를 넘기면 그 bank의 채널 하나를 쓴다 (속도/조향이 한 bank를 공유)
+    def __init__(self, shared, bank=None, channel=PID_BANK_CONFIG['speed']['channel'],
+                 use_profile=SPEED_PROFILE_CONFIG['enabled']):
         self.shared = shared
-        self.shared_lock = shared_lock
+        self.use_profile = use_profile
+        self.map_data = None
+        self.profile = None
+        if bank is None:
+            bank = PIDBank.from_config({'speed': dict(PID_BANK_CONFIG['speed'], channel=0)})
+            channel = 0
         self.pid = PIDController(
             kp=self.shared['vel_pid']['kp'],
             ki=self.shared['vel_pid']['ki'],
             kd=self.shared['vel_pid']['kd'],
-            dt=0.1
+            dt=0.1,
+            bank=bank,
+            channel=channel
         )
 
+    # 경로 추종 중이면 매칭된 지도 점의 프로파일 속도 (km/h), 아니면 None
+    def profile_speed(self, state):
+        if not self.use_profile or state.get('tracking_mode') == 'manual':
+            return None
+        idx = state.get('nearest_idx')
+        map_data = state.get('map_data')
+        if idx is None or map_data is None:
+            return None
+        if map_data is not self.map_data:
+            self.map_data = map_data
+            self.profile = shared_profile(map_data)
+        return float(self.profile[idx]) * 3.6
+
     def plan(self, dt=0.1):
-        with self.shared_lock:
+        with self.shared.section('control') as state:
             # PID 파라미터 업데이트
             self.pid.update_gains(
-                kp=self.shared['vel_pid']['kp'],
-                ki=self.shared['vel_pid']['ki'],
-                kd=self.shared['vel_pid']['kd'],
+                kp=state['vel_pid']['kp'],
+                ki=state['vel_pid']['ki'],
+                kd=state['vel_pid']['kd'],
                 dt=dt
             )
 
-            current_speed = self.shared.get('tank_cur_vel_ms', 0.0) * 3.6  # km/h
-            target_speed = self.shared.get('tank_tar_vel_kh', 0.0)
+            # 추정기가 있으면 제어 시점까지 예측한 속도를 측정값으로 쓴다
+            current_speed_ms = state.get('est_speed_ms')
+            if current_speed_ms is None:
+                current_speed_ms = state.get('tank_cur_vel_ms', 0.0)
+            current_speed = current_speed_ms * 3.6  # km/h
+            target_speed = state.get('tank_tar_vel_kh', 0.0)
+            # 슬라이더 목표 속도는 상한으로만 쓰고, 코너/끝점 앞에서는 프로파일 속도로 낮춘다
+            profile_speed = self.profile_speed(state)
+            if profile_speed is not None:
+                state['profile_speed_kh'] = profile_speed
+                target_speed = min(target_speed, profile_speed)
             output = self.pid.compute(target_speed, current_speed)
 
             # 속도 업데이트 (m/s 단위로 변환)
-            current_speed_ms = self.shared.get('tank_cur_vel_ms', 0.0)
             new_speed_ms = current_speed_ms + (output / 3.6)  # km/h 단위 출력을 m/s로 변환
             new_speed_ms = max(-60 / 3.6, min(new_speed_ms, 60 / 3.6))  # 최대 속도 제한
-            self.shared['tank_cur_vel_ms'] = new_speed_ms
+            state['cmd_speed_ms'] = new_speed_ms
 
-            logger.info(f"SpeedPlan - Target: {target_speed} km/h, Current: {new_speed_ms * 3.6} km/h, Output: {output}")
+            logger.info("SpeedPlan - Target: %s km/h, Current: %s km/h, Output: %s", target_speed, new_speed_ms * 3.6, output)
             return new_speed_ms
 
     def reset(self):
-        self.pid.integral = 0.0
-        self.pid.previous_error = 0.0
\ No newline at end of file
+        self.pid.reset()
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+import logging
+import math
+import threading
+import numpy as np
+from utils.config import SPEED_PROFILE_CONFIG
+from utils.map_loader import MAP_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+# 지도 점마다 목표 속도 (m/s).
+# 1) 곡률로 코너 속도 상한 v = sqrt(횡가속도 / |곡률|)를 구하고 최고 속도로 자른다.
+# 2) 앞 방향 패스: v[i] <= sqrt(v[i-1]^2 + 2 * accel * ds) (가속 한계)
+# 3) 뒤 방향 패스: v[i] <= sqrt(v[i+1]^2 + 2 * decel * ds) (코너/끝점 전에 미리 감속)
+def build_speed_profile(map_data, max_speed_kh=SPEED_PROFILE_CONFIG['max_speed_kh'],
+                        lateral_accel=SPEED_PROFILE_CONFIG['lateral_accel'], accel=SPEED_PROFILE_CONFIG['accel'],
+                        decel=SPEED_PROFILE_CONFIG['decel'], end_speed_kh=SPEED_PROFILE_CONFIG['end_speed_kh'],
+                        curvature_window=SPEED_PROFILE_CONFIG['curvature_window']):
+    n = len(map_data)
+    v_max = max_speed_kh / 3.6
+    if n == 0:
+        return np.zeros(0)
+    curvature = np.abs(np.asarray(map_data[:, MAP_COLUMNS['curvature']], dtype=np.float64))
+    if curvature_window > 1 and n >= curvature_window:
+        kernel = np.ones(int(curvature_window)) / int(curvature_window)
+        curvature = np.convolve(curvature, kernel, mode='same')
+    limit = np.full(n, v_max)
+    curved = curvature > 1e-9
+    limit[curved] = np.minimum(v_max, np.sqrt(lateral_accel / curvature[curved]))
+    if end_speed_kh is not None:
+        limit[-1] = min(limit[-1], end_speed_kh / 3.6)
+
+    ds = np.diff(np.asarray(map_data[:, MAP_COLUMNS['s']], dtype=np.float64))
+    v = limit.tolist()
+    ds = ds.tolist()
+    for i in range(1, n):
+        v[i] = min(v[i], math.sqrt(v[i - 1] * v[i - 1] + 2.0 * accel * ds[i - 1]))
+    for i in range(n - 2, -1, -1):
+        v[i] = min(v[i], math.sqrt(v[i + 1] * v[i + 1] + 2.0 * decel * ds[i]))
+    return np.array(v)
+
+_shared_lock = threading.Lock()
+_shared_source = None
+_shared_profile = None
+
+# 같은 지도를 쓰는 차량들은 프로파일을 한 번만 계산해 읽기 전용으로 공유한다
+def shared_profile(map_data):
+    global _shared_source, _shared_profile
+    with _shared_lock:
+        if _shared_source is not map_data:
+            _shared_profile = build_speed_profile(map_data)
+            _shared_profile.setflags(write=False)
+            _shared_source = map_data
+            logger.info("Speed profile built: %d stations, min %.1f km/h",
+                        len(_shared_profile), float(_shared_profile.min() * 3.6) if len(_shared_profile) else 0.0)
+        return _shared_profile
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+import bisect
+import logging
+import math
+import numpy as np
+from utils.config import ESTIMATOR_CONFIG
+
+logger = logging.getLogger(__name__)
+
+def _wrap_rad(angle):
+    return (angle + math.pi) % (2.0 * math.pi) - math.pi
+
+# 전차 자세 확장 칼만 필터. 상태 [x, z, yaw(rad), v(m/s), yaw_rate(rad/s)], yaw는 +z가 0, +x가 +90도.
+# 측정은 위치(x, z), 차체 방향(playerBodyX), 속도(playerSpeed).
+# 측정 이력을 보관해 늦게 도착한 샘플은 그 시각으로 되돌아가 이후 측정을 다시 적용한다.
+class PoseEstimator:
+    def __init__(self, history=ESTIMATOR_CONFIG['history'], max_predict=ESTIMATOR_CONFIG['max_predict'],
+                 pos_std=ESTIMATOR_CONFIG['pos_std'], yaw_std_deg=ESTIMATOR_CONFIG['yaw_std_deg'],
+                 speed_std=ESTIMATOR_CONFIG['speed_std'], accel_std=ESTIMATOR_CONFIG['accel_std'],
+                 yaw_accel_std_deg=ESTIMATOR_CONFIG['yaw_accel_std_deg']):
+        self.history_size = history
+        self.max_predict = max_predict
+        self.R = np.diag([pos_std ** 2, pos_std ** 2, math.radians(yaw_std_deg) ** 2, speed_std ** 2])
+        self.accel_var = accel_std ** 2
+        self.yaw_accel_var = math.radians(yaw_accel_std_deg) ** 2
+        self.H = np.zeros((4, 5))
+        self.H[0, 0] = self.H[1, 1] = self.H[2, 2] = self.H[3, 3] = 1.0
+        # 시각 순으로 정렬된 (t, 측정, 사후 상태, 사후 공분산)
+        self.times = []
+        self.entries = []
+        self.clock_offset = None
+        self.stats = {"updates": 0, "out_of_order": 0, "dropped_late": 0}
+
+    @property
+    def initialized(self):
+        return bool(self.entries)
+
+    def reset(self):
+        self.times.clear()
+        self.entries.clear()
+        self.clock_offset = None
+
+    # 패킷에 보낸 쪽 시각이 있으면 서버 시계로 옮긴다 (가장 작은 지연을 보인 패킷 기준 오프셋)
+    def sample_time(self, stamp, arrival):
+        if stamp is None:
+            return arrival
+        offset = arrival - float(stamp)
+        if self.clock_offset is None or offset < self.clock_offset:
+            self.clock_offset = offset
+        return float(stamp) + self.clock_offset
+
+    def _propagate(self, x, P, dt):
+        if dt <= 0:
+            return x, P
+        px, pz, yaw, v, w = x
+        s, c = math.sin(yaw), math.cos(yaw)
+        x = np.array([px + v * s * dt, pz + v * c * dt, _wrap_rad(yaw + w * dt), v, w])
+        F = np.eye(5)
+        F[0, 2] = v * c * dt
+        F[0, 3] = s * dt
+        F[1, 2] = -v * s * dt
+        F[1, 3] = c * dt
+        F[2, 4] = dt
+        # 가속도/각가속도를 백색 잡음으로 보는 이산 공정 잡음
+        G = np.array([[0.5 * s * dt * dt, 0.0], [0.5 * c * dt * dt, 0.0], [0.0, 0.5 * dt * dt], [dt, 0.0], [0.0, dt]])
+        Q = G @ np.diag([self.accel_var, self.yaw_accel_var]) @ G.T
+        return x, F @ P @ F.T + Q
+
+    def _correct(self, x, P, z):
+        y = z - self.H @ x
+        y[2] = _wrap_rad(y[2])
+        S = self.H @ P @ self.H.T + self.R
+        K = P @ self.H.T @ np.linalg.inv(S)
+        x = x + K @ y
+        x[2] = _wrap_rad(x[2])
+        return x, (np.eye(5) - K @ self.H) @ P
+
+    def _initial(self, z):
+        P = np.diag([self.R[0, 0], self.R[1, 1], self.R[2, 2], self.R[3, 3], math.radians(30.0) ** 2])
+        return np.array([z[0], z[1], z[2], z[3], 0.0]), P
+
+    def update(self, t, x, z, yaw_deg, speed):
+        meas = np.array([x, z, math.radians(yaw_deg), speed], dtype=np.float64)
+        i = bisect.bisect_right(self.times, t)
+        if self.entries and i == 0 and len(self.entries) >= self.history_size:
+            # 이력보다 오래된 샘플은 반영할 기준 상태가 없으므로 버린다
+            self.stats["dropped_late"] += 1
+            return False
+        if i < len(self.entries):
+            self.stats["out_of_order"] += 1
+        self.times.insert(i, t)
+        self.entries.insert(i, [t, meas, None, None])
+        # 삽입 위치부터 이후 측정을 다시 적용
+        for j in range(i, len(self.entries)):
+            entry = self.entries[j]
+            if j == 0:
+                entry[2], entry[3] = self._initial(entry[1])
+                continue
+            prev = self.entries[j - 1]
+            xp, Pp = self._propagate(prev[2], prev[3], entry[0] - prev[0])
+            entry[2], entry[3] = self._correct(xp, Pp, entry[1])
+        if len(self.entries) > self.history_size:
+            del self.entries[0]
+            del self.times[0]
+        self.stats["updates"] += 1
+        return True
+
+    # t 시각의 예측 상태 (필터 상태는 바꾸지 않는다). 반환: (x, z, yaw_deg, v, yaw_rate_deg, 예측 구간)
+    def predict(self, t):
+        last = self.entries[-1]
+        horizon = min(max(0.0, t - last[0]), self.max_predict)
+        x, _ = self._propagate(last[2], last[3], horizon)
+        return float(x[0]), float(x[1]), math.degrees(x[2]), float(x[3]), math.degrees(x[4]), t - last[0]
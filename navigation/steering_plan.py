@@ -1,32 +1,46 @@
 # -*- coding: utf-8 -*-
 import logging
-from navigation.pid_controller import PIDDegController
+from controller.pid_controller import PIDBank, PIDDegController
+from utils.config import PID_BANK_CONFIG
 
 logger = logging.getLogger(__name__)
 
+def target_yaw(state):
+    target = state.get('track_yaw_deg')
+    return target if target is not None else state.get('tank_tar_yaw_deg', 0)
+
 class SteeringPlan:
-    def __init__(self, shared, shared_lock):
+    # bank를 넘기면 그 bank의 채널 하나를 쓴다 (속도/조향이 한 bank를 공유)
+    def __init__(self, shared, bank=None, channel=PID_BANK_CONFIG['steer']['channel']):
         self.shared = shared
-        self.shared_lock = shared_lock
+        if bank is None:
+            bank = PIDBank.from_config({'steer': dict(PID_BANK_CONFIG['steer'], channel=0)})
+            channel = 0
         self.pid = PIDDegController(
             kp=self.shared['steer_pid']['kp'],
             ki=self.shared['steer_pid']['ki'],
             kd=self.shared['steer_pid']['kd'],
-            dt=0.1
+            dt=0.1,
+            bank=bank,
+            channel=channel
         )
 
     def plan(self, dt=0.1):
-        with self.shared_lock:
+        with self.shared.section('control') as state:
             # PID 파라미터 업데이트
             self.pid.update_gains(
-                kp=self.shared['steer_pid']['kp'],
-                ki=self.shared['steer_pid']['ki'],
-                kd=self.shared['steer_pid']['kd'],
+                kp=state['steer_pid']['kp'],
+                ki=state['steer_pid']['ki'],
+                kd=state['steer_pid']['kd'],
                 dt=dt
             )
 
-            current_angle = self.shared.get('tank_cur_yaw_deg', 0)
-            target_angle = self.shared.get('tank_tar_yaw_deg', 0)
+            # 추정기가 있으면 제어 시점까지 예측한 차체 방향을 측정값으로 쓴다
+            current_angle = state.get('est_yaw_deg')
+            if current_angle is None:
+                current_angle = state.get('tank_cur_yaw_deg', 0)
+            # 경로 추종 중이면 추종기가 정한 방향, 아니면 운전자가 정한 방향
+            target_angle = target_yaw(state)
             output = self.pid.compute(target_angle, current_angle)
 
             # 조향 업데이트
@@ -35,11 +49,10 @@ class SteeringPlan:
                 new_angle -= 360
             elif new_angle < -180:
                 new_angle += 360
-            self.shared['tank_cur_yaw_deg'] = new_angle
+            state['cmd_yaw_deg'] = new_angle
 
-            logger.info(f"SteeringPlan - Target: {target_angle} deg, Current: {new_angle} deg, Output: {output}")
+            logger.info("SteeringPlan - Target: %s deg, Current: %s deg, Output: %s", target_angle, new_angle, output)
             return new_angle
 
     def reset(self):
-        self.pid.integral = 0.0
-        self.pid.previous_error = 0.0
\ No newline at end of file
+        self.pid.reset()
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+import logging
+import os
+import re
+import threading
+from navigation.navigation import Navigation, navigation
+from navigation.rddf_writer import make_rddf_writer
+from utils.config import RDDF_CONFIG, SHARED, STATE_OWNERS, VEHICLE_CONFIG, initial_state
+from utils.map_loader import MAP_STATE_KEYS
+from utils.state_store import StateStore
+
+logger = logging.getLogger(__name__)
+
+VEHICLE_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+# RDDF 기록기 통계 중 계속 늘기만 하는 값 (/metrics에 <이름>_total counter로, 나머지는 gauge로 내보낸다)
+RDDF_WRITER_COUNTERS = ("enqueued", "dropped", "written", "flushes", "fsyncs", "rotations", "errors", "restarts",
+                        "blocks")
+
+# 차량마다 따로 디렉터리를 써서 기본 로그의 백업 정리나 세그먼트와 파일 이름이 겹치지 않게 한다
+# (data/logs/rddf.csv -> data/logs/vehicles/<id>/rddf.csv)
+def vehicle_rddf_filename(vehicle_id, filename=RDDF_CONFIG['filename']):
+    directory, name = os.path.split(filename)
+    return os.path.join(directory, "vehicles", vehicle_id, name)
+
+# 새 차량 상태: 초기 상태 + 기본 차량의 지도 배열(참조 공유)과 물려받는 설정
+def new_vehicle_state(base_shared=SHARED):
+    base = base_shared.snapshot()
+    state = initial_state()
+    for key in MAP_STATE_KEYS + tuple(VEHICLE_CONFIG['inherit_keys']):
+        state[key] = base.get(key, state.get(key))
+    return StateStore(state, owners=STATE_OWNERS)
+
+class Vehicle:
+    def __init__(self, vehicle_id, shared, navigation):
+        self.vehicle_id = vehicle_id
+        self.shared = shared
+        self.navigation = navigation
+
+# vehicle_id별 상태 샤드 (StateStore + Navigation) 관리.
+# 차량마다 StateStore가 따로 있어 도메인 락도 차량별이므로 차량끼리 서로를 기다리지 않는다.
+# 지도 배열과 지도 인덱스 그리드는 기본 차량의 것을 읽기 전용으로 공유한다.
+class VehicleRegistry:
+    def __init__(self, default_shared=SHARED, default_navigation=None, default_id=VEHICLE_CONFIG['default_id'],
+                 max_vehicles=VEHICLE_CONFIG['max_vehicles']):
+        self.default_shared = default_shared
+        self.default_id = default_id
+        self.max_vehicles = max_vehicles
+        self.running = False
+        self._create_lock = threading.Lock()
+        self._vehicles = {}
+        if default_navigation is not None:
+            self._vehicles[default_id] = Vehicle(default_id, default_shared, default_navigation)
+
+    # 조회는 락 없이 dict에서 바로 한다. 처음 보는 id만 생성 락 하나를 잡고 개수 확인과 등록을 함께 하므로
+    # max_vehicles를 넘지 않는다. 등록은 새 dict로 바꿔 끼워서 순회 중인 쪽이 영향을 받지 않는다.
+    def get(self, vehicle_id=None):
+        vehicle_id = vehicle_id or self.default_id
+        vehicle = self._vehicles.get(vehicle_id)
+        if vehicle is not None:
+            return vehicle
+        if not VEHICLE_ID_PATTERN.match(str(vehicle_id)):
+            raise ValueError(f"invalid vehicle_id: {vehicle_id!r}")
+        with self._create_lock:
+            vehicle = self._vehicles.get(vehicle_id)
+            if vehicle is None:
+                if len(self._vehicles) >= self.max_vehicles:
+                    raise ValueError(f"too many vehicles (max {self.max_vehicles})")
+                vehicle = self._create(vehicle_id)
+                self._vehicles = {**self._vehicles, vehicle_id: vehicle}
+        return vehicle
+
+    def _create(self, vehicle_id):
+        shared = new_vehicle_state(self.default_shared)
+        vehicle_navigation = Navigation(shared, make_rddf_writer(vehicle_rddf_filename(vehicle_id)), vehicle_id)
+        if self.running:
+            vehicle_navigation.start()
+        logger.info("VehicleRegistry - vehicle %s registered (%d total)", vehicle_id, len(self._vehicles) + 1)
+        return Vehicle(vehicle_id, shared, vehicle_navigation)
+
+    def ids(self):
+        return sorted(self._vehicles)
+
+    def __contains__(self, vehicle_id):
+        return vehicle_id in self._vehicles
+
+    def __len__(self):
+        return len(self._vehicles)
+
+    # 이미 등록된 차량과 이후 등록되는 차량 모두 스케줄러를 돌린다
+    def start(self):
+        self.running = True
+        for vehicle in list(self._vehicles.values()):
+            if not vehicle.navigation.running:
+                vehicle.navigation.start()
+
+    # /metrics 수집 함수: 차량별 상태 락 대기/보유 시간, 제어 루프 주기/지연, RDDF 기록 큐 통계
+    def collect_metrics(self):
+        for vehicle_id, vehicle in sorted(self._vehicles.items()):
+            for (domain, site), (wait, hold) in sorted(vehicle.shared.lock_stats.items()):
+                labels = {"vehicle": vehicle_id, "domain": domain, "site": site}
+                yield ("histogram", "state_lock_wait_seconds", "Time spent waiting for a state section lock",
+                       labels, wait.snapshot())
+                yield ("histogram", "state_lock_hold_seconds", "Time a state section lock was held",
+                       labels, hold.snapshot())
+            yield ("gauge", "state_version", "Current state snapshot version", {"vehicle": vehicle_id},
+                   vehicle.shared.version)
+            for task, stats in vehicle.navigation.scheduler.get_stats().items():
+                labels = {"vehicle": vehicle_id, "task": task}
+                yield ("histogram", "scheduler_period_seconds", "Actual period between task runs",
+                       labels, stats['period_ms'])
+                yield ("histogram", "scheduler_jitter_seconds", "Task start lag behind its deadline",
+                       labels, stats['jitter_ms'])
+                yield ("histogram", "scheduler_exec_seconds", "Task execution time", labels, stats['exec_ms'])
+                for name in ("runs", "overruns", "skipped", "errors"):
+                    yield ("counter", f"scheduler_{name}_total", f"Scheduler task {name}", labels, stats[name])
+            writer = vehicle.navigation.rddf.writer
+            for name, value in getattr(writer, "get_stats", dict)().items():
+                if not isinstance(value, (int, float)):
+                    continue
+                if name in RDDF_WRITER_COUNTERS:
+                    yield ("counter", f"rddf_writer_{name}_total", f"RDDF writer {name}", {"vehicle": vehicle_id}, value)
+                else:
+                    yield ("gauge", f"rddf_writer_{name}", f"RDDF writer {name}", {"vehicle": vehicle_id}, value)
+
+    def shutdown(self):
+        self.running = False
+        for vehicle in list(self._vehicles.values()):
+            vehicle.navigation.shutdown()
+
+registry = VehicleRegistry(SHARED, navigation)
@@ -1,17 +1,79 @@
-import threading
 import matplotlib.pyplot as plt
 from matplotlib.animation import FuncAnimation
-import pandas as pd
+import argparse
+import http.client
+import json
 import logging
-from utils.config import SHARED
+import threading
+from collections import deque
+from types import SimpleNamespace
+from urllib.parse import urlencode
+from utils.config import LOD_CONFIG, RDDF_CONFIG, SERVER_CONFIG, VEHICLE_CONFIG
+from utils.lod import TrajectoryLOD
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# 서버의 /stream(SSE)을 읽어 이벤트 버스 구독과 같은 drain() 인터페이스로 넘긴다.
+# 스트림은 바뀐 필드만 보내므로 (종류, 차량)별로 합쳐 둔 전체 값을 이벤트로 만든다.
+class SseSubscription:
+    def __init__(self, host=SERVER_CONFIG['host'], port=SERVER_CONFIG['flask_port'], types=("pose",), vehicle_id=None):
+        query = {"types": ",".join(types)}
+        if vehicle_id:
+            query["vehicle_id"] = vehicle_id
+        self.path = "/stream?" + urlencode(query)
+        self.host = host
+        self.port = port
+        self.closed = False
+        self._events = deque(maxlen=RDDF_CONFIG['max_rows'])
+        self._state = {}
+        self._lock = threading.Lock()
+        threading.Thread(target=self._run, name="sse-client", daemon=True).start()
+
+    def _run(self):
+        conn = http.client.HTTPConnection(self.host, self.port)
+        conn.request("GET", self.path, headers={"Accept": "text/event-stream"})
+        response = conn.getresponse()
+        event_type, data = None, None
+        while not self.closed:
+            line = response.readline()
+            if not line:
+                break
+            line = line.decode("utf-8").rstrip("\n")
+            if line.startswith("event:"):
+                event_type = line[6:].strip()
+            elif line.startswith("data:"):
+                data = json.loads(line[5:])
+            elif not line and event_type and data is not None:
+                key = (event_type, data.get("vehicle"))
+                merged = dict(self._state.get(key, {}), **data)
+                self._state[key] = merged
+                with self._lock:
+                    self._events.append(SimpleNamespace(type=event_type, vehicle=key[1], data=merged))
+                event_type, data = None, None
+        self.closed = True
+        logger.warning("Event stream %s closed", self.path)
+
+    def drain(self, timeout=None):
+        with self._lock:
+            events = list(self._events)
+            self._events.clear()
+            return events
+
+    def close(self):
+        self.closed = True
+
+# pose 이벤트를 구독해 받은 점만 궤적에 더한다 (공유 상태를 읽지 않는다)
+# subscription은 utils.event_bus.BUS.subscribe(("pose",)) 또는 SseSubscription
+# 궤적은 단순화 수준별로 보관하고, 그릴 때는 현재 축 범위에 보이는 점이 max_points 이하인 수준을 고른다
 class RddfRealtimePlotter:
-    def __init__(self, shared_lock, interval=500):
-        self.shared_lock = shared_lock
+    def __init__(self, subscription, interval=500, max_points=LOD_CONFIG['max_points']):
+        self.subscription = subscription
         self.interval = interval
+        self.max_points = max_points
+        self.trajectory = TrajectoryLOD(LOD_CONFIG['levels'], LOD_CONFIG['trajectory_capacity'],
+                                        LOD_CONFIG['window'])
+        self.last_pos = None
         self.fig, self.ax = plt.subplots(figsize=(8, 6))
         self.line, = self.ax.plot([], [], 'b.-', label='RDDF Trajectory')
         self.current_pos, = self.ax.plot([], [], 'ro', label='Current Position', markersize=10)
@@ -27,39 +89,40 @@ class RddfRealtimePlotter:
         self.ax.legend()
 
     def update(self, frame):
-        with self.shared_lock:
-            rddf_data = SHARED.get('rddf_data', [])
-            if 'pre_playerPos' not in SHARED or not all(key in SHARED['pre_playerPos'] for key in ['x', 'z']):
-                logger.warning("pre_playerPos not properly initialized, using default values")
-                current_pos = (0, 0)
-            else:
-                current_pos = (SHARED['pre_playerPos']['x'], SHARED['pre_playerPos']['z'])
+        events = [event for event in self.subscription.drain() if event.type == "pose"]
+        if not events:
+            return self.line, self.current_pos
+        for event in events:
+            self.trajectory.append(event.data['x'], event.data['z'])
+            self.last_pos = (event.data['x'], event.data['z'])
 
-        if rddf_data:
-            df_rddf = pd.DataFrame(rddf_data, columns=['x', 'z', 'y', 'speed'])
-            rddf_x = df_rddf['x'].values
-            rddf_z = df_rddf['z'].values
-            self.line.set_data(rddf_x, rddf_z)
-        else:
-            self.line.set_data([], [])
-
-        self.current_pos.set_data([current_pos[0]], [current_pos[1]])
+        (x0, x1), (z0, z1) = self.ax.get_xlim(), self.ax.get_ylim()
+        xs, zs = self.trajectory.select((x0, x1, z0, z1), self.max_points)
+        self.line.set_data(xs, zs)
+        self.current_pos.set_data([self.last_pos[0]], [self.last_pos[1]])
         return self.line, self.current_pos
 
     def run(self):
-        ani = FuncAnimation(self.fig, self.update, interval=self.interval, blit=True)
+        self.animation = FuncAnimation(self.fig, self.update, interval=self.interval, blit=True,
+                                       cache_frame_data=False)
         plt.show()
 
-def run_rddf_realtime_plot(shared_lock):
+def run_rddf_realtime_plot(subscription=None):
     try:
-        plotter = RddfRealtimePlotter(shared_lock)
+        if subscription is None:
+            subscription = SseSubscription()
+        plotter = RddfRealtimePlotter(subscription)
         # Matplotlib의 GUI는 메인 스레드에서 실행되도록 함
-        plt.show()
+        plotter.run()
     except Exception as e:
-        logger.error(f"Error in RDDF real-time plotter: {str(e)}")
+        logger.error("Error in RDDF real-time plotter: %s", e)
 
 # Run plotter in main thread
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default=SERVER_CONFIG['host'])
+    parser.add_argument("--port", type=int, default=SERVER_CONFIG['flask_port'])
+    parser.add_argument("--vehicle-id", default=VEHICLE_CONFIG['default_id'])
+    args = parser.parse_args()
     # 여기서 main thread에서 실행하도록 보장합니다.
-    shared_lock = threading.Lock()
-    run_rddf_realtime_plot(shared_lock)
+    run_rddf_realtime_plot(SseSubscription(args.host, args.port, vehicle_id=args.vehicle_id))
@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import json
+import logging
+import time
+from urllib.parse import parse_qs
+from navigation.vehicle_registry import registry
+from server.event_stream import SSE_HEADERS, StreamEncoder, subscribe_from_query
+from utils.config import EVENT_CONFIG, SERVER_CONFIG
+from utils.metrics import METRICS
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Flask 개발 서버 대신 사용하는 asyncio 기반 HTTP/1.1 서버 (keep-alive 지원)
+# 제어 핸들러는 짧고 동기적이므로 스레드 전환 없이 이벤트 루프에서 바로 실행한다.
+# 그동안 다른 연결은 기다리므로, 핸들러에 디스크 I/O나 긴 계산을 넣으면 안 된다 (RDDF 기록과 경로 계획은 별도 스레드).
+
+MAX_HEADER_BYTES = 16 * 1024
+MAX_BODY_BYTES = 1024 * 1024
+
+REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    500: "Internal Server Error"
+}
+
+METRICS.register_collector(registry.collect_metrics)
+
+# JSON이 아닌 본문 (예: /metrics의 Prometheus 텍스트)
+class RawResponse:
+    def __init__(self, body, content_type):
+        self.body = body
+        self.content_type = content_type
+
+# 이벤트 스트림 응답 (연결을 닫을 때까지 SSE 청크를 계속 보낸다)
+class StreamResponse:
+    def __init__(self, subscription):
+        self.subscription = subscription
+
+class HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+# 핸들러는 (본문, vehicle_id)를 받는다. vehicle_id가 None이면 기본 차량.
+def handle_info(body, vehicle_id):
+    if vehicle_id is None and isinstance(body, dict):
+        vehicle_id = body.get("vehicle_id")
+    registry.get(vehicle_id).navigation.update_info(body)
+    return {"status": "success"}
+
+def handle_get_move(body, vehicle_id):
+    return registry.get(vehicle_id).navigation.get_move()
+
+# 한 번의 요청으로 여러 동작을 처리한다: [{"path": "/info", "body": {...}}, {"path": "/get_move"}]
+# 각 동작에 "vehicle_id"를 주면 여러 차량을 한 요청으로 처리할 수 있다.
+def handle_batch(body, vehicle_id):
+    if not isinstance(body, list):
+        raise HttpError(400, "batch body must be a list")
+    results = []
+    for op in body:
+        route = ROUTES.get(op.get("path")) if isinstance(op, dict) else None
+        if route is None or route[1] in (handle_batch, handle_metrics, handle_stream):
+            results.append({"status": "error", "error": "unknown path"})
+            continue
+        try:
+            results.append(route[1](op.get("body") or {}, op.get("vehicle_id", vehicle_id)))
+        except ValueError as e:
+            results.append({"status": "error", "error": str(e)})
+    return results
+
+def handle_obstacles(body, vehicle_id):
+    if vehicle_id is None and isinstance(body, dict):
+        vehicle_id = body.get("vehicle_id")
+    result = registry.get(vehicle_id).navigation.update_obstacles(body)
+    return dict(result, status="success")
+
+# 이벤트 스트림은 쿼리로 구독 조건을 받으므로 dispatch에서 따로 처리한다
+def handle_stream(body, vehicle_id, query=""):
+    return StreamResponse(subscribe_from_query(query))
+
+def handle_metrics(body, vehicle_id):
+    return RawResponse(METRICS.render().encode("utf-8"), "text/plain; version=0.0.4")
+
+ROUTES = {
+    "/info": ("POST", handle_info),
+    "/get_move": ("GET", handle_get_move),
+    "/obstacles": ("POST", handle_obstacles),
+    "/batch": ("POST", handle_batch),
+    "/stream": ("GET", handle_stream),
+    "/metrics": ("GET", handle_metrics)
+}
+
+def dispatch(method, path, body):
+    path, _, query = path.partition("?")
+    route = ROUTES.get(path)
+    if route is None:
+        raise HttpError(404, f"no route for {path}")
+    if method != route[0]:
+        raise HttpError(405, f"{method} not allowed on {path}")
+    if route[1] is handle_stream:
+        return handle_stream(None, None, query)
+    vehicle_id = parse_qs(query).get("vehicle_id", [None])[0] if query else None
+    payload = json.loads(body) if body else {}
+    return route[1](payload, vehicle_id)
+
+def build_response(status, payload, keep_alive):
+    if isinstance(payload, RawResponse):
+        body, content_type = payload.body, payload.content_type
+    else:
+        body, content_type = json.dumps(payload).encode("utf-8"), "application/json"
+    head = (
+        f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+        f"Content-Type: {content_type}\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    return head.encode("latin-1") + body
+
+# 전송 주기마다 쌓인 이벤트를 꺼내 보낸다 (구독 큐는 논블로킹으로만 읽어 이벤트 루프를 막지 않는다)
+async def write_stream(writer, subscription, interval=EVENT_CONFIG['stream_interval']):
+    head = "HTTP/1.1 200 OK\r\n" + "".join(f"{name}: {value}\r\n" for name, value in SSE_HEADERS.items())
+    writer.write((head + "Connection: close\r\n\r\n: connected\n\n").encode("latin-1"))
+    encoder = StreamEncoder(subscription)
+    try:
+        await writer.drain()
+        while not subscription.closed:
+            await asyncio.sleep(interval)
+            chunk = encoder.next_chunk(subscription.drain())
+            if chunk:
+                writer.write(chunk.encode("utf-8"))
+                await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        subscription.close()
+
+async def read_request(reader):
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except asyncio.LimitOverrunError:
+        raise HttpError(413, "header too large")
+    lines = head.decode("latin-1").split("\r\n")
+    try:
+        method, path, version = lines[0].split(" ", 2)
+    except ValueError:
+        raise HttpError(400, "malformed request line")
+    headers = {}
+    for line in lines[1:]:
+        if ":" in line:
+            name, value = line.split(":", 1)
+            headers[name.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get("content-length", 0) or 0)
+    except ValueError:
+        raise HttpError(400, "bad content-length")
+    if length < 0:
+        raise HttpError(400, "bad content-length")
+    if length > MAX_BODY_BYTES:
+        raise HttpError(413, "body too large")
+    body = await reader.readexactly(length) if length else b""
+    connection = headers.get("connection", "").lower()
+    keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+    return method, path, body, keep_alive
+
+async def handle_connection(reader, writer):
+    try:
+        while True:
+            try:
+                method, path, body, keep_alive = await read_request(reader)
+            except (asyncio.IncompleteReadError, ConnectionError):
+                break
+            except HttpError as e:
+                writer.write(build_response(e.status, {"status": "error", "error": e.message}, False))
+                break
+            started = time.perf_counter()
+            try:
+                status, payload = 200, dispatch(method, path, body)
+            except HttpError as e:
+                status, payload = e.status, {"status": "error", "error": e.message}
+            except ValueError as e:
+                status, payload = 400, {"status": "error", "error": str(e)}
+            except Exception as e:
+                logger.error("Error handling %s %s: %s", method, path, e)
+                status, payload = 500, {"status": "error", "error": "internal error"}
+            endpoint = path.split("?", 1)[0]
+            METRICS.observe("http_request_duration_seconds", (time.perf_counter() - started) * 1000.0,
+                            "Control endpoint latency", server="async",
+                            endpoint=endpoint if endpoint in ROUTES else "unmatched", status=str(status))
+            if isinstance(payload, StreamResponse):
+                await write_stream(writer, payload.subscription)
+                break
+            writer.write(build_response(status, payload, keep_alive))
+            await writer.drain()
+            if not keep_alive:
+                break
+    finally:
+        writer.close()
+
+async def serve(host, port, ready=None):
+    server = await asyncio.start_server(handle_connection, host, port, limit=MAX_HEADER_BYTES)
+    logger.info("Async control server listening on %s:%s", host, port)
+    if ready is not None:
+        ready.set()
+    async with server:
+        await server.serve_forever()
+
+def run_async_server(host=SERVER_CONFIG['host'], port=None, ready=None):
+    asyncio.run(serve(host, port or SERVER_CONFIG['flask_port'], ready))
@@ -0,0 +1,355 @@
+# -*- coding: utf-8 -*-
+# 대시보드가 상태를 읽고 튜닝 값을 쓰는 통로.
+# - LocalStateSource: 같은 프로세스 (기존 스레드 모드). 차량 StateStore를 직접 읽고 쓴다.
+# - DashBridge + ShmStateSource: 별도 프로세스 모드.
+#   제어 프로세스의 발행 스레드가 대시보드가 보고 있는 차량의 스냅샷만 피클해 공유 메모리(seqlock)에 쓰고,
+#   대시 프로세스는 그 영역을 읽기만 한다. 슬라이더/PID 변경과 "이 차량을 보고 있다"는 알림은 명령 큐로 보낸다.
+#   정적 지도는 프로세스를 띄울 때 한 번만 넘기고, 시계열 버퍼는 최근 발행 몇 번치의 증분(since)만,
+#   나머지 값은 그 사이에 바뀐 것만 보낸다. 대시 프로세스는 받은 증분을 자기 사본에 이어 붙이고,
+#   빠진 구간이 있으면 전체 재전송("sync")을 요청한다.
+#   대시 프로세스가 영역을 읽을 때마다 헤더의 heartbeat를 갱신하고, 한동안 읽지 않으면 발행을 멈춘다.
+#   그래프를 만드는 일은 전부 대시 프로세스에서 하므로 제어 프로세스의 GIL을 쓰지 않는다.
+import logging
+import multiprocessing
+import pickle
+import queue
+import threading
+import time
+from collections import deque
+from types import MappingProxyType
+import numpy as np
+from utils.config import DASH_PROCESS_CONFIG, GRAPH_CONFIG, VEHICLE_CONFIG, initial_state
+from utils.metrics import METRICS
+from utils.shm_state import SeqlockRegion
+from utils.state_store import Snapshot
+
+logger = logging.getLogger(__name__)
+
+# 대시보드 콜백이 읽는 상태 키
+DASH_STATE_KEYS = (
+    "vel_data", "del_playerPos", "rddf_data", "rddf_lod", "tank_cur_vel_ms", "tank_tar_vel_kh",
+    "tank_cur_yaw_deg", "tank_tar_yaw_deg", "pre_playerPos", "destination", "obstacles", "path", "nearest_point",
+    "error_distance", "vel_pid", "steer_pid", "map_points", "track_yaw_deg"
+)
+# 증분으로 보내는 시계열 버퍼 (rddf_lod는 rddf_data 증분으로 대시 프로세스가 직접 이어 만든다)
+DASH_BUFFER_KEYS = ("vel_data", "del_playerPos", "rddf_data")
+# 대시보드가 바꿀 수 있는 키 (명령 큐로 들어온 나머지 키는 버린다)
+COMMAND_KEYS = ("tank_tar_vel_kh", "tank_tar_yaw_deg", "vel_pid", "steer_pid")
+
+class LocalStateSource:
+    def __init__(self, registry):
+        self.registry = registry
+
+    @property
+    def default_id(self):
+        return self.registry.default_id
+
+    def ids(self):
+        return self.registry.ids()
+
+    def snapshot(self, vehicle_id):
+        return self.registry.get(vehicle_id).shared.snapshot()
+
+    def update(self, vehicle_id, updates):
+        with self.registry.get(vehicle_id).shared.section('tuning') as state:
+            state.update(updates)
+
+# 대시보드에 보낼 값만 추린다 (지도 memmap은 일반 배열로, 목록은 그래프에 그리는 만큼만).
+# cursors가 있으면 버퍼는 그 seq 이후의 증분만, static_map과 같은 지도는 빼고 보낸다.
+# sent(그 cursors 때의 스냅샷)가 있으면 그때와 같은 객체인 값도 뺀다.
+# 반환: (상태, 버퍼별 현재 seq)
+def export_state(snapshot, cursors=None, static_map=None, sent=None):
+    state = {key: snapshot.get(key) for key in DASH_STATE_KEYS}
+    if cursors is not None and sent is not None:
+        for key in DASH_STATE_KEYS:
+            if key not in DASH_BUFFER_KEYS and key in sent and sent[key] is state[key]:
+                del state[key]
+    if 'map_points' in state:
+        if state['map_points'] is static_map:
+            del state['map_points']
+        elif state['map_points'] is not None:
+            state['map_points'] = np.asarray(state['map_points'])
+    if 'obstacles' in state:
+        state['obstacles'] = list(state['obstacles'] or ())[:GRAPH_CONFIG['max_obstacles']]
+    if 'path' in state:
+        state['path'] = list(state['path'] or ())[:GRAPH_CONFIG['max_path_points']]
+    seqs = {key: state[key].seq for key in DASH_BUFFER_KEYS}
+    if cursors is None:
+        # 전체 상태의 궤적 LOD는 링에 쌓인 행까지 따라잡은 뒤 보낸다
+        state['rddf_lod'].catch_up(state['rddf_data'])
+        return state, seqs
+    state.pop('rddf_lod', None)
+    state['deltas'] = {key: state.pop(key).since(cursors[key]) for key in DASH_BUFFER_KEYS}
+    seqs = {key: delta[0] for key, delta in state['deltas'].items()}
+    return state, seqs
+
+class DashBridge:
+    def __init__(self, registry, shm_bytes=DASH_PROCESS_CONFIG['shm_bytes'],
+                 publish_hz=DASH_PROCESS_CONFIG['publish_hz'], watch_ttl=DASH_PROCESS_CONFIG['watch_ttl'],
+                 queue_size=DASH_PROCESS_CONFIG['command_queue_size'],
+                 delta_history=DASH_PROCESS_CONFIG['delta_history'], reader_ttl=DASH_PROCESS_CONFIG['reader_ttl']):
+        self.registry = registry
+        self.period = 1.0 / publish_hz
+        self.watch_ttl = watch_ttl
+        self.reader_ttl = reader_ttl
+        self.region = SeqlockRegion(size=shm_bytes, create=True)
+        self.context = multiprocessing.get_context('spawn')
+        self.commands = self.context.Queue(maxsize=queue_size)
+        self.process = None
+        self.stats = {"publishes": 0, "skipped": 0, "idle": 0, "commands": 0, "rejected": 0, "full_exports": 0}
+        # 기본 차량은 항상 발행한다
+        self._watched = {registry.default_id: float('inf')}
+        self._blobs = {}
+        # 차량별 최근 발행의 (발행 번호, 버퍼 seq들, 스냅샷).
+        # 증분은 가장 오래된 것 이후로 보내 대시가 몇 번 놓쳐도 이어 붙일 수 있다.
+        self.delta_history = delta_history
+        self._cursors = {}
+        self._exports = 0
+        self._resync = set()
+        # 정적 지도는 프로세스 시작 인자로 한 번만 넘긴다
+        self._static_map = registry.get(registry.default_id).shared.get('map_points', None)
+        self._last_key = None
+        self._stop = threading.Event()
+        self._threads = []
+        METRICS.register_collector(self.collect_metrics)
+
+    def start(self, target=None, args=()):
+        self.publish(force=True)
+        for name, loop in (("dash-publisher", self._publish_loop), ("dash-commands", self._command_loop)):
+            thread = threading.Thread(target=loop, name=name, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        if target is None:
+            from server.dash_server import run_dash_process
+            static = {"map_points": np.asarray(self._static_map) if self._static_map is not None else None}
+            target, args = run_dash_process, (self.region.name, self.commands, static)
+        self.process = self.context.Process(target=target, args=args, name="dash", daemon=True)
+        self.process.start()
+        logger.info("Dash process started (pid %s, shm %s)", self.process.pid, self.region.name)
+
+    def _vehicle_entry(self, vehicle_id, now):
+        snapshot = self.registry.get(vehicle_id).shared.snapshot()
+        if self._watched.get(vehicle_id, 0.0) < now:
+            self._blobs.pop(vehicle_id, None)
+            self._cursors.pop(vehicle_id, None)
+            return snapshot.version, None
+        cached = self._blobs.get(vehicle_id)
+        if cached is None or cached[0] != snapshot.version or vehicle_id in self._resync:
+            cached = self._blobs[vehicle_id] = (snapshot.version, pickle.dumps(self._export(vehicle_id, snapshot),
+                                                                               protocol=5))
+        return cached
+
+    # 처음 보거나 재전송 요청이 있으면 전체, 아니면 기록된 가장 오래된 발행 이후의 증분.
+    # 'export'는 (증분의 기준 발행 번호, 이번 발행 번호)이고, 전체 상태면 기준은 None이다.
+    def _export(self, vehicle_id, snapshot):
+        self._exports += 1
+        history = self._cursors.get(vehicle_id)
+        full = history is None or vehicle_id in self._resync
+        if full:
+            self._resync.discard(vehicle_id)
+            history = self._cursors[vehicle_id] = deque(maxlen=self.delta_history)
+            self.stats["full_exports"] += 1
+            state, seqs = export_state(snapshot, None, self._static_map)
+            state['export'] = (None, self._exports)
+        else:
+            base, cursors, sent = history[0]
+            state, seqs = export_state(snapshot, cursors, self._static_map, sent)
+            state['export'] = (base, self._exports)
+        history.append((self._exports, seqs, snapshot))
+        return state
+
+    # 지켜보는 차량은 (버전, 피클된 상태), 나머지는 (버전, None). 바뀐 것이 없으면 쓰지 않는다.
+    # 대시 프로세스가 reader_ttl 동안 읽지 않았으면 피클하지 않고, 다시 붙으면 전체 상태부터 보낸다.
+    def publish(self, force=False):
+        started = time.perf_counter()
+        now = time.monotonic()
+        if not force and now - self.region.heartbeat() > self.reader_ttl:
+            if self._cursors:
+                self._blobs.clear()
+                self._cursors.clear()
+                self._last_key = None
+            self.stats["idle"] += 1
+            return False
+        vehicles = {vid: self._vehicle_entry(vid, now) for vid in self.registry.ids()}
+        # 버전이 같아도 재전송한 전체 상태는 써야 하므로 전체 전송 횟수도 키에 넣는다
+        key = tuple((vid, version, blob is not None) for vid, (version, blob) in vehicles.items()) + (
+            self.stats["full_exports"],)
+        if key == self._last_key:
+            self.stats["skipped"] += 1
+            return False
+        payload = pickle.dumps({"default_id": self.registry.default_id, "vehicles": vehicles}, protocol=5)
+        try:
+            self.region.write(payload)
+        except ValueError as e:
+            logger.warning("Dash state not published: %s", e)
+            return False
+        self._last_key = key
+        self.stats["publishes"] += 1
+        METRICS.observe("dash_publish_duration_seconds", (time.perf_counter() - started) * 1000.0,
+                        "Time to export dashboard state into shared memory")
+        return True
+
+    def _publish_loop(self):
+        while not self._stop.wait(self.period):
+            try:
+                self.publish()
+            except Exception as e:
+                logger.error("Dash state publish failed: %s", e)
+
+    def apply(self, command):
+        kind, vehicle_id = command[0], command[1]
+        if vehicle_id not in self.registry:
+            self.stats["rejected"] += 1
+            return
+        if kind == "watch":
+            self._watched[vehicle_id] = max(self._watched.get(vehicle_id, 0.0), time.monotonic() + self.watch_ttl)
+        elif kind == "sync":
+            self._resync.add(vehicle_id)
+        elif kind == "set":
+            updates = {key: value for key, value in command[2].items() if key in COMMAND_KEYS}
+            if not updates:
+                self.stats["rejected"] += 1
+                return
+            with self.registry.get(vehicle_id).shared.section('tuning') as state:
+                state.update(updates)
+        else:
+            self.stats["rejected"] += 1
+            return
+        self.stats["commands"] += 1
+
+    def _command_loop(self):
+        while not self._stop.is_set():
+            try:
+                command = self.commands.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            except (EOFError, OSError):
+                break
+            try:
+                self.apply(command)
+            except Exception as e:
+                logger.error("Dash command %r failed: %s", command, e)
+
+    def collect_metrics(self):
+        for name, value in self.stats.items():
+            yield "counter", f"dash_bridge_{name}_total", "Dashboard bridge events", {}, value
+        alive = self.process is not None and self.process.is_alive()
+        yield "gauge", "dash_process_up", "Dashboard process is running", {}, 1 if alive else 0
+
+    def stop(self):
+        self._stop.set()
+        if self.process is not None and self.process.is_alive():
+            self.process.terminate()
+            self.process.join(timeout=2.0)
+        for thread in self._threads:
+            thread.join(timeout=1.0)
+        self.region.close()
+
+# 대시 프로세스 쪽. 영역의 seq가 바뀌었을 때만 목록을 다시 읽고, 차량 상태는 (차량, 버전)마다 한 번만 푼다.
+# 버퍼는 차량별 사본을 두고 증분을 이어 붙인다.
+class ShmStateSource:
+    def __init__(self, region_name, commands, static=None, watch_interval=DASH_PROCESS_CONFIG['watch_interval']):
+        self.region = SeqlockRegion(region_name)
+        self.commands = commands
+        self.static = dict(static or {})
+        self._buffers = {}
+        self._merged = {}  # 차량 -> 마지막으로 이어 붙인 발행 번호
+        self.watch_interval = watch_interval
+        self._lock = threading.Lock()
+        self._seq = None
+        self._default_id = VEHICLE_CONFIG['default_id']
+        self._vehicles = {}
+        self._states = {}  # 차량 -> (마지막으로 푼 피클, 스냅샷)
+        self._last_watch = {}
+        self._empty = Snapshot(-1, MappingProxyType(initial_state()))
+
+    def _refresh(self):
+        self.region.touch()
+        if self.region.seq() == self._seq:
+            return
+        result = self.region.read()
+        if result is None or result[1] is None:
+            return
+        seq, payload = result
+        index = pickle.loads(payload)
+        with self._lock:
+            self._seq = seq
+            self._default_id = index["default_id"]
+            self._vehicles = index["vehicles"]
+
+    @property
+    def default_id(self):
+        self._refresh()
+        return self._default_id
+
+    def ids(self):
+        self._refresh()
+        return sorted(self._vehicles)
+
+    def _send(self, command):
+        try:
+            self.commands.put_nowait(command)
+        except queue.Full:
+            logger.warning("Dash command queue full, dropping %s", command[0])
+
+    def _watch(self, vehicle_id):
+        now = time.monotonic()
+        if now - self._last_watch.get(vehicle_id, -self.watch_interval) >= self.watch_interval:
+            self._last_watch[vehicle_id] = now
+            self._send(("watch", vehicle_id))
+
+    # 아직 발행되지 않은 차량은 빈 상태(버전 -1)를 돌려주고, 다음 발행부터 실제 상태가 온다
+    def snapshot(self, vehicle_id):
+        self._refresh()
+        vehicle_id = vehicle_id or self._default_id
+        self._watch(vehicle_id)
+        with self._lock:
+            version, blob = self._vehicles.get(vehicle_id, (None, None))
+            cached = self._states.get(vehicle_id)
+        if blob is None:
+            return cached[1] if cached is not None else self._empty
+        # 재전송한 전체 상태는 버전이 같을 수 있으므로 받은 내용으로 비교한다
+        if cached is None or cached[0] != blob:
+            with self._lock:
+                cached = self._states.get(vehicle_id)
+                if cached is None or cached[0] != blob:
+                    cached = self._states[vehicle_id] = (blob, Snapshot(version, MappingProxyType(
+                        self._merge(vehicle_id, pickle.loads(blob)))))
+        return cached[1]
+
+    # 전체 상태면 사본을 바꾸고, 증분이면 이전 상태에 바뀐 값과 버퍼 증분을 이어 붙인다.
+    # 증분의 기준 발행을 받은 적이 없으면 (빠진 구간이 있으면) 전체 재전송을 요청한다.
+    def _merge(self, vehicle_id, state):
+        base, number = state.pop('export')
+        deltas = state.pop('deltas', None)
+        merged_state = dict(self.static)
+        if deltas is None:
+            buffers = self._buffers[vehicle_id] = {key: state.pop(key) for key in DASH_BUFFER_KEYS + ("rddf_lod",)}
+            merged = True
+        else:
+            previous = self._states.get(vehicle_id)
+            if previous is not None:
+                merged_state.update(previous[1].data)
+            buffers = self._buffers.get(vehicle_id)
+            last = self._merged.get(vehicle_id)
+            if buffers is None:
+                # 전체 상태를 아직 못 받았으면 빈 버퍼로 그리며 기다린다
+                fresh = initial_state()
+                buffers = {key: fresh[key] for key in DASH_BUFFER_KEYS + ("rddf_lod",)}
+                merged = False
+            else:
+                merged = last is not None and last >= base and all(
+                    buffers[key].merge(*delta) for key, delta in deltas.items())
+                rddf = deltas.get('rddf_data')
+                if merged and rddf is not None:
+                    merged = buffers['rddf_lod'].merge(rddf[0], rddf[2])
+            if not merged:
+                self._send(("sync", vehicle_id))
+        if merged:
+            self._merged[vehicle_id] = number
+        merged_state.update(state)
+        merged_state.update(buffers)
+        return merged_state
+
+    def update(self, vehicle_id, updates):
+        self._send(("set", vehicle_id or self._default_id, dict(updates)))
@@ -1,115 +1,291 @@
 # -*- coding: utf-8 -*-
-from dash import Dash, dcc, html
+from dash import Dash, callback_context, dcc, html, no_update
 from dash.dependencies import Output, Input, State
 import plotly.graph_objs as go
-from utils.config import SHARED, SERVER_CONFIG, GRAPH_CONFIG, PID_CONFIG, PID_CONFIG_DEG
-import pandas as pd
+from flask import Response, g, request
+from utils.config import SERVER_CONFIG, GRAPH_CONFIG, LOD_CONFIG, PID_CONFIG, PID_CONFIG_DEG
+from utils.lod import lttb, shared_path_lod
+from utils.metrics import METRICS
 import numpy as np
 import threading
+import time
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def create_dash_app():
-    app = Dash(__name__)
-    shared = SHARED
-    shared_lock = threading.Lock()
-
-    app.layout = html.Div([
-        html.H4("실시간 속도 시각화"),
-        dcc.Graph(id='live-graph'),
-        dcc.Interval(id='interval', interval=500, n_intervals=0),
+# 그림마다 그 그림이 실제로 쓰는 값(버퍼 seq, 목표값, 지도 객체 등)을 키로 보관해
+# 상태 버전만 바뀌고 그 값들은 그대로면 다시 만들지 않는다.
+# 키는 튜플이면 값으로, 아니면 (지도 배열처럼) 같은 객체인지로 비교한다.
+def _same_key(a, b):
+    return a is b or (type(a) is tuple and type(b) is tuple and a == b)
+
+class FigureCache:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def get(self, name, key, build):
+        with self._lock:
+            entry = self._entries.get(name)
+        if entry is not None and _same_key(entry[0], key):
+            return entry[1]
+        figure = build()
+        with self._lock:
+            self._entries[name] = (key, figure)
+        return figure
+
+# 시계열 버퍼 뷰를 JSON 리스트로 (NaN은 빈 점)
+def to_list(values):
+    return [None if v != v else v for v in np.asarray(values).tolist()]
+
+# 시계열을 LTTB로 줄인 (x, y). x는 버퍼 전체에서의 샘플 번호
+def downsample_series(seq, values, points=LOD_CONFIG['series_points']):
+    values = np.asarray(values)
+    x = np.arange(seq - len(values), seq)
+    valid = values == values
+    x, values = x[valid], values[valid]
+    idx = lttb(x, values, points)
+    return x[idx].tolist(), values[idx].tolist()
+
+# 경로 그래프의 trace 순서 (0번 지도는 보이는 영역이 바뀔 때만 단순화 수준을 골라 다시 보낸다)
+PATH_TRACE_MAP = 0
+PATH_TRACE_RDDF = 1
+PATH_TRACE_POS = 2
+PATH_TRACE_DEST = 3
+PATH_TRACE_PATH = 4
+PATH_TRACE_NEAREST = 5
+PATH_TRACE_OBSTACLES = 6
+
+# 경로 그래프의 처음 보이는 영역 (x0, x1, z0, z1)
+PATH_VIEWPORT = (50, 250, 25, 225)
+
+# relayoutData에서 보이는 영역을 읽는다. 한 축만 바뀌면 나머지는 이전 값, 자동 범위면 None (전체)
+def parse_viewport(relayout, previous):
+    if not relayout:
+        return previous
+    if relayout.get('xaxis.autorange') or relayout.get('yaxis.autorange'):
+        return None
+    viewport = list(previous if previous is not None else PATH_VIEWPORT)
+    for axis, offset in (('xaxis', 0), ('yaxis', 2)):
+        if f'{axis}.range[0]' in relayout:
+            viewport[offset:offset + 2] = relayout[f'{axis}.range[0]'], relayout[f'{axis}.range[1]']
+        elif f'{axis}.range' in relayout:
+            viewport[offset:offset + 2] = relayout[f'{axis}.range']
+    return tuple(float(v) for v in viewport)
+
+def map_trace_points(map_points, viewport):
+    if map_points is None or not len(map_points):
+        return [], []
+    xs, zs = shared_path_lod(map_points, LOD_CONFIG['levels']).select(viewport, LOD_CONFIG['max_points'],
+                                                                      LOD_CONFIG['pixels'])
+    return to_list(xs), to_list(zs)
+
+def build_path_figure(map_points):
+    map_x, map_z = map_trace_points(map_points, PATH_VIEWPORT)
+    data = [
+        go.Scatter(x=map_x, y=map_z, mode='lines', line=dict(color='gray', width=1), name='지도 경로'),
+        go.Scatter(x=[], y=[], mode='lines+markers', line=dict(color='blue', width=2), name='RDDF 궤적'),
+        go.Scatter(x=[], y=[], mode='markers', marker=dict(size=10, color='blue'), name='현재 위치'),
+        go.Scatter(x=[], y=[], mode='markers', marker=dict(size=10, color='green'), name='목표'),
+        go.Scatter(x=[], y=[], mode='lines+markers', line=dict(color='black', dash='dash'), name='경로'),
+        go.Scatter(x=[], y=[], mode='markers', marker=dict(size=10, color='orange'), name='가장 가까운 점'),
+        go.Scatter(x=[], y=[], mode='markers', marker=dict(size=15, color='red', symbol='x'), name='장애물')
+    ]
+    return {
+        'data': data,
+        'layout': go.Layout(
+            xaxis=dict(title='X 좌표 (m)', range=list(PATH_VIEWPORT[:2])),
+            yaxis=dict(title='Z 좌표 (m)', range=list(PATH_VIEWPORT[2:])),
+            title='경로 및 장애물 시각화 (RDDF 궤적 포함)',
+            showlegend=True,
+            uirevision='path'
+        )
+    }
+
+def build_rddf_speed_figure():
+    return {
+        'data': [go.Scatter(
+            y=[],
+            mode='lines+markers',
+            line=dict(color='orange', width=2),
+            marker=dict(size=5),
+            name='속도'
+        )],
+        'layout': go.Layout(
+            xaxis=dict(title='시간 (포인트)', range=[0, GRAPH_CONFIG['max_points']]),
+            yaxis=dict(title='속도 (km/h)', range=[0, 108]),
+            title='RDDF 속도 변화',
+            showlegend=True
+        )
+    }
 
-        html.Div([
-            html.Label("타겟 속도 (-30~70 km/h)"),
+# source는 상태를 읽고 튜닝 값을 쓰는 통로 (server.dash_bridge의 LocalStateSource 또는 ShmStateSource)
+def create_dash_app(source):
+    app = Dash(__name__)
+    figure_cache = FigureCache()
+
+    def vehicle_state(vehicle_id):
+        return source.snapshot(vehicle_id)
+
+    # 콜백 처리 시간 (출력 id별)
+    @app.server.before_request
+    def start_callback_timer():
+        if request.path.endswith('/_dash-update-component'):
+            g.callback_start = time.perf_counter()
+
+    @app.server.after_request
+    def record_callback_time(response):
+        start = getattr(g, 'callback_start', None)
+        if start is not None:
+            body = request.get_json(silent=True) or {}
+            METRICS.observe("dash_callback_duration_seconds", (time.perf_counter() - start) * 1000.0,
+                            "Dash callback render time", output=str(body.get('output', 'unknown')))
+        return response
+
+    # 별도 프로세스 모드에서는 콜백 지표가 이 프로세스에만 있으므로 대시 서버에서도 내보낸다
+    @app.server.route('/metrics')
+    def dash_metrics():
+        return Response(METRICS.render(), mimetype='text/plain; version=0.0.4')
+
+    # 정적 지도 그림은 지도 객체가 바뀔 때만 다시 만든다
+    def path_figure(map_points):
+        return figure_cache.get('path-map', map_points, lambda: build_path_figure(map_points))
+
+    # 페이지를 열 때마다 레이아웃을 새로 만들어 정적 지도 레이어를 이때 한 번만 보낸다
+    def serve_layout():
+        defaults = vehicle_state(source.default_id)
+        return html.Div([
+            html.Div([
+                html.Label("차량 선택"),
+                dcc.Dropdown(
+                    id='vehicle-select',
+                    options=[{'label': vid, 'value': vid} for vid in source.ids()],
+                    value=source.default_id,
+                    clearable=False
+                )
+            ], style={'width': '300px'}),
+            html.H4("실시간 속도 시각화"),
+            dcc.Graph(id='live-graph'),
+            dcc.Interval(id='interval', interval=500, n_intervals=0),
+            dcc.Store(id='state-version'),
+            dcc.Store(id='rddf-cursor'),
+
+            html.Div([
+                html.Label("타겟 속도 (-30~70 km/h)"),
+                dcc.Slider(
+                    id='target-speed-slider',
+                    min=-30,
+                    max=70,
+                    step=1,
+                    value=0,
+                    marks={i: f"{i} km/h" for i in range(-30, 71, 10)}
+                )
+            ], style={'margin-top': '20px'}),
+
+            html.Div(id='target-speed-display', style={'margin-top': '10px', 'font-weight': 'bold'}),
+
+            html.H4("속도 PID 파라미터 조정 (Kp, Ki, Kd)"),
+            html.Div([
+                html.Label("Kp:"),
+                dcc.Input(id='input-kp', type='number', value=defaults['vel_pid']['kp'], step=0.0001),
+                html.Label("Ki:"),
+                dcc.Input(id='input-ki', type='number', value=defaults['vel_pid']['ki'], step=0.0001),
+                html.Label("Kd:"),
+                dcc.Input(id='input-kd', type='number', value=defaults['vel_pid']['kd'], step=0.0001),
+            ], style={'margin-top': '10px', 'margin-bottom': '10px'}),
+
+            html.Div(id='pid-display', style={'font-weight': 'bold'}),
+
+            html.H4("전차 위치 변화량 (ΔX, ΔZ)", style={'margin-top': '40px'}),
+            dcc.Graph(id='delta-pos-graph'),
+
+            html.H4("현재 각도 (deg)", style={'margin-top': '40px'}),
+            dcc.Graph(id='steer-gauge'),
+
+            html.H4("타겟 각도 조절 (deg)"),
             dcc.Slider(
-                id='target-speed-slider',
-                min=-30,
-                max=70,
+                id='target-angle-slider',
+                min=-180,
+                max=180,
                 step=1,
                 value=0,
-                marks={i: f"{i} km/h" for i in range(-30, 71, 10)}
-            )
-        ], style={'margin-top': '20px'}),
-
-        html.Div(id='target-speed-display', style={'margin-top': '10px', 'font-weight': 'bold'}),
-
-        html.H4("속도 PID 파라미터 조정 (Kp, Ki, Kd)"),
-        html.Div([
-            html.Label("Kp:"),
-            dcc.Input(id='input-kp', type='number', value=shared['vel_pid']['kp'], step=0.0001),
-            html.Label("Ki:"),
-            dcc.Input(id='input-ki', type='number', value=shared['vel_pid']['ki'], step=0.0001),
-            html.Label("Kd:"),
-            dcc.Input(id='input-kd', type='number', value=shared['vel_pid']['kd'], step=0.0001),
-        ], style={'margin-top': '10px', 'margin-bottom': '10px'}),
-
-        html.Div(id='pid-display', style={'font-weight': 'bold'}),
-
-        html.H4("전차 위치 변화량 (ΔX, ΔZ)", style={'margin-top': '40px'}),
-        dcc.Graph(id='delta-pos-graph'),
-
-        html.H4("현재 각도 (deg)", style={'margin-top': '40px'}),
-        dcc.Graph(id='steer-gauge'),
-
-        html.H4("타겟 각도 조절 (deg)"),
-        dcc.Slider(
-            id='target-angle-slider',
-            min=-180,
-            max=180,
-            step=1,
-            value=0,
-            marks={
-                -180: '-180°',
-                -90: '-90°',
-                0: '0°',
-                90: '90°',
-                180: '180°'
-            }
-        ),
-        html.Div(id='target-angle-display', style={'margin-top': '10px', 'font-weight': 'bold'}),
-
-        html.H4("조향 PID 파라미터 조정 (Kp, Ki, Kd)", style={'margin-top': '30px'}),
-        html.Div([
-            html.Label("Kp:"),
-            dcc.Input(id='steer-kp', type='number', value=shared['steer_pid']['kp'], step=0.0001),
-            html.Label("Ki:"),
-            dcc.Input(id='steer-ki', type='number', value=shared['steer_pid']['ki'], step=0.0001),
-            html.Label("Kd:"),
-            dcc.Input(id='steer-kd', type='number', value=shared['steer_pid']['kd'], step=0.0001),
-        ], style={'margin-top': '10px', 'margin-bottom': '10px'}),
-        html.Div(id='steer-pid-display', style={'font-weight': 'bold'}),
-
-        html.H4("경로 및 장애물 시각화 (RDDF 궤적 포함)", style={'margin-top': '40px'}),
-        dcc.Graph(id='path-obstacle-graph'),
-
-        html.H4("위치 오차 시각화", style={'margin-top': '40px'}),
-        dcc.Graph(id='error-distance-graph'),
-
-        html.H4("RDDF 속도 변화", style={'margin-top': '40px'}),
-        dcc.Graph(id='rddf-speed-graph'),
-    ])
-
+                marks={
+                    -180: '-180°',
+                    -90: '-90°',
+                    0: '0°',
+                    90: '90°',
+                    180: '180°'
+                }
+            ),
+            html.Div(id='target-angle-display', style={'margin-top': '10px', 'font-weight': 'bold'}),
+
+            html.H4("조향 PID 파라미터 조정 (Kp, Ki, Kd)", style={'margin-top': '30px'}),
+            html.Div([
+                html.Label("Kp:"),
+                dcc.Input(id='steer-kp', type='number', value=defaults['steer_pid']['kp'], step=0.0001),
+                html.Label("Ki:"),
+                dcc.Input(id='steer-ki', type='number', value=defaults['steer_pid']['ki'], step=0.0001),
+                html.Label("Kd:"),
+                dcc.Input(id='steer-kd', type='number', value=defaults['steer_pid']['kd'], step=0.0001),
+            ], style={'margin-top': '10px', 'margin-bottom': '10px'}),
+            html.Div(id='steer-pid-display', style={'font-weight': 'bold'}),
+
+            html.H4("경로 및 장애물 시각화 (RDDF 궤적 포함)", style={'margin-top': '40px'}),
+            dcc.Graph(id='path-obstacle-graph', figure=path_figure(defaults.get('map_points', None))),
+
+            html.H4("위치 오차 시각화", style={'margin-top': '40px'}),
+            dcc.Graph(id='error-distance-graph'),
+
+            html.H4("RDDF 속도 변화", style={'margin-top': '40px'}),
+            dcc.Graph(id='rddf-speed-graph', figure=build_rddf_speed_figure()),
+        ])
+
+    app.layout = serve_layout
+
+    # 새로 등록된 차량이 있을 때만 선택 목록을 갱신한다
     @app.callback(
-        Output('live-graph', 'figure'),
-        Input('interval', 'n_intervals')
+        Output('vehicle-select', 'options'),
+        Input('interval', 'n_intervals'),
+        State('vehicle-select', 'options')
+    )
+    def update_vehicle_options(n, options):
+        ids = source.ids()
+        if options is not None and [o['value'] for o in options] == ids:
+            return no_update
+        return [{'label': vid, 'value': vid} for vid in ids]
+
+    # 주기 콜백은 선택된 차량의 상태 버전만 확인하고, 바뀌었을 때만 그래프 콜백들이 실행된다
+    # (차량마다 버전이 따로 증가하므로 "차량:버전" 문자열로 구분한다)
+    @app.callback(
+        Output('state-version', 'data'),
+        [Input('interval', 'n_intervals'),
+         Input('vehicle-select', 'value')],
+        State('state-version', 'data')
     )
-    def update_graph(n):
-        with shared_lock:
-            data = shared['vel_data'][-GRAPH_CONFIG['max_points']:]
-            current_speed = shared.get('tank_cur_vel_ms', 0.0) * 3.6
-            target_speed = shared.get('tank_tar_vel_kh', 0.0)
-            logger.info(f"Live Graph - Current Speed: {current_speed} km/h, Target Speed: {target_speed} km/h")
+    def update_state_version(n, vehicle_id, seen_version):
+        version = f"{vehicle_id}:{vehicle_state(vehicle_id).version}"
+        if version == seen_version:
+            return no_update
+        return version
+
+    # 시계열 그래프는 버퍼 전체를 LTTB로 series_points개까지 줄여 보낸다
+    def build_live_graph(state):
+        vel_data = state['vel_data']
+        seq, _, rows = vel_data.since(0)
+        xs, data = downsample_series(seq, rows[:, vel_data.index['speed_kh']])
+        ends = [xs[0], xs[-1]] if xs else []
+        current_speed = state.get('tank_cur_vel_ms', 0.0) * 3.6
+        target_speed = state.get('tank_tar_vel_kh', 0.0)
+        logger.info("Live Graph - Current Speed: %s km/h, Target Speed: %s km/h", current_speed, target_speed)
         return {
             'data': [
-                go.Scatter(y=data, mode='lines+markers', name='Current Speed'),
-                go.Scatter(y=[target_speed] * len(data), mode='lines', name='Target Speed', line=dict(dash='dash'))
+                go.Scatter(x=xs, y=data, mode='lines+markers', name='Current Speed'),
+                go.Scatter(x=ends, y=[target_speed] * len(ends), mode='lines', name='Target Speed',
+                           line=dict(dash='dash'))
             ],
             'layout': go.Layout(
                 xaxis=dict(
-                    range=[max(0, len(data) - GRAPH_CONFIG['max_points']), len(data)],
-                    dtick=10,
                     title='시간 (포인트)'
                 ),
                 yaxis=dict(
@@ -122,23 +298,28 @@ def create_dash_app():
         }
 
     @app.callback(
-        Output('delta-pos-graph', 'figure'),
-        Input('interval', 'n_intervals')
+        Output('live-graph', 'figure'),
+        Input('state-version', 'data'),
+        State('vehicle-select', 'value')
     )
-    def update_delta_graph(n):
-        with shared_lock:
-            del_x_data = shared.get('del_playerPos', {}).get('x', [])[-GRAPH_CONFIG['max_points']:]
-            del_z_data = shared.get('del_playerPos', {}).get('z', [])[-GRAPH_CONFIG['max_points']:]
+    def update_graph(version, vehicle_id):
+        state = vehicle_state(vehicle_id)
+        key = (vehicle_id, state['vel_data'].seq, state.get('tank_tar_vel_kh', 0.0))
+        return figure_cache.get('live-graph', key, lambda: build_live_graph(state))
+
+    def build_delta_graph(state):
+        del_pos = state['del_playerPos']
+        seq, _, deltas = del_pos.since(0)
+        del_x_t, del_x_data = downsample_series(seq, deltas[:, 0])
+        del_z_t, del_z_data = downsample_series(seq, deltas[:, 1])
         return {
             'data': [
-                go.Scatter(y=del_x_data, mode='lines', name='ΔX', line=dict(dash='dot')),
-                go.Scatter(y=del_z_data, mode='lines', name='ΔZ', line=dict(dash='dash'))
+                go.Scatter(x=del_x_t, y=del_x_data, mode='lines', name='ΔX', line=dict(dash='dot')),
+                go.Scatter(x=del_z_t, y=del_z_data, mode='lines', name='ΔZ', line=dict(dash='dash'))
             ],
             'layout': go.Layout(
                 xaxis=dict(
-                    title='시간 (포인트)',
-                    dtick=10,
-                    range=[max(0, len(del_x_data) - GRAPH_CONFIG['max_points']), len(del_x_data)]
+                    title='시간 (포인트)'
                 ),
                 yaxis=dict(title='좌표 변화량', dtick=1),
                 title='전차 위치 변화량 (ΔX, ΔZ)',
@@ -147,14 +328,22 @@ def create_dash_app():
         }
 
     @app.callback(
-        Output('steer-gauge', 'figure'),
-        Input('interval', 'n_intervals')
+        Output('delta-pos-graph', 'figure'),
+        Input('state-version', 'data'),
+        State('vehicle-select', 'value')
     )
-    def update_steer_gauge(n):
-        with shared_lock:
-            angle = shared.get('tank_cur_yaw_deg', 0)
-            target_angle = shared.get('tank_tar_yaw_deg', 0)
-            logger.info(f"Steer Gauge - Current Angle: {angle} deg, Target Angle: {target_angle} deg")
+    def update_delta_graph(version, vehicle_id):
+        state = vehicle_state(vehicle_id)
+        key = (vehicle_id, state['del_playerPos'].seq)
+        return figure_cache.get('delta-pos-graph', key, lambda: build_delta_graph(state))
+
+    def build_steer_gauge(state):
+        angle = state.get('tank_cur_yaw_deg', 0)
+        # 경로 추종 중이면 추종기가 정한 방향이 실제 목표
+        target_angle = state.get('track_yaw_deg')
+        if target_angle is None:
+            target_angle = state.get('tank_tar_yaw_deg', 0)
+        logger.info("Steer Gauge - Current Angle: %s deg, Target Angle: %s deg", angle, target_angle)
         r_values_blue = np.linspace(0, 0.98, 49)
         theta_values_blue = [angle] * len(r_values_blue)
         blue_dots = go.Scatterpolar(
@@ -197,96 +386,108 @@ def create_dash_app():
         }
 
     @app.callback(
-        Output('path-obstacle-graph', 'figure'),
-        Input('interval', 'n_intervals')
+        Output('steer-gauge', 'figure'),
+        Input('state-version', 'data'),
+        State('vehicle-select', 'value')
     )
-    def update_path_obstacle_graph(n):
-        with shared_lock:
-            if 'pre_playerPos' not in shared or not all(key in shared['pre_playerPos'] for key in ['x', 'z']):
-                logger.warning("pre_playerPos not properly initialized, using default values")
-                current_pos = (0, 0)
-            else:
-                current_pos = (shared['pre_playerPos']['x'], shared['pre_playerPos']['z'])
-            destination = shared.get('destination', None)
-            obstacles = shared.get('obstacles', [])[:GRAPH_CONFIG['max_obstacles']]
-            path = shared.get('path', [])[:GRAPH_CONFIG['max_path_points']]
-            nearest_point = shared.get('nearest_point', None)
-            map_points = shared.get('map_points', None)
-            rddf_data = shared.get('rddf_data', [])
-
-        data = [
-            go.Scatter(
-                x=[current_pos[0]], y=[current_pos[1]],
-                mode='markers', marker=dict(size=10, color='blue'),
-                name='현재 위치'
-            )
-        ]
-
-        if destination:
-            dest_x, dest_y, dest_z = destination
-            data.append(go.Scatter(
-                x=[dest_x], y=[dest_z],
-                mode='markers', marker=dict(size=10, color='green'),
-                name='목표'
-            ))
-
-        if path:
-            path_x, path_z = zip(*path)
-            data.append(go.Scatter(
-                x=path_x, y=path_z,
-                mode='lines+markers', line=dict(color='black', dash='dash'),
-                name='경로'
-            ))
-
-        if map_points is not None:
-            data.append(go.Scatter(
-                x=map_points[:, 0], y=map_points[:, 1],
-                mode='lines', line=dict(color='gray', width=1),
-                name='지도 경로'
-            ))
-
-        if nearest_point:
-            data.append(go.Scatter(
-                x=[nearest_point[0]], y=[nearest_point[1]],
-                mode='markers', marker=dict(size=10, color='orange'),
-                name='가장 가까운 점'
-            ))
-
-        if rddf_data:
-            df_rddf = pd.DataFrame(rddf_data, columns=['x', 'z', 'y', 'speed'])
-            rddf_x = df_rddf['x'].values
-            rddf_z = df_rddf['z'].values
-            data.append(go.Scatter(
-                x=rddf_x, y=rddf_z,
-                mode='lines+markers', line=dict(color='blue', width=2),
-                name='RDDF 궤적'
-            ))
-
-        for i, (obs_x, obs_z) in enumerate(obstacles):
-            data.append(go.Scatter(
-                x=[obs_x], y=[obs_z],
-                mode='markers', marker=dict(size=15, color='red', symbol='x'),
-                name=f'장애물 {i+1}'
-            ))
-
-        logger.debug("Updating path-obstacle graph with RDDF trajectory")
-        return {
-            'data': data,
-            'layout': go.Layout(
-                xaxis=dict(title='X 좌표 (m)', range=[50, 250]),
-                yaxis=dict(title='Z 좌표 (m)', range=[25, 225]),
-                title='경로 및 장애물 시각화 (RDDF 궤적 포함)',
-                showlegend=True
-            )
-        }
-
+    def update_steer_gauge(version, vehicle_id):
+        state = vehicle_state(vehicle_id)
+        key = (vehicle_id, state.get('tank_cur_yaw_deg', 0), state.get('track_yaw_deg'), state.get('tank_tar_yaw_deg', 0))
+        return figure_cache.get('steer-gauge', key, lambda: build_steer_gauge(state))
+
+    # 경로 그래프와 RDDF 속도 그래프는 extendData로 새 점만 보낸다.
+    # rddf-cursor는 탭마다 마지막으로 받은 (차량, rddf_seq)와 보이는 영역을 기억한다.
+    # 차량이나 보이는 영역이 바뀌었거나 새 점이 refresh_rows만큼 쌓이면 지도와 궤적을
+    # 보이는 영역에 맞는 단순화 수준으로 통째로 교체하므로, 지도와 주행이 길어져도 전송량이 일정하다.
     @app.callback(
-        Output('error-distance-graph', 'figure'),
-        Input('interval', 'n_intervals')
+        [Output('path-obstacle-graph', 'extendData'),
+         Output('rddf-speed-graph', 'extendData'),
+         Output('rddf-cursor', 'data')],
+        [Input('state-version', 'data'),
+         Input('path-obstacle-graph', 'relayoutData')],
+        [State('rddf-cursor', 'data'),
+         State('vehicle-select', 'value')]
     )
-    def update_error_graph(n):
-        with shared_lock:
-            error_distance = shared.get('error_distance', 0.0)
+    def update_path_obstacle_graph(version, relayout, cursor, vehicle_id):
+        state = vehicle_state(vehicle_id)
+        if 'pre_playerPos' not in state or not all(key in state['pre_playerPos'] for key in ['x', 'z']):
+            logger.warning("pre_playerPos not properly initialized, using default values")
+            current_pos = (0, 0)
+        else:
+            current_pos = (state['pre_playerPos']['x'], state['pre_playerPos']['z'])
+        destination = state.get('destination', None)
+        obstacles = state.get('obstacles', [])[:GRAPH_CONFIG['max_obstacles']]
+        path = state.get('path', [])[:GRAPH_CONFIG['max_path_points']]
+        nearest_point = state.get('nearest_point', None)
+        rddf_data = state['rddf_data']
+
+        # 새로 들어온 RDDF 행만 잘라낸다 (링 크기를 넘으면 링 전체)
+        switched = not cursor or cursor.get('vehicle') != vehicle_id
+        seen = 0 if switched else cursor.get('seq', 0)
+        rddf_seq, _, new_rows = rddf_data.since(seen)
+        previous_viewport = PATH_VIEWPORT if not cursor else cursor.get('viewport')
+        previous_viewport = tuple(previous_viewport) if previous_viewport is not None else None
+        viewport = previous_viewport
+        if any(t['prop_id'].endswith('relayoutData') for t in callback_context.triggered):
+            viewport = parse_viewport(relayout, previous_viewport)
+        lod_seq = 0 if switched else cursor.get('lod_seq', 0)
+        full = switched or viewport != previous_viewport or rddf_seq - lod_seq >= LOD_CONFIG['refresh_rows']
+
+        # 크기가 변하는 trace는 maxPoints를 새 길이로 주어 이전 점을 밀어낸다 (빈 경우 None 한 점)
+        def replace(points):
+            points = list(points)
+            if not points:
+                return [None], [None], 1
+            xs, zs = zip(*points)
+            return list(xs), list(zs), len(points)
+
+        dest_points = [(destination[0], destination[2])] if destination else []
+        nearest_points = [tuple(nearest_point)] if nearest_point is not None else []
+        lod_traces = []
+        if full:
+            lod_seq = rddf_seq
+            rddf_lod = state['rddf_lod']
+            rddf_lod.catch_up(rddf_data)
+            rddf_x, rddf_z = rddf_lod.select(viewport, LOD_CONFIG['max_points'])
+            rddf_trace = (PATH_TRACE_RDDF, to_list(rddf_x), to_list(rddf_z), max(1, len(rddf_x)))
+            if not len(rddf_x):
+                rddf_trace = (PATH_TRACE_RDDF,) + replace([])
+            if switched or viewport != previous_viewport:
+                map_x, map_z = map_trace_points(state.get('map_points'), viewport)
+                lod_traces = [(PATH_TRACE_MAP, map_x or [None], map_z or [None], max(1, len(map_x)))]
+        else:
+            # 단순화본 뒤에 원본 점을 이어 붙인다 (다음 교체 전까지 refresh_rows개를 넘지 않는다)
+            rddf_trace = (PATH_TRACE_RDDF, to_list(new_rows[:, 0]), to_list(new_rows[:, 1]),
+                          LOD_CONFIG['max_points'] + LOD_CONFIG['refresh_rows'])
+        traces = lod_traces + [
+            rddf_trace,
+            (PATH_TRACE_POS,) + replace([current_pos]),
+            (PATH_TRACE_DEST,) + replace(dest_points),
+            (PATH_TRACE_PATH,) + replace(path),
+            (PATH_TRACE_NEAREST,) + replace(nearest_points),
+            (PATH_TRACE_OBSTACLES,) + replace((o[0], o[1]) for o in obstacles)
+        ]
+        path_update = (
+            {'x': [t[1] for t in traces], 'y': [t[2] for t in traces]},
+            [t[0] for t in traces],
+            {'x': [t[3] for t in traces], 'y': [t[3] for t in traces]}
+        )
+
+        if len(new_rows):
+            speeds = to_list(new_rows[:, 3] * 3.6)
+            speed_points = min(GRAPH_CONFIG['max_points'], len(speeds)) if switched else GRAPH_CONFIG['max_points']
+            speed_update = ({'y': [speeds]}, [0], speed_points)
+        elif switched:
+            speed_update = ({'y': [[None]]}, [0], 1)
+        else:
+            speed_update = no_update
+
+        logger.debug("Updating path-obstacle graph with %d new RDDF points (full=%s)", len(new_rows), full)
+        return path_update, speed_update, {'vehicle': vehicle_id, 'seq': rddf_seq, 'lod_seq': lod_seq,
+                                           'viewport': viewport}
+
+    def build_error_graph(state):
+        error_distance = state.get('error_distance', 0.0)
         return {
             'data': [go.Scatter(y=[error_distance], mode='markers', name='오차')],
             'layout': go.Layout(
@@ -296,92 +497,100 @@ def create_dash_app():
             )
         }
 
+    @app.callback(
+        Output('error-distance-graph', 'figure'),
+        Input('state-version', 'data'),
+        State('vehicle-select', 'value')
+    )
+    def update_error_graph(version, vehicle_id):
+        state = vehicle_state(vehicle_id)
+        key = (vehicle_id, state.get('error_distance', 0.0))
+        return figure_cache.get('error-distance-graph', key, lambda: build_error_graph(state))
+
     @app.callback(
         Output('target-speed-display', 'children'),
-        Input('target-speed-slider', 'value')
+        Input('target-speed-slider', 'value'),
+        State('vehicle-select', 'value')
     )
-    def update_target_speed_display(val):
-        with shared_lock:
-            if shared.get('error_distance', 0.0) < 0.5:
-                shared['tank_tar_vel_kh'] = 0
-                logger.info("Destination reached, setting target speed to 0 km/h")
-            else:
-                shared['tank_tar_vel_kh'] = val
-            logger.info(f"Target speed updated: {shared['tank_tar_vel_kh']} km/h (Dash)")
-        return f"현재 타겟 속도: {shared['tank_tar_vel_kh']} km/h"
+    def update_target_speed_display(val, vehicle_id):
+        if vehicle_state(vehicle_id).get('error_distance', 0.0) < 0.5:
+            val = 0
+            logger.info("Destination reached, setting target speed to 0 km/h")
+        source.update(vehicle_id, {'tank_tar_vel_kh': val})
+        logger.info("Target speed updated: %s km/h (Dash)", val)
+        return f"현재 타겟 속도: {val} km/h"
 
     @app.callback(
         Output('target-angle-display', 'children'),
-        Input('target-angle-slider', 'value')
+        Input('target-angle-slider', 'value'),
+        State('vehicle-select', 'value')
     )
-    def update_target_angle_display(angle):
-        with shared_lock:
-            shared['tank_tar_yaw_deg'] = angle
-            logger.info(f"Target angle updated: {angle}° (Dash)")
+    def update_target_angle_display(angle, vehicle_id):
+        source.update(vehicle_id, {'tank_tar_yaw_deg': angle})
+        logger.info("Target angle updated: %s° (Dash)", angle)
         return f"현재 타겟 각도: {angle}°"
 
+    # 차량을 바꾸면 PID 입력칸을 그 차량의 현재 값으로 채운다
+    @app.callback(
+        [Output('input-kp', 'value'),
+         Output('input-ki', 'value'),
+         Output('input-kd', 'value'),
+         Output('steer-kp', 'value'),
+         Output('steer-ki', 'value'),
+         Output('steer-kd', 'value')],
+        Input('vehicle-select', 'value'),
+        prevent_initial_call=True
+    )
+    def load_pid_values(vehicle_id):
+        state = vehicle_state(vehicle_id)
+        vel_pid, steer_pid = state['vel_pid'], state['steer_pid']
+        return (vel_pid['kp'], vel_pid['ki'], vel_pid['kd'], steer_pid['kp'], steer_pid['ki'], steer_pid['kd'])
+
     @app.callback(
         Output('pid-display', 'children'),
         [Input('input-kp', 'value'),
          Input('input-ki', 'value'),
-         Input('input-kd', 'value')]
+         Input('input-kd', 'value')],
+        State('vehicle-select', 'value')
     )
-    def update_pid_values(kp, ki, kd):
-        with shared_lock:
-            shared['vel_pid']['kp'] = max(0, kp) if kp is not None else PID_CONFIG['kp']
-            shared['vel_pid']['ki'] = max(0, ki) if ki is not None else PID_CONFIG['ki']
-            shared['vel_pid']['kd'] = max(0, kd) if kd is not None else PID_CONFIG['kd']
-        logger.info(f"Velocity PID updated: Kp={shared['vel_pid']['kp']}, Ki={shared['vel_pid']['ki']}, Kd={shared['vel_pid']['kd']}")
-        return f"속도 PID 값 - Kp: {shared['vel_pid']['kp']}, Ki: {shared['vel_pid']['ki']}, Kd: {shared['vel_pid']['kd']}"
+    def update_pid_values(kp, ki, kd, vehicle_id):
+        # 스냅샷 값은 제자리에서 수정하지 않고 새 dict로 교체한다
+        pid = {
+            'kp': max(0, kp) if kp is not None else PID_CONFIG['kp'],
+            'ki': max(0, ki) if ki is not None else PID_CONFIG['ki'],
+            'kd': max(0, kd) if kd is not None else PID_CONFIG['kd']
+        }
+        source.update(vehicle_id, {'vel_pid': pid})
+        logger.info("Velocity PID updated: Kp=%s, Ki=%s, Kd=%s", pid['kp'], pid['ki'], pid['kd'])
+        return f"속도 PID 값 - Kp: {pid['kp']}, Ki: {pid['ki']}, Kd: {pid['kd']}"
 
     @app.callback(
         Output('steer-pid-display', 'children'),
         [Input('steer-kp', 'value'),
          Input('steer-ki', 'value'),
-         Input('steer-kd', 'value')]
-    )
-    def update_yaw_pid(kp, ki, kd):
-        with shared_lock:
-            shared['steer_pid']['kp'] = max(0, kp) if kp is not None else PID_CONFIG_DEG['kp']
-            shared['steer_pid']['ki'] = max(0, ki) if ki is not None else PID_CONFIG_DEG['ki']
-            shared['steer_pid']['kd'] = max(0, kd) if kd is not None else PID_CONFIG_DEG['kd']
-        logger.info(f"Steering PID updated: Kp={shared['steer_pid']['kp']}, Ki={shared['steer_pid']['ki']}, Kd={shared['steer_pid']['kd']}")
-        return f"조향 PID 값 - Kp: {shared['steer_pid']['kp']}, Ki: {shared['steer_pid']['ki']}, Kd: {shared['steer_pid']['kd']}"
-
-    @app.callback(
-        Output('rddf-speed-graph', 'figure'),
-        Input('interval', 'n_intervals')
+         Input('steer-kd', 'value')],
+        State('vehicle-select', 'value')
     )
-    def update_rddf_speed_graph(n):
-        with shared_lock:
-            rddf_data = shared.get('rddf_data', [])
-            if rddf_data:
-                df_rddf = pd.DataFrame(rddf_data, columns=['x', 'z', 'y', 'speed'])
-                logger.info(f"RDDF data loaded for speed graph from SHARED: {len(df_rddf)} rows")
-                speeds = df_rddf['speed'].values[-GRAPH_CONFIG['max_points']:] * 3.6
-            else:
-                logger.warning("No RDDF data available in SHARED")
-                speeds = []
-        return {
-            'data': [go.Scatter(
-                y=speeds,
-                mode='lines+markers',
-                line=dict(color='orange', width=2),
-                marker=dict(size=5),
-                name='속도'
-            )],
-            'layout': go.Layout(
-                xaxis=dict(
-                    title='시간 (포인트)',
-                    range=[max(0, len(speeds) - GRAPH_CONFIG['max_points']), len(speeds)]
-                ),
-                yaxis=dict(title='속도 (km/h)', range=[0, 108]),
-                title='RDDF 속도 변화',
-                showlegend=True
-            )
+    def update_yaw_pid(kp, ki, kd, vehicle_id):
+        # 스냅샷 값은 제자리에서 수정하지 않고 새 dict로 교체한다
+        pid = {
+            'kp': max(0, kp) if kp is not None else PID_CONFIG_DEG['kp'],
+            'ki': max(0, ki) if ki is not None else PID_CONFIG_DEG['ki'],
+            'kd': max(0, kd) if kd is not None else PID_CONFIG_DEG['kd']
         }
+        source.update(vehicle_id, {'steer_pid': pid})
+        logger.info("Steering PID updated: Kp=%s, Ki=%s, Kd=%s", pid['kp'], pid['ki'], pid['kd'])
+        return f"조향 PID 값 - Kp: {pid['kp']}, Ki: {pid['ki']}, Kd: {pid['kd']}"
 
     return app
 
 def run_dash():
-    create_dash_app().run(port=SERVER_CONFIG['dash_port'], debug=False, use_reloader=False)
\ No newline at end of file
+    from navigation.vehicle_registry import registry
+    from server.dash_bridge import LocalStateSource
+    create_dash_app(LocalStateSource(registry)).run(port=SERVER_CONFIG['dash_port'], debug=False, use_reloader=False)
+
+# 별도 프로세스 진입점 (DashBridge가 spawn으로 띄운다). 제어 상태는 공유 메모리로만 읽는다.
+def run_dash_process(region_name, commands, static=None):
+    from server.dash_bridge import ShmStateSource
+    create_dash_app(ShmStateSource(region_name, commands, static)).run(port=SERVER_CONFIG['dash_port'],
+                                                                       debug=False, use_reloader=False)
\ No newline at end of file
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+# 이벤트 버스 구독을 Server-Sent Events 텍스트로 바꾼다 (Flask/asyncio 서버 공용)
+# 전송 주기 사이에 들어온 이벤트는 (종류, 차량)별 최신 값으로 합치고, 지난번 보낸 값과 달라진 필드만 보낸다.
+import json
+import time
+from urllib.parse import parse_qs
+from utils.config import EVENT_CONFIG
+from utils.event_bus import BUS
+
+SSE_HEADERS = {"Content-Type": "text/event-stream", "Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+def _split(values):
+    items = [item for value in values or () for item in value.split(",") if item]
+    return items or None
+
+# ?types=pose,command&vehicle_id=a,b
+def subscribe_from_query(query, bus=BUS):
+    params = parse_qs(query) if isinstance(query, str) else {key: query.getlist(key) for key in query}
+    return bus.subscribe(_split(params.get("types")), _split(params.get("vehicle_id")))
+
+class StreamEncoder:
+    def __init__(self, subscription):
+        self.subscription = subscription
+        self.sent = {}
+        self.reported_drops = 0
+        self.last_write = time.monotonic()
+
+    def encode(self, events):
+        latest = {}
+        for event in events:
+            key = (event.type, event.vehicle)
+            merged = latest.get(key)
+            # 합칠 때 앞선 이벤트의 필드도 남겨 두어 중간 변화가 지워지지 않게 한다
+            data = dict(merged.data, **event.data) if merged is not None else event.data
+            latest[key] = event._replace(data=data)
+        chunks = []
+        dropped = self.subscription.dropped
+        if dropped != self.reported_drops:
+            chunks.append(f"event: dropped\ndata: {json.dumps({'dropped': dropped - self.reported_drops})}\n\n")
+            self.reported_drops = dropped
+        for key, event in latest.items():
+            previous = self.sent.get(key, {})
+            diff = {field: value for field, value in event.data.items() if previous.get(field) != value}
+            if not diff:
+                continue
+            self.sent[key] = dict(previous, **diff)
+            body = json.dumps(dict(diff, vehicle=event.vehicle, time=event.time), separators=(",", ":"))
+            chunks.append(f"id: {event.seq}\nevent: {event.type}\ndata: {body}\n\n")
+        return "".join(chunks)
+
+    # 한 주기 분량: 보낼 것이 없고 keepalive가 지났으면 주석 한 줄
+    def next_chunk(self, events):
+        chunk = self.encode(events)
+        now = time.monotonic()
+        if not chunk and now - self.last_write >= EVENT_CONFIG['keepalive']:
+            chunk = ": keepalive\n\n"
+        if chunk:
+            self.last_write = now
+        return chunk
+
+# 스레드 서버(Flask)용: 전송 주기마다 쌓인 이벤트를 한 덩어리로 보낸다
+def iter_stream(subscription, interval=EVENT_CONFIG['stream_interval']):
+    encoder = StreamEncoder(subscription)
+    try:
+        yield ": connected\n\n"
+        while not subscription.closed:
+            events = subscription.drain(timeout=EVENT_CONFIG['keepalive'])
+            chunk = encoder.next_chunk(events)
+            if chunk:
+                yield chunk
+            time.sleep(interval)
+    finally:
+        subscription.close()
@@ -1,30 +1,72 @@
 # -*- coding: utf-8 -*-
 import logging
-from flask import Flask, request
-from navigation.navigation import navigation
-from utils.config import SERVER_CONFIG, SHARED, shared_lock
+import time
+from flask import Flask, Response, g, request
+from navigation.vehicle_registry import registry
+from server.event_stream import SSE_HEADERS, iter_stream, subscribe_from_query
+from utils.config import SERVER_CONFIG
+from utils.metrics import METRICS
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
+METRICS.register_collector(registry.collect_metrics)
+
+@app.before_request
+def start_timer():
+    g.request_start = time.perf_counter()
+
+@app.after_request
+def record_latency(response):
+    start = getattr(g, 'request_start', None)
+    if start is not None:
+        endpoint = request.url_rule.rule if request.url_rule is not None else "unmatched"
+        METRICS.observe("http_request_duration_seconds", (time.perf_counter() - start) * 1000.0,
+                        "Control endpoint latency", server="flask", endpoint=endpoint,
+                        status=str(response.status_code))
+    return response
+
+# 차량은 ?vehicle_id= 쿼리 또는 본문의 vehicle_id로 고른다 (없으면 기본 차량)
+def get_vehicle(data=None):
+    vehicle_id = request.args.get('vehicle_id')
+    if vehicle_id is None and isinstance(data, dict):
+        vehicle_id = data.get('vehicle_id')
+    return registry.get(vehicle_id)
+
+@app.errorhandler(ValueError)
+def handle_value_error(e):
+    return {"status": "error", "error": str(e)}, 400
 
 @app.route('/info', methods=['POST'])
 def update_info():
     data = request.get_json()
-    with shared_lock:
-        SHARED['playerPos'] = data.get('playerPos', SHARED['playerPos'])
-        SHARED['tank_cur_vel_ms'] = data.get('playerSpeed', 0.0)
-        SHARED['tank_cur_yaw_deg'] = data.get('playerBodyX', 0.0)
-        SHARED['pre_playerPos'] = SHARED['playerPos'].copy()
-        navigation.rddf.save(navigation.rddf.add_info(data))
+    get_vehicle(data).navigation.update_info(data)
     return {"status": "success"}
 
 @app.route('/get_move', methods=['GET'])
 def get_move():
-    result = navigation.get_move()
-    logger.info(f"Get Move - Command: {result['command']}, Speed: {result['speed'] * 3.6} km/h, Yaw: {result['yaw']} deg")
+    vehicle = get_vehicle()
+    result = vehicle.navigation.get_move()
+    logger.info("Get Move [%s] - Command: %s, Speed: %s km/h, Yaw: %s deg",
+                vehicle.vehicle_id, result['command'], result['speed'] * 3.6, result['yaw'])
     return result
 
-def run_flask():
-    app.run(port=SERVER_CONFIG['flask_port'], debug=False, use_reloader=False)
\ No newline at end of file
+@app.route('/obstacles', methods=['POST'])
+def update_obstacles():
+    data = request.get_json()
+    result = get_vehicle(data).navigation.update_obstacles(data)
+    return dict(result, status="success")
+
+# 이벤트 스트림 (SSE): ?types=pose,command,pid,obstacles&vehicle_id=... (없으면 전부)
+@app.route('/stream', methods=['GET'])
+def stream():
+    subscription = subscribe_from_query(request.args)
+    return Response(iter_stream(subscription), headers=SSE_HEADERS)
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    return Response(METRICS.render(), mimetype='text/plain; version=0.0.4')
+
+def run_flask(port=None):
+    app.run(port=port or SERVER_CONFIG['flask_port'], debug=False, use_reloader=False)
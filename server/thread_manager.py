@@ -1,33 +1,58 @@
 # -*- coding: utf-8 -*-
 import threading
 import logging
-from server.flask_server import run_flask
-from server.dash_server import run_dash
 
+# 서버 모듈은 실제로 띄울 때 import한다 (headless 모드에서는 flask/dash/plotly를 읽지 않는다)
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class ThreadManager:
-    def __init__(self, shared_lock):
-        self.shared_lock = shared_lock
+    def __init__(self):
         self.threads = []
+        self.dash_bridge = None
 
-    def start_flask(self):
-        flask_thread = threading.Thread(target=run_flask, daemon=True)
+    def start_flask(self, port=None):
+        from server.flask_server import run_flask
+        flask_thread = threading.Thread(target=run_flask, args=(port,), daemon=True)
         self.threads.append(flask_thread)
         flask_thread.start()
         logger.info("Flask thread started")
 
-    def start_dash(self):
+    def start_async(self, port=None):
+        from server.async_server import run_async_server
+        async_thread = threading.Thread(target=run_async_server, kwargs={"port": port}, daemon=True)
+        self.threads.append(async_thread)
+        async_thread.start()
+        logger.info("Async control server thread started")
+
+    def start_control(self, mode="flask", port=None):
+        if mode == "async":
+            self.start_async(port)
+        elif mode == "flask":
+            self.start_flask(port)
+        else:
+            raise ValueError(f"Unknown control server mode: {mode}")
+
+    # mode "process": 대시보드를 별도 프로세스로 띄우고 상태는 공유 메모리로 넘긴다
+    def start_dash(self, mode="thread"):
+        if mode == "process":
+            from navigation.vehicle_registry import registry
+            from server.dash_bridge import DashBridge
+            self.dash_bridge = DashBridge(registry)
+            self.dash_bridge.start()
+            return
+        if mode != "thread":
+            raise ValueError(f"Unknown dash mode: {mode}")
+        from server.dash_server import run_dash
         dash_thread = threading.Thread(target=run_dash, daemon=True)
         self.threads.append(dash_thread)
         dash_thread.start()
         logger.info("Dash thread started")
 
-    def start_servers(self):
-        self.start_flask()
+    def start_servers(self, mode="flask"):
+        self.start_control(mode)
         self.start_dash()
 
     def join(self):
         for thread in self.threads:
-            thread.join()
\ No newline at end of file
+            thread.join()
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+# Flask 서버와 asyncio 서버의 /info + /get_move 지연 시간 비교
+# 사용법: python test/bench_server_latency.py --requests 2000
+import argparse
+import http.client
+import json
+import logging
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from navigation.navigation import navigation
+from navigation.rddf_writer import RddfWriter
+from server.async_server import run_async_server
+from server.flask_server import app
+
+INFO = {"playerPos": {"x": 60.0, "z": 30.0, "y": 8.0}, "playerSpeed": 1.0, "playerBodyX": 0.0}
+
+def wait_for_port(port, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError(f"server on port {port} did not start")
+
+def start_flask(port):
+    from werkzeug.serving import make_server
+    server = make_server("127.0.0.1", port, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    wait_for_port(port)
+
+def start_async(port):
+    threading.Thread(target=run_async_server, args=("127.0.0.1", port), daemon=True).start()
+    wait_for_port(port)
+
+def percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(q / 100.0 * (len(ordered) - 1))))]
+
+def request(conn, method, path, body=None):
+    payload = json.dumps(body).encode() if body is not None else None
+    headers = {"Content-Type": "application/json"} if payload is not None else {}
+    conn.request(method, path, body=payload, headers=headers)
+    response = conn.getresponse()
+    data = response.read()
+    if response.status != 200:
+        raise RuntimeError(f"{method} {path} -> {response.status}: {data!r}")
+    return data
+
+def measure(port, count, batch):
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    samples = []
+    for _ in range(count):
+        start = time.perf_counter()
+        if batch:
+            request(conn, "POST", "/batch", [{"path": "/info", "body": INFO}, {"path": "/get_move"}])
+        else:
+            request(conn, "POST", "/info", INFO)
+            request(conn, "GET", "/get_move")
+        samples.append((time.perf_counter() - start) * 1000.0)
+    conn.close()
+    return samples
+
+def report(name, samples):
+    print(f"{name:<14} p50={percentile(samples, 50):7.3f} ms  p99={percentile(samples, 99):7.3f} ms  "
+          f"max={max(samples):7.3f} ms  n={len(samples)}")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--flask-port", type=int, default=5150)
+    parser.add_argument("--async-port", type=int, default=5151)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    navigation.rddf.writer = RddfWriter(filename=os.path.join(tempfile.mkdtemp(), "rddf.csv"))
+    start_flask(args.flask_port)
+    start_async(args.async_port)
+
+    # 워밍업 후 측정 (info + get_move 한 쌍의 왕복 시간)
+    measure(args.flask_port, 50, False)
+    measure(args.async_port, 50, False)
+    report("flask", measure(args.flask_port, args.requests, False))
+    report("async", measure(args.async_port, args.requests, False))
+    report("async/batch", measure(args.async_port, args.requests, True))
+    navigation.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+# 프로세스 시작 시간 벤치마크: app.py를 새로 띄워 제어 서버가 첫 응답을 줄 때까지의 시간을 잰다.
+# headless 모드에서 dash/plotly/matplotlib/pandas를 읽지 않는지도 확인하고, 기준을 넘으면 종료 코드 1.
+# 사용법: python test/bench_startup.py --runs 5 --server async --max-ms 800
+import argparse
+import http.client
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ("dash", "plotly", "matplotlib", "pandas")
+
+# headless 시작 경로가 읽어 들이는 무거운 모듈 (app.main이 실제로 import하는 것과 같은 순서)
+IMPORT_CHECK = """
+import json, sys
+import app
+from server.thread_manager import ThreadManager
+import server.{server}_server
+print(json.dumps(sorted(m for m in {heavy!r} if m in sys.modules)))
+"""
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def wait_ready(port, proc, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"app.py exited with {proc.returncode}")
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=0.5)
+            conn.request("GET", "/metrics")
+            if conn.getresponse().status == 200:
+                conn.close()
+                return
+        except OSError:
+            time.sleep(0.005)
+    raise RuntimeError(f"control server on port {port} not ready after {timeout}s")
+
+def time_startup(server, headless, timeout):
+    port = free_port()
+    cmd = [sys.executable, "app.py", "--server", server, "--port", str(port)]
+    if headless:
+        cmd.append("--headless")
+    started = time.perf_counter()
+    proc = subprocess.Popen(cmd, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_ready(port, proc, timeout)
+        return (time.perf_counter() - started) * 1000.0
+    finally:
+        proc.terminate()
+        proc.wait()
+
+def loaded_heavy_modules(server):
+    code = IMPORT_CHECK.format(server=server, heavy=HEAVY_MODULES)
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--server", choices=["flask", "async"], default="async")
+    parser.add_argument("--full", action="store_true", help="Dash까지 띄우는 기본 모드도 함께 측정")
+    parser.add_argument("--max-ms", type=float, default=1000.0, help="headless 시작 시간 중앙값 기준 (ms)")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    args = parser.parse_args()
+
+    failed = False
+    heavy = loaded_heavy_modules(args.server)
+    print(f"headless imports: {', '.join(heavy) if heavy else 'no heavy modules'}")
+    if heavy:
+        failed = True
+
+    modes = [("headless", True)] + ([("full", False)] if args.full else [])
+    for name, headless in modes:
+        samples = sorted(time_startup(args.server, headless, args.timeout) for _ in range(args.runs))
+        median = samples[len(samples) // 2]
+        print(f"{name:8s} {args.server}: median={median:7.1f} ms  min={samples[0]:7.1f} ms  max={samples[-1]:7.1f} ms")
+        if headless and median > args.max_ms:
+            print(f"  slower than --max-ms {args.max_ms:.0f} ms")
+            failed = True
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+# 게임 클라이언트 대신 쓰는 헤드리스 전차 시뮬레이터 + 종단 간 벤치마크
+# 운동학 모델 전차가 /info를 POST하고 /get_move를 GET해 받은 명령대로 움직인다.
+#
+# 사용법:
+#   python test/sim_tank.py --rate 100 --clients 4 --duration 10
+#   python test/sim_tank.py --url http://127.0.0.1:5050 --rate 50   (실행 중인 서버 대상)
+#   python test/sim_tank.py --clients 16 --vehicles   (클라이언트마다 다른 vehicle_id)
+import argparse
+import http.client
+import json
+import logging
+import math
+import os
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import urlparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from navigation.map_index import MapIndex
+from utils.config import SHARED
+from utils.map_loader import MAP_COLUMNS
+
+def percentile(samples, q):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(q / 100.0 * (len(ordered) - 1))))]
+
+# 명령 속도/각도를 1차 지연과 최대 선회율로 따라가는 단순 운동학 모델
+class KinematicTank:
+    def __init__(self, x, z, yaw_deg, speed_tau=0.5, max_yaw_rate=90.0):
+        self.x = x
+        self.z = z
+        self.y = 0.0
+        self.yaw = yaw_deg
+        self.speed = 0.0
+        self.speed_tau = speed_tau
+        self.max_yaw_rate = max_yaw_rate
+
+    def step(self, command, dt):
+        target_speed = 0.0 if command.get("command") == "STOP" else float(command.get("speed", 0.0))
+        self.speed += (target_speed - self.speed) * min(1.0, dt / self.speed_tau)
+        yaw_error = ((float(command.get("yaw", self.yaw)) - self.yaw + 180.0) % 360.0) - 180.0
+        max_step = self.max_yaw_rate * dt
+        self.yaw += max(-max_step, min(max_step, yaw_error))
+        self.yaw = ((self.yaw + 180.0) % 360.0) - 180.0
+        rad = math.radians(self.yaw)
+        self.x += self.speed * math.sin(rad) * dt
+        self.z += self.speed * math.cos(rad) * dt
+
+    def info(self):
+        return {
+            "playerPos": {"x": self.x, "z": self.z, "y": self.y},
+            "playerSpeed": self.speed,
+            "playerBodyX": self.yaw
+        }
+
+# 같은 프로세스의 Flask 앱에 test_client로 요청
+class InProcessTransport:
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def post(self, path, body):
+        return self.client.post(path, json=body).get_json()
+
+    def get(self, path):
+        return self.client.get(path).get_json()
+
+# 실행 중인 서버에 keep-alive HTTP 연결로 요청
+class HttpTransport:
+    def __init__(self, url):
+        parsed = urlparse(url)
+        self.conn = http.client.HTTPConnection(parsed.hostname, parsed.port or 80)
+
+    def _request(self, method, path, body=None):
+        payload = json.dumps(body).encode() if body is not None else None
+        headers = {"Content-Type": "application/json"} if payload is not None else {}
+        self.conn.request(method, path, body=payload, headers=headers)
+        response = self.conn.getresponse()
+        data = response.read()
+        if response.status != 200:
+            raise RuntimeError(f"{method} {path} -> {response.status}")
+        return json.loads(data)
+
+    def post(self, path, body):
+        return self._request("POST", path, body)
+
+    def get(self, path):
+        return self._request("GET", path)
+
+class SimClient(threading.Thread):
+    def __init__(self, transport, tank, rate_hz, duration, map_index, vehicle_id=None):
+        super().__init__(daemon=True)
+        self.transport = transport
+        self.query = f"?vehicle_id={vehicle_id}" if vehicle_id else ""
+        self.tank = tank
+        self.period = 1.0 / rate_hz
+        self.duration = duration
+        self.map_index = map_index
+        self.info_ms = []
+        self.move_ms = []
+        self.tracking_error = []
+        self.errors = 0
+
+    def run(self):
+        start = time.monotonic()
+        deadline = start
+        last = start
+        while True:
+            now = time.monotonic()
+            if now - start >= self.duration:
+                break
+            try:
+                t0 = time.perf_counter()
+                self.transport.post("/info" + self.query, self.tank.info())
+                t1 = time.perf_counter()
+                command = self.transport.get("/get_move" + self.query)
+                t2 = time.perf_counter()
+            except Exception:
+                self.errors += 1
+                command = {"command": "STOP"}
+                t0 = t1 = t2 = time.perf_counter()
+            self.info_ms.append((t1 - t0) * 1000.0)
+            self.move_ms.append((t2 - t1) * 1000.0)
+            now = time.monotonic()
+            self.tank.step(command, now - last)
+            last = now
+            if self.map_index is not None:
+                self.tracking_error.append(self.map_index.nearest(self.tank.x, self.tank.z)[1])
+            deadline += self.period
+            delay = deadline - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                deadline = time.monotonic()
+
+def report(clients, elapsed):
+    info_ms = [v for c in clients for v in c.info_ms]
+    move_ms = [v for c in clients for v in c.move_ms]
+    errors = [v for c in clients for v in c.tracking_error]
+    cycles = len(move_ms)
+    print(f"clients={len(clients)} cycles={cycles} elapsed={elapsed:.2f}s "
+          f"throughput={cycles / elapsed:.1f} cycles/s ({2 * cycles / elapsed:.1f} req/s) "
+          f"failures={sum(c.errors for c in clients)}")
+    for name, samples in (("/info", info_ms), ("/get_move", move_ms)):
+        print(f"  {name:<10} p50={percentile(samples, 50):7.3f} ms  p99={percentile(samples, 99):7.3f} ms  "
+              f"max={max(samples) if samples else 0.0:7.3f} ms")
+    if errors:
+        print(f"  tracking error  mean={sum(errors) / len(errors):.3f} m  p99={percentile(errors, 99):.3f} m  "
+              f"max={max(errors):.3f} m")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default=None, help="실행 중인 서버 주소 (없으면 같은 프로세스의 Flask 앱 사용)")
+    parser.add_argument("--rate", type=float, default=20.0, help="클라이언트당 주기 (10~1000 Hz)")
+    parser.add_argument("--clients", type=int, default=1)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--speed", type=float, default=20.0, help="목표 속도 (km/h, 같은 프로세스일 때만)")
+    parser.add_argument("--tracking", default="pure_pursuit", help="경로 추종 모드 (같은 프로세스일 때만)")
+    parser.add_argument("--scheduler", action="store_true", help="같은 프로세스에서 제어 스케줄러도 실행")
+    parser.add_argument("--vehicles", action="store_true", help="클라이언트마다 별도 차량(vehicle_id)으로 접속")
+    args = parser.parse_args()
+    if not 1.0 <= args.rate <= 1000.0:
+        parser.error("--rate must be between 1 and 1000 Hz")
+
+    logging.disable(logging.INFO)
+    map_data = SHARED['map_data']
+    map_index = MapIndex(map_data[:, :3], map_data[:, MAP_COLUMNS['s']]) if map_data is not None else None
+
+    if args.url:
+        make_transport = lambda: HttpTransport(args.url)
+    else:
+        from navigation.rddf_writer import RddfWriter
+        from navigation.vehicle_registry import registry
+        from server.flask_server import app
+        log_dir = tempfile.mkdtemp()
+        for i in range(args.clients if args.vehicles else 1):
+            vehicle = registry.get(f"sim{i}" if args.vehicles else None)
+            vehicle.navigation.rddf.writer = RddfWriter(filename=os.path.join(log_dir, f"rddf_{vehicle.vehicle_id}.csv"))
+            with vehicle.shared.section('tuning') as state:
+                state['tank_tar_vel_kh'] = args.speed
+                state['tracking_mode'] = args.tracking
+        if args.scheduler:
+            registry.start()
+        make_transport = lambda: InProcessTransport(app)
+
+    clients = []
+    for i in range(args.clients):
+        x, z = float(map_data[0, MAP_COLUMNS['x']]), float(map_data[0, MAP_COLUMNS['z']])
+        heading = float(map_data[0, MAP_COLUMNS['heading']])
+        tank = KinematicTank(x + i * 0.5, z, heading)
+        index = MapIndex(map_data[:, :3], map_data[:, MAP_COLUMNS['s']]) if map_index is not None else None
+        vehicle_id = f"sim{i}" if args.vehicles else None
+        clients.append(SimClient(make_transport(), tank, args.rate, args.duration, index, vehicle_id))
+
+    start = time.monotonic()
+    for client in clients:
+        client.start()
+    for client in clients:
+        client.join()
+    report(clients, time.monotonic() - start)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+# -*- coding: utf-8 -*-
+# 실행: python -m pytest test/test_async_server.py
+import asyncio
+import pytest
+from server.async_server import HttpError, read_request
+
+def parse(raw):
+    async def run():
+        reader = asyncio.StreamReader()
+        reader.feed_data(raw)
+        reader.feed_eof()
+        return await read_request(reader)
+    return asyncio.run(run())
+
+def test_reads_body_and_keep_alive():
+    method, path, body, keep_alive = parse(b"POST /info HTTP/1.1\r\nContent-Length: 2\r\n\r\n{}")
+    assert (method, path, body, keep_alive) == ("POST", "/info", b"{}", True)
+
+@pytest.mark.parametrize("length", [b"abc", b"-1", b"1.5"])
+def test_bad_content_length_is_400(length):
+    with pytest.raises(HttpError) as error:
+        parse(b"POST /info HTTP/1.1\r\nContent-Length: " + length + b"\r\n\r\n{}")
+    assert error.value.status == 400 and error.value.message == "bad content-length"
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+# 실행: python -m pytest test/test_dash_bridge.py
+import os
+import pickle
+import queue
+import numpy as np
+import pytest
+from navigation.rddf_writer import RddfWriter
+from navigation.vehicle_registry import registry
+from server.dash_bridge import DASH_BUFFER_KEYS, DashBridge, ShmStateSource
+
+@pytest.fixture
+def vehicle(tmp_path):
+    navigation = registry.get().navigation
+    writer = navigation.rddf.writer
+    navigation.rddf.writer = RddfWriter(filename=os.path.join(str(tmp_path), "rddf.csv"))
+    yield navigation
+    navigation.rddf.close()
+    navigation.rddf.writer = writer
+
+@pytest.fixture
+def bridge():
+    bridge = DashBridge(registry, delta_history=3)
+    source = ShmStateSource(bridge.region.name, bridge.commands, {"map_points": bridge._static_map})
+    # 대시 프로세스가 붙어 있는 것처럼 heartbeat를 남긴다
+    source.ids()
+    yield bridge, source
+    bridge.region.close()
+
+def drive(navigation, count):
+    for _ in range(count):
+        k = navigation.shared['rddf_data'].seq
+        navigation.update_info({"playerPos": {"x": k * 0.7, "z": 5.0 * np.sin(k / 20.0), "y": 0.0},
+                                "playerSpeed": 3.0, "playerBodyX": 90.0})
+
+def assert_same(source):
+    local, remote = source.snapshot("default"), registry.get().shared.snapshot()
+    # 제어 쪽 궤적 LOD는 스케줄러 작업이 링에서 따라잡는다
+    registry.get().navigation.rddf.update_lod()
+    for key in DASH_BUFFER_KEYS:
+        a, b = local[key].since(0), remote[key].since(0)
+        assert a[0] == b[0] and np.array_equal(a[2], b[2], equal_nan=True)
+    for viewport in (None, (0.0, 100.0, -10.0, 10.0)):
+        for a, b in zip(local['rddf_lod'].select(viewport, 500), remote['rddf_lod'].select(viewport, 500)):
+            assert np.array_equal(a, b, equal_nan=True)
+    assert local['map_points'] is not None
+
+def test_publishes_buffer_deltas_after_first_export(vehicle, bridge):
+    bridge, source = bridge
+    drive(vehicle, 1200)
+    bridge.publish()
+    full = len(bridge._blobs["default"][1])
+    assert_same(source)
+    for _ in range(5):
+        drive(vehicle, 10)
+        bridge.publish()
+        assert len(bridge._blobs["default"][1]) < full / 4
+        assert_same(source)
+    assert bridge.stats["full_exports"] == 1
+
+def test_resyncs_after_missing_more_than_history(vehicle, bridge):
+    bridge, source = bridge
+    drive(vehicle, 50)
+    bridge.publish()
+    assert_same(source)
+    for _ in range(5):
+        drive(vehicle, 5)
+        bridge.publish()
+    # 증분 앞부분이 빠졌으므로 대시 쪽이 전체 재전송을 요청한다
+    source.snapshot("default")
+    commands = []
+    try:
+        while True:
+            commands.append(bridge.commands.get(timeout=0.5))
+    except queue.Empty:
+        pass
+    assert ("sync", "default") in commands
+    for command in commands:
+        bridge.apply(command)
+    bridge.publish()
+    assert bridge.stats["full_exports"] == 2
+    assert_same(source)
+
+def test_sends_only_changed_fields(vehicle, bridge):
+    bridge, source = bridge
+    drive(vehicle, 20)
+    bridge.publish()
+    assert_same(source)
+    with vehicle.shared.section('tuning') as state:
+        state['tank_tar_vel_kh'] = 17.0
+    bridge.publish()
+    state = pickle.loads(bridge._blobs["default"][1])
+    assert state['tank_tar_vel_kh'] == 17.0 and 'path' not in state and 'vel_pid' not in state
+    local = source.snapshot("default")
+    assert local['tank_tar_vel_kh'] == 17.0 and local['vel_pid'] == vehicle.shared['vel_pid']
+    assert_same(source)
+
+def test_stops_publishing_without_reader(vehicle, bridge):
+    bridge, source = bridge
+    drive(vehicle, 20)
+    assert bridge.publish()
+    bridge.reader_ttl = -1.0
+    drive(vehicle, 5)
+    assert not bridge.publish()
+    assert bridge.stats["idle"] == 1 and not bridge._blobs
+    # 다시 붙으면 전체 상태부터 보낸다
+    bridge.reader_ttl = 60.0
+    source.ids()
+    assert bridge.publish()
+    assert bridge.stats["full_exports"] == 2
+    assert_same(source)
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+# 실행: python -m pytest test/test_event_bus.py
+import json
+import pytest
+from server.event_stream import StreamEncoder, subscribe_from_query
+from utils.event_bus import EventBus
+
+# SSE 텍스트를 (event, id, data) 목록으로
+def parse(chunk):
+    messages = []
+    for block in chunk.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.split("\n"))
+        messages.append((fields["event"], fields.get("id"), json.loads(fields["data"])))
+    return messages
+
+def test_publish_filters_by_type_and_vehicle():
+    bus = EventBus()
+    assert bus.publish("pose", "a", {"x": 1}) is None
+    poses = bus.subscribe(types=["pose"])
+    vehicle_b = bus.subscribe(vehicles=["b"])
+    bus.publish("pose", "a", {"x": 1})
+    bus.publish("command", "b", {"speed": 2})
+    assert [event.type for event in poses.drain()] == ["pose"]
+    assert [event.vehicle for event in vehicle_b.drain()] == ["b"]
+    vehicle_b.close()
+    assert len(bus) == 1 and bus.published == 2
+
+def test_subscribe_rejects_unknown_types_and_too_many_subscribers():
+    bus = EventBus(max_subscribers=1)
+    with pytest.raises(ValueError):
+        bus.subscribe(types=["teleport"])
+    bus.subscribe()
+    with pytest.raises(ValueError):
+        bus.subscribe()
+
+def test_full_queue_drops_oldest_and_stream_reports_once():
+    bus = EventBus()
+    subscription = bus.subscribe(maxlen=3)
+    for i in range(5):
+        bus.publish("pose", "a", {"x": i})
+    events = subscription.drain()
+    assert [event.data["x"] for event in events] == [2, 3, 4] and subscription.dropped == 2
+    encoder = StreamEncoder(subscription)
+    assert parse(encoder.encode(events))[0] == ("dropped", None, {"dropped": 2})
+    bus.publish("pose", "a", {"x": 5})
+    assert [name for name, _, _ in parse(encoder.encode(subscription.drain()))] == ["pose"]
+
+def test_stream_coalesces_per_vehicle_and_sends_changed_fields():
+    bus = EventBus()
+    subscription = subscribe_from_query("types=pose,command&vehicle_id=a,b", bus)
+    bus.publish("pose", "a", {"x": 1, "z": 0})
+    bus.publish("pose", "b", {"x": 7, "z": 7})
+    last = bus.publish("pose", "a", {"x": 2})
+    bus.publish("pose", "c", {"x": 9})
+    encoder = StreamEncoder(subscription)
+    messages = parse(encoder.encode(subscription.drain()))
+    # a의 두 이벤트는 하나로 합치되 앞선 이벤트의 z도 남고, id는 마지막 이벤트 번호
+    assert [(name, data["vehicle"]) for name, _, data in messages] == [("pose", "a"), ("pose", "b")]
+    assert messages[0][1] == str(last.seq) and (messages[0][2]["x"], messages[0][2]["z"]) == (2, 0)
+    bus.publish("pose", "a", {"x": 2, "z": 3})
+    bus.publish("pose", "b", {"x": 7, "z": 7})
+    messages = parse(encoder.encode(subscription.drain()))
+    assert len(messages) == 1
+    assert {key: value for key, value in messages[0][2].items() if key != "time"} == {"z": 3, "vehicle": "a"}
+    assert encoder.encode([]) == ""
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+# 실행: python -m pytest test/test_lod.py
+import math
+import numpy as np
+from utils.lod import TrajectoryLOD
+from utils.timeseries import TimeSeriesBuffer
+
+LEVELS = (0.0, 0.25, 1.0, 4.0)
+
+# 수준 하나를 점마다 그대로 따라가는 참조 구현
+def reference_kept(points, eps, window):
+    kept, pending, anchor = [points[0]], [], points[0]
+    for k, (x, z) in enumerate(points[1:], start=2):
+        pending.append((x, z))
+        ax, az = anchor
+        dx, dz = x - ax, z - az
+        length2 = dx * dx + dz * dz
+        deviated = False
+        for px, pz in pending[:-1]:
+            t = 0.0 if length2 == 0 else max(0.0, min(1.0, ((px - ax) * dx + (pz - az) * dz) / length2))
+            deviated = deviated or math.hypot(px - ax - t * dx, pz - az - t * dz) > eps
+        if deviated or len(pending) > window:
+            kept.append(pending[-2])
+            anchor = pending[-2]
+            del pending[:-1]
+    return np.array(kept)
+
+def trajectory(n, seed=0):
+    rng = np.random.default_rng(seed)
+    t = np.arange(n) * 0.05
+    return np.column_stack((3.0 * t + rng.normal(0, 0.05, n), 20.0 * np.sin(t / 10.0) + rng.normal(0, 0.05, n)))
+
+def test_levels_match_reference():
+    points = trajectory(3000)
+    lod = TrajectoryLOD(LEVELS, 5000, 16)
+    for x, z in points.tolist():
+        lod.append(x, z)
+    for level, eps in enumerate(LEVELS):
+        _, kept = lod.kept[level].window()
+        expected = points if eps == 0 else reference_kept(points.tolist(), eps, 16)
+        np.testing.assert_array_equal(kept, expected)
+
+def test_catch_up_follows_buffer_and_skips_overwritten_rows():
+    points = trajectory(500)
+    buffer = TimeSeriesBuffer(100, ("x", "z", "y", "speed"))
+    lod = TrajectoryLOD(LEVELS, 1000, 16)
+    rows = np.column_stack((points, np.zeros((500, 2))))
+    buffer.extend(rows[:80])
+    lod.catch_up(buffer)
+    assert lod.rows == 80 and lod.kept[0].seq == 80
+    # 링(100행)을 넘게 밀리면 덮어쓴 행은 건너뛰고 남은 행부터 이어 만든다
+    buffer.extend(rows[80:300])
+    lod.catch_up(buffer)
+    assert lod.rows == 300 and lod.kept[0].seq == 180
+    _, kept = lod.kept[0].window()
+    np.testing.assert_array_equal(kept[80:], points[200:300])
+    lod.catch_up(buffer)
+    assert lod.rows == 300
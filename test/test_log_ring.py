@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+# 실행: python -m pytest test/test_log_ring.py
+import logging
+import struct
+from utils.log_ring import HEADER_SIZE, WRAP_MARKER, BinaryRingHandler, format_record, read_ring
+
+def make_record(i, text="step %d"):
+    return logging.LogRecord("ring", logging.INFO, __file__, 10, text, (i,), None)
+
+def test_records_round_trip_with_lazy_args(tmp_path):
+    path = str(tmp_path / "a.ring")
+    handler = BinaryRingHandler(path, 4096)
+    handler.emit(make_record(7, "speed %.1f m/s"))
+    handler.emit(logging.LogRecord("ring", logging.WARNING, __file__, 11, "plain", None, None))
+    handler.close()
+    first, second = read_ring(path)
+    assert (first["seq"], first["msg"], first["args"]) == (0, "speed %.1f m/s", [7])
+    assert format_record(first).endswith("INFO:ring:10: speed 7.0 m/s")
+    assert (second["seq"], second["level"], second["args"]) == (1, "WARNING", [])
+
+def test_wraparound_keeps_newest_contiguous_records(tmp_path):
+    path = str(tmp_path / "b.ring")
+    capacity = 1024
+    handler = BinaryRingHandler(path, capacity)
+    wraps = 0
+    for i in range(300):
+        # 길이를 바꿔 가며 써서 끝부분 여유가 4바이트 미만인 경우와 표시를 남기는 경우를 모두 거친다
+        head = handler.head
+        handler.emit(make_record(i, "x" * (i % 13) + " %d"))
+        if handler.head < head:
+            wraps += 1
+            # 끝에 4바이트 이상 남았으면 그 자리에 되감기 표시가 있어야 한다
+            if head + 4 <= capacity:
+                assert struct.unpack_from("<I", handler._map, HEADER_SIZE + head)[0] == WRAP_MARKER
+        entries = read_ring(path)
+        seqs = [entry["seq"] for entry in entries]
+        assert seqs == list(range(i + 1 - len(seqs), i + 1))
+        assert entries[-1]["args"] == [i]
+    assert wraps >= 5
+    handler.close()
+
+def test_reopen_continues_sequence(tmp_path):
+    path = str(tmp_path / "c.ring")
+    handler = BinaryRingHandler(path, 1024)
+    for i in range(40):
+        handler.emit(make_record(i))
+    handler.close()
+    kept = [entry["seq"] for entry in read_ring(path)]
+    handler = BinaryRingHandler(path, 1024)
+    handler.emit(make_record(40))
+    handler.close()
+    seqs = [entry["seq"] for entry in read_ring(path)]
+    assert seqs[-1] == 40 and seqs[-2] == kept[-1]
+
+def test_oversized_record_is_dropped(tmp_path):
+    path = str(tmp_path / "d.ring")
+    handler = BinaryRingHandler(path, 1024)
+    handler.emit(make_record(0))
+    handler.emit(make_record(1, "y" * 400 + " %d"))
+    handler.close()
+    assert [entry["seq"] for entry in read_ring(path)] == [0]
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+# 실행: python -m pytest test/test_map_index.py
+import numpy as np
+from navigation.map_index import MapIndex
+
+# 머리핀 도로: (0, 0) -> (100, 0) 으로 갔다가 z = 2 m 옆 차선으로 (0, 2)까지 돌아온다
+OUT = [(x, 0.0) for x in np.arange(0.0, 100.0, 0.5)]
+BACK = [(x, 2.0) for x in np.arange(100.0, -0.1, -0.5)]
+POINTS = np.array(OUT + BACK)
+
+def brute(x, z):
+    dist = np.hypot(POINTS[:, 0] - x, POINTS[:, 1] - z)
+    return int(np.argmin(dist)), float(dist.min())
+
+def test_matches_brute_force_from_cold_start():
+    index = MapIndex(POINTS)
+    for x, z in ((50.2, -0.7), (0.0, 30.0), (-15.0, -12.0), (99.0, 1.2)):
+        index.reset()
+        idx, dist = index.nearest(x, z)
+        assert np.isclose(dist, brute(x, z)[1])
+
+def test_window_keeps_current_leg_on_hairpin():
+    index = MapIndex(POINTS)
+    index.nearest(10.0, -0.2)
+    # 바깥 차선을 따라가는 동안 1.2 m 옆 돌아오는 차선이 더 가까워도 창 안의 점을 고른다
+    for x in np.arange(10.0, 60.0, 0.7):
+        idx, dist = index.nearest(x, 1.2)
+        assert idx < len(OUT) and dist < 1.3
+        assert brute(x, 1.2)[0] >= len(OUT)
+
+def test_lost_track_falls_back_to_grid_search():
+    index = MapIndex(POINTS)
+    index.nearest(10.0, 0.0)
+    # 창(뒤 5 m, 앞 20 m) 밖으로 크게 튀면 전체 그리드에서 다시 찾는다
+    idx, dist = index.nearest(80.0, 2.3)
+    assert (idx, dist) == brute(80.0, 2.3) and idx >= len(OUT)
+    # 그리드 링 범위를 넘어 멀리 떨어져도 전체 탐색으로 답한다
+    idx, dist = index.nearest(400.0, 300.0)
+    assert idx == brute(400.0, 300.0)[0] and np.isclose(dist, brute(400.0, 300.0)[1])
+
+def test_fork_shares_grid_but_not_search_state():
+    index = MapIndex(POINTS)
+    index.nearest(50.0, 0.0)
+    forked = index.fork()
+    assert forked.cells is index.cells and forked.last_idx is None
+    forked.nearest(90.0, 2.0)
+    assert index.last_idx == brute(50.0, 0.0)[0]
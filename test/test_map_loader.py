@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+# 실행: python -m pytest test/test_map_loader.py
+import json
+import os
+import numpy as np
+from utils import map_loader
+from utils.map_loader import MAP_COLUMNS, load_map
+
+def write_csv(path, rows):
+    with open(path, "w") as f:
+        f.write("x,y,z\n")
+        for x, y, z in rows:
+            f.write(f"{x},{y},{z}\n")
+
+def count_compiles(monkeypatch):
+    calls = []
+    compile_map = map_loader.compile_map
+    monkeypatch.setattr(map_loader, "compile_map", lambda *args: calls.append(args) or compile_map(*args))
+    return calls
+
+def test_compiles_once_and_reuses_artifact(tmp_path, monkeypatch):
+    csv_path = str(tmp_path / "map.csv")
+    write_csv(csv_path, [(0, 0, 0), (3, 0, 4), (6, 0, 8)])
+    calls = count_compiles(monkeypatch)
+    data = load_map(csv_path)
+    assert isinstance(data, np.memmap)
+    assert np.allclose(data[:, MAP_COLUMNS['s']], [0, 5, 10])
+    load_map(csv_path)
+    assert len(calls) == 1
+
+def test_mtime_change_with_same_content_is_not_rebuilt(tmp_path, monkeypatch):
+    csv_path = str(tmp_path / "map.csv")
+    write_csv(csv_path, [(0, 0, 0), (0, 0, 1)])
+    load_map(csv_path)
+    stat = os.stat(csv_path)
+    os.utime(csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 5_000_000_000))
+    calls = count_compiles(monkeypatch)
+    load_map(csv_path)
+    assert calls == []
+
+def test_content_change_rebuilds(tmp_path, monkeypatch):
+    csv_path = str(tmp_path / "map.csv")
+    write_csv(csv_path, [(0, 0, 0), (0, 0, 1)])
+    load_map(csv_path)
+    # 크기와 수정 시각이 그대로여도 해시가 다르면 다시 컴파일한다
+    stat = os.stat(csv_path)
+    write_csv(csv_path, [(0, 0, 0), (0, 0, 2)])
+    os.utime(csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+    calls = count_compiles(monkeypatch)
+    data = load_map(csv_path)
+    assert len(calls) == 1
+    assert np.allclose(data[:, MAP_COLUMNS['z']], [0, 2])
+
+def test_format_version_change_rebuilds(tmp_path, monkeypatch):
+    csv_path = str(tmp_path / "map.csv")
+    write_csv(csv_path, [(0, 0, 0), (0, 0, 1)])
+    load_map(csv_path)
+    meta_path = str(tmp_path / "map.meta.json")
+    with open(meta_path) as f:
+        meta = json.load(f)
+    meta["version"] = map_loader.MAP_FORMAT_VERSION - 1
+    with open(meta_path, "w") as f:
+        json.dump(meta, f)
+    calls = count_compiles(monkeypatch)
+    load_map(csv_path)
+    assert len(calls) == 1
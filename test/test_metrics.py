@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+# 실행: python -m pytest test/test_metrics.py
+import re
+from utils.metrics import MetricsRegistry
+
+LABEL = r'[a-zA-Z_][a-zA-Z0-9_]*="(?:[^"\\]|\\.)*"'
+SAMPLE = re.compile(r'^[a-zA-Z_:][a-zA-Z0-9_:]*(\{' + LABEL + r'(,' + LABEL + r')*\})? (-?[0-9.e+-]+|\+Inf|NaN)$')
+
+def parse(text):
+    types, samples = {}, []
+    for line in text.splitlines():
+        if line.startswith("# TYPE "):
+            _, _, name, kind = line.split(" ")
+            assert name not in types
+            types[name] = kind
+        elif line and not line.startswith("#"):
+            assert SAMPLE.match(line), line
+            samples.append(line)
+    return types, samples
+
+def test_render_format():
+    metrics = MetricsRegistry()
+    for value in (0.5, 3.0, 40.0):
+        metrics.observe("request_seconds", value, "Request time", endpoint="/info")
+    metrics.register_collector(lambda: iter([
+        ("counter", "jobs_total", "Jobs", {"kind": 'a"b'}, 3),
+        ("gauge", "queue_size", "Queue", {}, 2)
+    ]))
+    types, samples = parse(metrics.render())
+    assert types == {"request_seconds": "histogram", "jobs_total": "counter", "queue_size": "gauge"}
+    assert 'jobs_total{kind="a\\"b"} 3.0' in samples and "queue_size 2.0" in samples
+    buckets = [line for line in samples if line.startswith("request_seconds_bucket")]
+    counts = [float(line.rsplit(" ", 1)[1]) for line in buckets]
+    assert counts == sorted(counts) and buckets[-1] == 'request_seconds_bucket{endpoint="/info",le="+Inf"} 3'
+    assert 'request_seconds_count{endpoint="/info"} 3' in samples
+
+def test_metrics_endpoint_exports_writer_counters():
+    from server.flask_server import app
+    response = app.test_client().get("/metrics")
+    assert response.status_code == 200 and response.mimetype == "text/plain"
+    types, samples = parse(response.get_data(as_text=True))
+    for name in ("written", "dropped", "errors", "restarts"):
+        assert types[f"rddf_writer_{name}_total"] == "counter"
+        assert f"rddf_writer_{name}" not in types
+    assert types["rddf_writer_queue_high_water"] == "gauge"
+    assert any(line.startswith('rddf_writer_written_total{vehicle="default"} ') for line in samples)
+    # counter 이름은 모두 _total로 끝난다
+    assert all(name.endswith("_total") for name, kind in types.items() if kind == "counter")
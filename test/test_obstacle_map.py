@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+# 실행: python -m pytest test/test_obstacle_map.py
+import math
+import pytest
+from navigation.navigation import Navigation
+from navigation.obstacle_map import ObstacleMap
+from navigation.replay import DiscardWriter, VirtualClock
+from navigation.vehicle_registry import new_vehicle_state
+from utils.event_bus import EventBus
+
+def test_nearest_matches_brute_force():
+    obstacles = ObstacleMap(cell_size=4.0)
+    items = [(f"o{i}", (i * 7.3) % 90.0 - 45.0, (i * 13.1) % 70.0 - 35.0, (i % 3) * 0.5) for i in range(60)]
+    for oid, x, z, r in items:
+        obstacles.upsert(oid, x, z, r)
+    for qx, qz in ((0.0, 0.0), (-44.0, 30.0), (120.0, -80.0), (10.5, 3.2)):
+        oid, clearance = obstacles.nearest(qx, qz)
+        expected = min(math.hypot(x - qx, z - qz) - r for _, x, z, r in items)
+        assert clearance == pytest.approx(expected)
+        x, z, r = obstacles.items[oid]
+        assert math.hypot(x - qx, z - qz) - r == pytest.approx(expected)
+    assert obstacles.nearest(120.0, -80.0, max_distance=10.0) is None
+    assert ObstacleMap().nearest(0.0, 0.0) is None
+
+def test_segment_collides_uses_radius_and_spans_cells():
+    obstacles = ObstacleMap(cell_size=4.0)
+    obstacles.upsert("rock", 20.0, 2.0, 1.0)
+    assert obstacles.segment_collides(0.0, 0.0, 40.0, 0.0) is None
+    assert obstacles.segment_collides(0.0, 0.0, 40.0, 0.0, radius=1.5) == "rock"
+    # 끝점이 장애물 앞에서 멈추면 닿지 않는다
+    assert obstacles.segment_collides(0.0, 0.0, 17.0, 0.0, radius=1.5) is None
+    obstacles.remove("rock")
+    assert obstacles.segment_collides(0.0, 0.0, 40.0, 0.0, radius=1.5) is None
+
+def test_footprint_collides_looks_ahead_even_when_stopped():
+    obstacles = ObstacleMap()
+    obstacles.upsert("wall", 0.0, 3.0, 0.5)
+    # +z 방향(0도)으로 진행하면 3 m 앞 장애물에 닿는다
+    assert obstacles.footprint_collides(0.0, 0.0, 0.0, 5.0)[1] == "wall"
+    # 정지 상태에서도 최소 앞보기 거리로 검사한다
+    assert obstacles.footprint_collides(0.0, 0.0, 0.0, 0.0)[1] == "wall"
+    assert obstacles.footprint_collides(0.0, 0.0, 0.0, 0.0, min_distance=0.0) is None
+    # 반대 방향(180도)으로 가면 닿지 않는다
+    assert obstacles.footprint_collides(0.0, 0.0, 180.0, 5.0) is None
+
+def test_capacity_rejects_without_partial_apply():
+    obstacles = ObstacleMap(max_obstacles=3)
+    assert obstacles.apply([("a", 0.0, 0.0, 1.0), ("b", 10.0, 0.0, 1.0)]) == 2
+    with pytest.raises(ValueError):
+        obstacles.apply([("c", 20.0, 0.0, 1.0), ("d", 30.0, 0.0, 1.0)])
+    assert sorted(obstacles.items) == ["a", "b"]
+    # 지우는 만큼 자리가 생기면 받아들인다
+    assert obstacles.apply([("c", 20.0, 0.0, 1.0), ("d", 30.0, 0.0, 1.0)], removes=["a"]) == 3
+    with pytest.raises(ValueError):
+        obstacles.upsert("e", 40.0, 0.0)
+    # 이미 있는 장애물을 옮기는 것은 개수가 늘지 않는다
+    assert obstacles.upsert("b", 11.0, 0.0, 1.0)
+
+def test_stop_is_held_until_obstacle_clears_for_hold_time():
+    clock = VirtualClock()
+    shared = new_vehicle_state()
+    navigation = Navigation(shared, DiscardWriter(), "obstacle_test", EventBus())
+    navigation.position_handler.clock = clock
+    with shared.section('telemetry') as state:
+        state['playerPos'] = {"x": 0.0, "z": 0.0, "y": 0.0}
+    navigation.obstacle_map.upsert("rock", 0.0, 3.0, 0.5)
+    assert navigation._control_step(0.05)['command'] == "STOP"
+    assert shared['blocking_obstacle'] == "rock"
+
+    # 장애물이 사라져도 clear_hold 동안은 정지 유지
+    navigation.obstacle_map.remove("rock")
+    clock.set(0.5)
+    assert navigation._control_step(0.05)['command'] == "STOP"
+    clock.set(1.5)
+    navigation._control_step(0.05)
+    assert shared['blocking_obstacle'] is None
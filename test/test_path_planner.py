@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+# 실행: python -m pytest test/test_path_planner.py
+import numpy as np
+from navigation.path_planner import DStarLite, GridPlanner, shared_grid
+
+# ㄱ자 도로: (0, 0) -> (200, 0) -> (200, 150)
+MAP_POINTS = np.array([(x, 0.0, 0.0) for x in range(0, 201, 2)] +
+                      [(200.0, z, 0.0) for z in range(2, 151, 2)])
+
+def path_cost(grid, cells):
+    total = 0.0
+    for a, b in zip(cells, cells[1:]):
+        diagonal = a // grid.nz != b // grid.nz and a % grid.nz != b % grid.nz
+        total += grid.edge_cost(a, b, np.sqrt(2.0) if diagonal else 1.0)
+    return total
+
+# 같은 격자 상태에서 처음부터 계산한 최단 경로 비용
+def fresh_cost(grid, start, goal):
+    dstar = DStarLite(grid, start, goal)
+    assert dstar.compute()
+    return path_cost(grid, dstar.extract_path())
+
+def test_incremental_dstar_matches_fresh_search():
+    grid = shared_grid(MAP_POINTS)
+    start, goal = grid.cell_of(0.0, 0.0), grid.cell_of(200.0, 150.0)
+    dstar = DStarLite(grid, start, goal)
+    assert dstar.compute()
+    on_road = path_cost(grid, dstar.extract_path())
+
+    # 도로 위 장애물 두 개와 시작 칸 이동을 부분 수정으로 반영
+    dstar.update_cells(grid.set_obstacles([(100.0, 0.0, 3.0), (200.0, 80.0, 3.0)]))
+    start = grid.cell_of(20.0, 0.0)
+    dstar.move_start(start)
+    assert dstar.compute()
+    cells = dstar.extract_path()
+    assert not grid.blocked.intersection(cells)
+    assert abs(path_cost(grid, cells) - fresh_cost(grid, start, goal)) < 1e-9
+
+    # 장애물을 치우면 다시 도로 위 경로
+    dstar.update_cells(grid.set_obstacles([]))
+    assert dstar.compute()
+    assert abs(path_cost(grid, dstar.extract_path()) - fresh_cost(grid, start, goal)) < 1e-9
+    assert path_cost(grid, dstar.extract_path()) < on_road
+
+def test_set_obstacles_diff_matches_rebuild():
+    grid = shared_grid(MAP_POINTS)
+    first = [(100.0, 0.0, 3.0), (104.0, 0.0, 3.0), (200.0, 80.0)]
+    second = [(104.0, 0.0, 3.0), (200.0, 120.0)]
+    assert grid.set_obstacles(first) == grid.blocked
+    before = set(grid.blocked)
+    changed = grid.set_obstacles(second)
+
+    rebuilt = shared_grid(MAP_POINTS)
+    rebuilt.set_obstacles(second)
+    assert grid.blocked == rebuilt.blocked
+    assert changed == before.symmetric_difference(rebuilt.blocked)
+    # 겹치는 두 장애물 중 하나만 치우면 남은 장애물의 칸은 막힌 채로 남는다
+    assert rebuilt.blocked.issubset(grid.blocked)
+    assert grid.cost == rebuilt.cost
+    assert not grid.set_obstacles(list(reversed(second)))
+
+def test_planners_share_base_grid():
+    first, second = GridPlanner(MAP_POINTS), GridPlanner(MAP_POINTS)
+    assert first.grid.base_cost is second.grid.base_cost
+    first.set_obstacles([(100.0, 0.0, 3.0)], 1)
+    assert first.grid.cost is not first.grid.base_cost
+    assert second.grid.cost is second.grid.base_cost and not second.grid.blocked
+
+def test_plan_avoids_obstacle_and_keeps_current_endpoints():
+    planner = GridPlanner(MAP_POINTS)
+    planner.set_obstacles([], 0)
+    path = planner.plan((0.0, 0.0), (200.0, 150.0))
+    assert path[0] == (0.0, 0.0) and path[-1] == (200.0, 150.0)
+    # 같은 칸 안에서 움직이면 캐시된 칸 경로를 쓰되 양 끝은 이번 좌표다
+    moved = planner.plan((0.5, 0.3), (201.5, 150.4))
+    assert moved[0] == (0.5, 0.3) and moved[-1] == (201.5, 150.4)
+    assert len(planner.cache) == 1
+
+    planner.set_obstacles([(100.0, 0.0, 3.0)], 1)
+    detour = planner.plan((1.0, 0.0), (200.0, 150.0))
+    grid = planner.grid
+    assert all(grid.cell_of(x, z) not in grid.blocked for x, z in detour)
@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+# 실행: python -m pytest test/test_pid_controller.py
+import numpy as np
+from controller.pid_controller import PIDBank, PIDController, PIDDegController
+
+def make_bank():
+    bank = PIDBank(2, integral_limit=5.0, output_limit=1.0, derivative_alpha=0.5)
+    bank.set_gains(0, 0.5, 0.2, 0.05)
+    bank.set_gains(1, 0.02, 0.01, 0.0)
+    bank.wrap[1] = True
+    return bank
+
+# 포화, 오차 0, 각도 감싸기를 지나는 입력에서 채널별 계산과 한 번에 계산한 결과가 같아야 한다
+def test_step_channel_matches_vector_step():
+    vector, scalar = make_bank(), make_bank()
+    inputs = [((10.0, 170.0), (0.0, -170.0)), ((10.0, 0.0), (10.0, 0.0)), ((0.0, 90.0), (4.0, -90.0)),
+              ((3.0, -179.0), (3.0, 179.0)), ((-8.0, 10.0), (0.0, 10.0))]
+    for setpoint, measured in inputs * 3:
+        expected = vector.step(setpoint, measured, 0.1)
+        actual = [scalar.step_channel(i, setpoint[i], measured[i], 0.1) for i in range(2)]
+        assert np.allclose(actual, expected)
+        assert np.allclose(scalar.integral, vector.integral)
+        assert np.allclose(scalar.derivative, vector.derivative)
+
+def test_controller_wraps_angle_error():
+    controller = PIDDegController(kp=1.0)
+    assert controller.compute(170.0, -170.0) == -20.0
+    assert isinstance(PIDController(kp=1.0).compute(1.0, 0.0), float)
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+# 실행: python -m pytest test/test_position.py
+import numpy as np
+from navigation.navigation import Navigation
+from navigation.replay import DiscardWriter
+from navigation.state_estimator import PoseEstimator
+from navigation.vehicle_registry import new_vehicle_state
+from utils.event_bus import EventBus
+
+def info(x, z, speed=2.0):
+    return {"playerPos": {"x": x, "z": z, "y": 0.0}, "playerSpeed": speed, "playerBodyX": 90.0}
+
+# 제어 주기의 예측 위치(est_playerPos)가 끼어들어도 변화량은 /info 샘플끼리의 차이
+def test_position_delta_uses_previous_sample():
+    navigation = Navigation(new_vehicle_state(), DiscardWriter(), "test", EventBus())
+    clock = [0.0]
+    navigation.position_handler.clock = lambda: clock[0]
+    for i, x in enumerate((10.0, 10.2, 10.4, 10.6)):
+        clock[0] = i * 0.1
+        navigation.update_info(info(x, 5.0))
+        clock[0] += 0.08
+        navigation.localize()
+    state = navigation.shared.snapshot()
+    assert state['est_playerPos']['x'] > state['playerPos']['x'] == 10.6
+    _, deltas = state['del_playerPos'].window()
+    assert np.allclose(deltas[:, 0], [0.0, 0.2, 0.2, 0.2]) and np.allclose(deltas[:, 1], 0.0)
+
+# 늦게 도착한 샘플은 그 시각으로 되돌아가 다시 적용하므로 순서대로 받은 결과와 같다
+def test_estimator_reapplies_out_of_order_samples():
+    samples = [(i * 0.05, 1.0 * i * 0.05, 0.0, 90.0, 1.0) for i in range(20)]
+    ordered, shuffled = PoseEstimator(), PoseEstimator()
+    for sample in samples:
+        ordered.update(*sample)
+    order = list(range(20))
+    order[5], order[8] = order[8], order[5]
+    for i in order:
+        shuffled.update(*samples[i])
+    assert shuffled.stats["out_of_order"] == 3
+    assert np.allclose(ordered.predict(1.2), shuffled.predict(1.2))
+
+def test_estimator_drops_samples_older_than_history():
+    estimator = PoseEstimator(history=4)
+    for i in range(1, 6):
+        estimator.update(float(i), float(i), 0.0, 90.0, 1.0)
+    assert not estimator.update(0.5, 0.0, 0.0, 90.0, 1.0)
+    assert estimator.stats["dropped_late"] == 1 and len(estimator.entries) == 4
+
+# 회전하며 잡음이 섞인 경로에서 몇 주기 늦게 온 샘플도 이후 사후 상태와 공분산을 모두 다시 계산한다
+def test_estimator_replays_history_after_late_turn_sample():
+    rng = np.random.default_rng(3)
+    samples = []
+    for i in range(30):
+        t = i * 0.05
+        heading = 90.0 - 40.0 * t
+        samples.append((t, 5.0 * np.sin(t) + rng.normal(0, 0.1), 5.0 * (1 - np.cos(t)) + rng.normal(0, 0.1),
+                        heading, 2.0 + rng.normal(0, 0.05)))
+    ordered, delayed, missing = PoseEstimator(), PoseEstimator(), PoseEstimator()
+    for sample in samples:
+        ordered.update(*sample)
+    order = [i for i in range(30) if i != 12] + [12]
+    for i in order:
+        delayed.update(*samples[i])
+        if i != 12:
+            missing.update(*samples[i])
+    assert delayed.stats["out_of_order"] == 1
+    for expected, actual in zip(ordered.entries, delayed.entries):
+        assert expected[0] == actual[0]
+        assert np.allclose(expected[2], actual[2]) and np.allclose(expected[3], actual[3])
+    assert not np.allclose(missing.entries[-1][3], delayed.entries[-1][3])
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+# 실행: python -m pytest test/test_rddf_writer.py
+import csv
+import os
+import time
+from navigation.rddf_writer import RddfRecord, RddfWriter
+
+def record(i):
+    return RddfRecord(time.time(), float(i), 0.0, 0.0, 1.0, 0.0, "W")
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+class FailingWriter(RddfWriter):
+    failures = 1
+
+    def _write(self, batch):
+        if self.failures:
+            self.failures -= 1
+            raise OSError("disk full")
+        super()._write(batch)
+
+def test_put_restarts_writer_after_error(tmp_path):
+    filename = os.path.join(str(tmp_path), "rddf.csv")
+    writer = FailingWriter(filename=filename, flush_interval=0.01, restart_backoff=0.0)
+    writer.put(record(0))
+    assert wait_for(lambda: writer.get_stats()['errors'] == 1 and not writer.get_stats()['running'])
+
+    assert writer.put(record(1))
+    assert wait_for(lambda: writer.get_stats()['written'] == 1)
+    writer.close()
+    stats = writer.get_stats()
+    assert stats['restarts'] == 1 and stats['errors'] == 1 and stats['dropped'] == 0
+    with open(filename, newline="") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == ["x", "z", "y", "speed"] and [row[0] for row in rows[1:]] == ["1.0"]
+
+def test_persistent_error_stops_restarting_and_drops(tmp_path):
+    writer = FailingWriter(filename=os.path.join(str(tmp_path), "rddf.csv"), flush_interval=0.01,
+                           restart_backoff=0.0, max_restarts=2)
+    writer.failures = 100
+    for i in range(3):
+        writer.put(record(i))
+        assert wait_for(lambda: writer.get_stats()['errors'] == i + 1 and not writer.get_stats()['running'])
+
+    # 재시작 한도를 넘으면 더 띄우지 않고 드롭만 센다
+    assert not writer.put(record(3))
+    stats = writer.get_stats()
+    assert stats['restarts'] == 2 and stats['errors'] == 3 and stats['dropped'] == 1 and not stats['running']
+    writer.close()
+
+def test_restart_waits_for_backoff(tmp_path):
+    writer = FailingWriter(filename=os.path.join(str(tmp_path), "rddf.csv"), flush_interval=0.01,
+                           restart_backoff=60.0)
+    writer.put(record(0))
+    assert wait_for(lambda: writer.get_stats()['errors'] == 1 and not writer.get_stats()['running'])
+
+    # backoff 동안은 큐에만 쌓고 스레드를 띄우지 않는다
+    assert writer.put(record(1))
+    stats = writer.get_stats()
+    assert stats['restarts'] == 0 and stats['queue_size'] == 1 and not stats['running']
+    writer.close()
+
+def test_put_after_close_is_dropped(tmp_path):
+    filename = os.path.join(str(tmp_path), "rddf.csv")
+    writer = RddfWriter(filename=filename, flush_interval=0.01)
+    writer.put(record(0))
+    assert wait_for(lambda: writer.get_stats()['written'] == 1)
+    writer.close()
+
+    assert not writer.put(record(1))
+    stats = writer.get_stats()
+    assert stats['dropped'] == 1 and stats['restarts'] == 0 and not stats['running']
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+# 실행: python -m pytest test/test_record_store.py
+import os
+import numpy as np
+from utils.record_store import BLOCK_HEADER, RecordStore, Segment, read_range, segment_paths
+
+COLUMNS = (("t", "f8"), ("x", "f4"), ("speed", "f4"), ("command", "u1"))
+
+def make_rows(count, start=0, t0=100.0):
+    return [(t0 + i * 0.1, float(i), None if i % 7 == 0 else 1.0, i % 3) for i in range(start, start + count)]
+
+def test_time_range_across_segments(tmp_path):
+    store = RecordStore(str(tmp_path), COLUMNS, block_rows=50, segment_bytes=2000)
+    store.extend(make_rows(1000))
+    store.close()
+    assert len(segment_paths(str(tmp_path))) > 1
+    columns = read_range(str(tmp_path))
+    assert len(columns["t"]) == 1000
+    assert np.isnan(columns["speed"][0]) and columns["speed"][1] == 1.0
+    assert columns["command"].tolist()[:4] == [0, 1, 2, 0]
+    # t0 <= t < t1, 블록 경계를 걸친 범위
+    t = columns["t"]
+    part = read_range(str(tmp_path), t[45], t[160])
+    assert np.array_equal(part["t"], t[45:160])
+    assert np.array_equal(part["x"], np.arange(45, 160, dtype=np.float32))
+    assert read_range(str(tmp_path), 0.0, 50.0) == {}
+
+def test_open_segment_is_readable_before_seal(tmp_path):
+    store = RecordStore(str(tmp_path), COLUMNS, block_rows=10)
+    store.extend(make_rows(25))
+    segment = Segment(segment_paths(str(tmp_path))[0])
+    assert not segment.sealed and segment.rows == 20
+    store.close()
+    assert Segment(segment_paths(str(tmp_path))[0]).sealed
+    assert len(read_range(str(tmp_path))["t"]) == 25
+
+def _truncate_last_block(path, keep_bytes):
+    segment = Segment(path)
+    offset = int(segment.index["offset"][-1])
+    segment.close()
+    with open(path, "r+b") as f:
+        f.truncate(offset + keep_bytes)
+
+def test_recover_torn_first_block_then_append(tmp_path):
+    store = RecordStore(str(tmp_path), COLUMNS, block_rows=10)
+    store.extend(make_rows(10))
+    store.close()
+    # 비정상 종료: 새 세그먼트의 첫 블록이 중간까지만 쓰였다
+    store = RecordStore(str(tmp_path), COLUMNS, block_rows=10)
+    store.extend(make_rows(10, start=10))
+    _truncate_last_block(store._writer.path, BLOCK_HEADER.size + 16)
+
+    store = RecordStore(str(tmp_path), COLUMNS, block_rows=10)
+    assert store.seq == 10
+    store.extend(make_rows(10, start=10))
+    store.close()
+    columns = read_range(str(tmp_path))
+    assert columns["x"].tolist() == list(range(20))
+
+def test_recover_torn_block_keeps_complete_blocks(tmp_path):
+    store = RecordStore(str(tmp_path), COLUMNS, block_rows=10)
+    store.extend(make_rows(30))
+    path = store._writer.path
+    _truncate_last_block(path, BLOCK_HEADER.size - 4)
+
+    store = RecordStore(str(tmp_path), COLUMNS, block_rows=10)
+    assert store.seq == 20 and Segment(path).sealed
+    store.extend(make_rows(10, start=20))
+    store.close()
+    assert read_range(str(tmp_path))["x"].tolist() == list(range(30))
+
+def test_recover_header_only_segment(tmp_path):
+    store = RecordStore(str(tmp_path), COLUMNS, block_rows=10)
+    store.extend(make_rows(10))
+    path = store._writer.path
+    with open(path, "r+b") as f:
+        f.truncate(4)
+    store = RecordStore(str(tmp_path), COLUMNS, block_rows=10)
+    assert store.seq == 0 and not os.path.exists(path)
+    store.extend(make_rows(10))
+    store.close()
+    assert len(read_range(str(tmp_path))["t"]) == 10
+
+def test_timestamps_stay_monotonic(tmp_path):
+    store = RecordStore(str(tmp_path), COLUMNS, block_rows=4)
+    store.extend([(5.0, 0, 0, 0), (3.0, 1, 0, 0), (None, 2, 0, 0), (1.0, 3, 0, 0)])
+    store.close()
+    t = read_range(str(tmp_path))["t"]
+    assert np.all(np.diff(t) >= 0)
+    assert len(read_range(str(tmp_path), t[0], t[-1] + 1)["t"]) == 4
@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+# 실행: python -m pytest test/test_replay.py
+import logging
+import os
+import numpy as np
+from navigation.replay import derive_speed, load_rddf, replay_batch
+
+def write_log(path, lines):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("x,z,y,speed\n" + "\n".join(lines) + "\n")
+
+def test_missing_speed_is_derived_not_zero(tmp_path):
+    path = os.path.join(str(tmp_path), "rddf.csv")
+    write_log(path, ["0,0,0,1", "1,0,,1", "2,0,0,", ",0,0,1", "3,0,0,None", "4,0,0,1"])
+    records = load_rddf(path)
+    # 위치가 없는 행만 버리고, 빠진 speed는 NaN으로 남긴다
+    np.testing.assert_array_equal(records[:, :3], [[0, 0, 0], [1, 0, 0], [2, 0, 0], [3, 0, 0], [4, 0, 0]])
+    assert np.isnan(records[2:4, 3]).all()
+    # 0.5초 간격으로 1 m씩 움직였으므로 2 m/s
+    np.testing.assert_allclose(derive_speed(records, 0.5), [1, 1, 2, 2, 1])
+
+def test_old_three_column_log_keeps_every_row(tmp_path):
+    path = os.path.join(str(tmp_path), "rddf.csv")
+    write_log(path, ["0,0,0", "0,1,0", "0,2,0"])
+    records = load_rddf(path)
+    assert len(records) == 3
+    np.testing.assert_allclose(derive_speed(records, 0.1), [10, 10, 10])
+
+def test_serial_batch_leaves_caller_logging_alone(tmp_path):
+    path = os.path.join(str(tmp_path), "rddf.csv")
+    write_log(path, [f"{i * 0.2},0,0,4" for i in range(20)])
+    summary, = replay_batch([path], output_dir="", speed=0, workers=1)
+    assert summary['rows'] == 20
+    assert logging.root.manager.disable == logging.NOTSET
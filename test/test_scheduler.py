@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+# 실행: python -m pytest test/test_scheduler.py
+import pytest
+from navigation.scheduler import RateScheduler
+
+# 주기는 이진수로 정확히 표현되는 0.25 s (4 Hz)를 써서 경계 비교가 흔들리지 않게 한다
+def make_scheduler(policy, max_catch_up=3):
+    dts = []
+    scheduler = RateScheduler(clock=lambda: 0.0, max_catch_up=max_catch_up)
+    scheduler.add_task("task", 4, dts.append, policy)
+    return scheduler, dts
+
+def test_on_time_steps_do_not_overrun():
+    scheduler, dts = make_scheduler("skip")
+    for i in range(8):
+        assert scheduler.step(i * 0.25) == (i + 1) * 0.25
+    stats = scheduler.get_stats()["task"]
+    assert (stats["runs"], stats["overruns"], stats["skipped"]) == (8, 0, 0)
+    assert dts == [0.25] * 8
+
+def test_skip_policy_jumps_to_next_future_slot():
+    scheduler, dts = make_scheduler("skip")
+    scheduler.step(0.0)
+    # 0.25 마감에 한 번 돌고, 0.5/0.75/1.0 세 주기는 건너뛴다
+    assert scheduler.step(1.1) == 1.25
+    stats = scheduler.get_stats()["task"]
+    assert (stats["runs"], stats["overruns"], stats["skipped"]) == (2, 1, 3)
+    assert dts[-1] == pytest.approx(1.1)
+
+def test_catch_up_policy_is_bounded_and_drops_the_rest():
+    scheduler, dts = make_scheduler("catch_up", max_catch_up=3)
+    scheduler.step(0.0)
+    # 0.25, 0.5, 0.75, 1.0 마감은 이어서 실행하고 (max_catch_up + 1회), 1.25~2.0은 버린다
+    assert scheduler.step(2.1) == 2.25
+    stats = scheduler.get_stats()["task"]
+    assert (stats["runs"], stats["overruns"], stats["skipped"]) == (5, 4, 4)
+    # 밀린 실행의 dt는 실제로 흐른 시간이므로 첫 번째만 길고 나머지는 0
+    assert dts[1:] == [pytest.approx(2.1), 0.0, 0.0, 0.0]
+
+def test_failing_task_counts_error_and_keeps_schedule():
+    scheduler = RateScheduler(clock=lambda: 0.0)
+    scheduler.add_task("bad", 4, lambda dt: 1 / 0)
+    assert scheduler.step(0.0) == 0.25
+    assert scheduler.step(0.25) == 0.5
+    stats = scheduler.get_stats()["bad"]
+    assert (stats["runs"], stats["errors"]) == (2, 2)
+
+def test_unknown_policy_is_rejected():
+    with pytest.raises(ValueError):
+        RateScheduler().add_task("task", 4, print, "drop")
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+# 실행: python -m pytest test/test_speed_profile.py
+import numpy as np
+from navigation.speed_profile import build_speed_profile, shared_profile
+from utils.map_loader import MAP_COLUMNS
+
+# 1 m 간격 직선 지도, corner 위치 한 점에만 곡률을 준다
+def straight_map(n, corner=None, curvature=0.0):
+    data = np.zeros((n, len(MAP_COLUMNS)))
+    data[:, MAP_COLUMNS['s']] = np.arange(n, dtype=np.float64)
+    if corner is not None:
+        data[corner, MAP_COLUMNS['curvature']] = curvature
+    return data
+
+def test_backward_pass_brakes_to_end_speed():
+    v = build_speed_profile(straight_map(300), max_speed_kh=36.0, decel=2.0, end_speed_kh=0.0, curvature_window=1)
+    remaining = 299.0 - np.arange(300)
+    assert np.allclose(v, np.minimum(10.0, np.sqrt(2.0 * 2.0 * remaining)))
+
+def test_corner_limits_forward_and_backward():
+    corner, k = 100, 0.5
+    v = build_speed_profile(straight_map(300, corner, k), max_speed_kh=36.0, lateral_accel=2.0, accel=1.0,
+                            decel=3.0, end_speed_kh=None, curvature_window=1)
+    vc = np.sqrt(2.0 / k)
+    assert np.isclose(v[corner], vc)
+    d = np.arange(1, 60, dtype=np.float64)
+    # 코너 앞은 감속 한계로, 코너 뒤는 가속 한계로 최고 속도까지 이어진다
+    assert np.allclose(v[corner - d.astype(int)], np.minimum(10.0, np.sqrt(vc ** 2 + 2.0 * 3.0 * d)))
+    assert np.allclose(v[corner + d.astype(int)], np.minimum(10.0, np.sqrt(vc ** 2 + 2.0 * 1.0 * d)))
+    assert v[0] == v[-1] == 10.0
+
+def test_profile_respects_limits_on_noisy_curvature():
+    rng = np.random.default_rng(5)
+    data = straight_map(500)
+    data[:, MAP_COLUMNS['curvature']] = rng.uniform(-0.2, 0.2, 500) * (rng.random(500) < 0.05)
+    accel, decel = 1.5, 3.0
+    v = build_speed_profile(data, accel=accel, decel=decel, curvature_window=1)
+    dv2 = np.diff(v ** 2)
+    assert np.all(dv2 <= 2.0 * accel + 1e-9) and np.all(dv2 >= -2.0 * decel - 1e-9)
+    curved = data[:, MAP_COLUMNS['curvature']] != 0
+    assert np.all(v[curved] <= np.sqrt(2.0 / np.abs(data[curved, MAP_COLUMNS['curvature']])) + 1e-9)
+    assert v[-1] == 0.0
+
+def test_shared_profile_is_built_once_per_map():
+    data = straight_map(50)
+    profile = shared_profile(data)
+    assert shared_profile(data) is profile and not profile.flags.writeable
+    assert shared_profile(straight_map(50)) is not profile
@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+# 실행: python -m pytest test/test_state_store.py
+import pytest
+from utils.config import STATE_OWNERS, initial_state
+from utils.state_store import StateStore
+
+def make_store():
+    return StateStore(initial_state(), instrument=False, owners=STATE_OWNERS)
+
+def test_section_rejects_keys_owned_by_other_domain():
+    store = make_store()
+    with pytest.raises(ValueError):
+        with store.section('control') as state:
+            state['playerPos'] = {'x': 1, 'z': 2, 'y': 0}
+    with pytest.raises(ValueError):
+        with store.section('control') as state:
+            state.update({'cmd_speed_ms': 1.0, 'tank_tar_vel_kh': 10.0})
+    assert store['playerPos'] == {'x': 0, 'z': 0, 'y': 0} and store['cmd_speed_ms'] == 0.0
+
+# 구역은 쓴 키만 발행하므로, 안에 있는 동안 다른 구역이 발행한 값은 그대로 남는다
+def test_section_publishes_only_written_keys():
+    store = make_store()
+    with store.section('control') as control:
+        seen = control['playerPos']
+        with store.section('telemetry') as telemetry:
+            telemetry['playerPos'] = {'x': 5, 'z': 5, 'y': 0}
+        control['est_playerPos'] = dict(seen)
+    assert store['playerPos'] == {'x': 5, 'z': 5, 'y': 0}
+    assert store['est_playerPos'] == {'x': 0, 'z': 0, 'y': 0}
+    assert store.version == 2
+
+def test_unowned_keys_are_writable_from_any_domain():
+    store = StateStore({}, instrument=False, owners={'a': 'tuning'})
+    with store.section('control') as state:
+        state['b'] = 1
+    assert store['b'] == 1
@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+# 실행: python -m pytest test/test_timeseries.py
+import numpy as np
+from utils.timeseries import TimeSeriesBuffer
+
+def test_window_and_since_across_wraparound():
+    buffer = TimeSeriesBuffer(8, ("a", "b"))
+    rows = np.arange(46, dtype=np.float64).reshape(-1, 2)
+    for k, row in enumerate(rows[:5]):
+        buffer.append(row, t=float(k))
+    buffer.extend(rows[5:19], times=np.arange(5, 19, dtype=np.float64))
+    buffer.extend(rows[19:], times=np.arange(19, 23, dtype=np.float64))
+    assert buffer.seq == 23 and len(buffer) == 8
+
+    times, data = buffer.window()
+    np.testing.assert_array_equal(data, rows[15:])
+    np.testing.assert_array_equal(times, np.arange(15, 23))
+    np.testing.assert_array_equal(buffer.window(3)[1], rows[20:])
+    seq, times, data = buffer.since(19)
+    assert seq == 23
+    np.testing.assert_array_equal(data, rows[19:])
+    # 링 용량보다 많이 밀렸으면 남아 있는 것만
+    np.testing.assert_array_equal(buffer.since(2)[2], rows[15:])
+    np.testing.assert_array_equal(buffer.column("b"), rows[15:, 1])
+
+def test_reads_are_copies_and_merge_continues_seq():
+    source = TimeSeriesBuffer(8, ("a",))
+    source.extend(np.arange(11.0), times=np.arange(11.0))
+    _, data = source.window()
+    data[:] = -1
+    assert source.window()[1][0, 0] == 3.0
+
+    copy = TimeSeriesBuffer(8, ("a",))
+    assert copy.merge(*source.since(0))
+    source.extend([11.0, 12.0], times=[11.0, 12.0])
+    assert copy.merge(*source.since(copy.seq))
+    assert copy.seq == source.seq == 13
+    np.testing.assert_array_equal(copy.window()[1], source.window()[1])
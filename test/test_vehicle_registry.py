@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+# 실행: python -m pytest test/test_vehicle_registry.py
+import threading
+from navigation.vehicle_registry import VehicleRegistry
+
+def test_concurrent_creation_respects_max_vehicles():
+    registry = VehicleRegistry(max_vehicles=4)
+    barrier = threading.Barrier(16)
+    created, rejected = [], []
+
+    def worker(i):
+        barrier.wait()
+        try:
+            created.append(registry.get(f"v{i}"))
+        except ValueError:
+            rejected.append(i)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(registry) == 4 and len(created) == 4 and len(rejected) == 12
+    assert registry.get(created[0].vehicle_id) is created[0]
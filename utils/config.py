@@ -1,12 +1,18 @@
 # -*- coding: utf-8 -*-
 import numpy as np
-import pandas as pd
-import threading
+from utils.lod import TrajectoryLOD
+from utils.map_loader import build_map_geometry, load_map, publish_map
+from utils.state_store import StateStore
+from utils.timeseries import TimeSeriesBuffer
 
 # 서버 설정
 SERVER_CONFIG = {
     "flask_port": 5050,
     "dash_port": 8050,
+    "control_server": "flask",   # 제어 엔드포인트 서버: "flask" 또는 "async"
+    "headless": False,           # True면 Dash 없이 제어 엔드포인트만 띄운다 (dash/plotly를 읽지 않음)
+    "dash_mode": "thread",       # "thread": 같은 프로세스, "process": 별도 프로세스 + 공유 메모리
+    "host": "127.0.0.1",
     "max_obstacles": 50
 }
 
@@ -15,7 +21,38 @@ GRAPH_CONFIG = {
     "max_speed": 80,
     "max_points": 100,
     "max_obstacles": 50,
-    "max_path_points": 200
+    "max_path_points": 200,
+    "history": 1000            # 속도/위치 변화량 시계열 버퍼 용량
+}
+
+# 그래프 단순화(LOD) 설정 (utils/lod.py)
+LOD_CONFIG = {
+    "levels": (0.0, 0.25, 1.0, 4.0, 16.0),  # 경로 단순화 수준별 허용 오차 (m, 0은 원본)
+    "pixels": 1000,              # 보이는 영역 폭을 이 픽셀 수로 나눈 거리보다 작은 오차는 무시한다
+    "max_points": 1500,          # trace 하나에 보내는 최대 점 수
+    "trajectory_capacity": 2000, # 실시간 궤적의 수준별 보관 점 수 (거친 수준일수록 더 긴 과거)
+    "window": 32,                # 실시간 단순화에서 남기지 않고 기다리는 최대 점 수
+    "refresh_rows": 200,         # 이만큼 새 점이 쌓이면 궤적을 단순화본으로 다시 보낸다
+    "series_points": 300         # 시계열 그래프 (속도, 위치 변화량) 점 수 (LTTB)
+}
+
+# 별도 프로세스 대시보드 설정 (공유 메모리 상태 발행 + 명령 큐)
+DASH_PROCESS_CONFIG = {
+    "shm_bytes": 8 * 1024 * 1024,  # 상태 영역 크기
+    "publish_hz": 10,              # 상태 발행 주기 (대시보드 갱신 주기 500ms보다 충분히 빠르게)
+    "watch_ttl": 5.0,              # 대시보드가 이 시간 동안 보지 않은 차량은 요약(버전)만 발행
+    "watch_interval": 1.0,         # 대시보드가 보고 있는 차량을 알리는 주기 (초)
+    "reader_ttl": 3.0,             # 대시 프로세스가 이 시간 동안 영역을 읽지 않으면 발행을 멈춘다 (초)
+    "delta_history": 20,           # 버퍼 증분을 몇 번 전 발행부터 보낼지 (대시가 그만큼 놓쳐도 이어 붙인다)
+    "command_queue_size": 1000
+}
+
+# 이벤트 버스 / 스트리밍 설정 (/stream: Server-Sent Events)
+EVENT_CONFIG = {
+    "queue_size": 1024,        # 구독자별 큐 길이 (가득 차면 가장 오래된 이벤트를 버린다)
+    "max_subscribers": 64,
+    "stream_interval": 0.1,    # 스트림 전송 주기 (초). 그 사이의 이벤트는 (종류, 차량)별 최신 값으로 합친다
+    "keepalive": 15.0          # 이벤트가 없을 때 연결 유지용 주석 전송 주기 (초)
 }
 
 # PID 설정
@@ -31,33 +68,219 @@ PID_CONFIG_DEG = {
     "kd": 0.05
 }
 
-# 공유 데이터
-SHARED = {
-    "playerPos": {"x": 0, "z": 0, "y": 0},
-    "pre_playerPos": {"x": 0, "z": 0, "y": 0},
-    "tank_cur_vel_ms": 0.0,
-    "tank_tar_vel_kh": 0.0,
-    "tank_cur_yaw_deg": 0.0,
-    "tank_tar_yaw_deg": 0.0,
-    "vel_data": [],
-    "del_playerPos": {"x": [], "z": []},
-    "destination": None,
-    "obstacles": [],
-    "path": [],
-    "nearest_point": None,
-    "error_distance": 0.0,
-    "map_points": None,
-    "vel_pid": PID_CONFIG.copy(),
-    "steer_pid": PID_CONFIG_DEG.copy(),
-    "rddf_data": []
-}
-
-# 공유 락
-shared_lock = threading.Lock()
+# PIDBank 채널 설정 (적분 제한, 출력 제한, 미분 필터 계수 1.0 = 필터 없음)
+PID_BANK_CONFIG = {
+    "speed": {"channel": 0, "integral_limit": 100.0, "output_limit": float('inf'), "derivative_alpha": 1.0},
+    "steer": {"channel": 1, "integral_limit": 180.0, "output_limit": float('inf'), "derivative_alpha": 1.0}
+}
+
+# 오프라인 PID 튜닝 설정 (kp/ki/kd: np.linspace(시작, 끝, 개수))
+TUNER_CONFIG = {
+    "dt": 0.05,                   # 제어 주기 (control_hz 20)
+    "duration": 15.0,             # 시뮬레이션 길이 (초)
+    "settle_band": 0.02,          # 정착 판정 허용 오차 (계단 크기 대비)
+    "workers": 0,                 # 0이면 CPU 수
+    "chunk_size": 1024,           # 프로세스 하나가 한 번에 평가하는 조합 수
+    "weights": {"overshoot": 1.0, "settling_time": 1.0, "tracking_error": 2.0},
+    "speed": {"step": 20.0, "route": [10.0, 30.0, 50.0, 20.0, 0.0],
+              "kp": (0.05, 1.5, 20), "ki": (0.0, 0.5, 12), "kd": (0.0, 0.1, 10)},
+    "steer": {"step": 90.0,
+              "kp": (0.05, 1.5, 20), "ki": (0.0, 0.5, 12), "kd": (0.0, 0.1, 10)}
+}
+
+# 로깅 설정 (큐 + 백그라운드 리스너, 호출 위치별 속도 제한, 이진 링 파일)
+LOGGING_CONFIG = {
+    "level": "INFO",
+    "queue_size": 10000,          # 초과 시 드롭
+    "console": True,
+    "console_format": "%(levelname)s:%(name)s:%(message)s",
+    "ring_path": "data/logs/control.ring",
+    "ring_bytes": 4 * 1024 * 1024,
+    "rate_per_site": 5.0,         # 호출 위치당 초당 레코드 수 (0이면 제한 없음)
+    "burst": 10,
+    "sample_every": 50            # 제한 중에도 N번째 레코드는 통과 (0이면 끔)
+}
+
+# 기록 재생 설정 (speed: 1.0 = 실시간, 0 = 최대 속도)
+REPLAY_CONFIG = {
+    "sample_hz": 20.0,            # 기록에 시각이 없으므로 행 간격을 이 주기로 본다
+    "speed": 0.0,
+    "output_dir": "data/replay",
+    "workers": 0                  # 0이면 CPU 수
+}
+
+# RDDF 로그 설정
+RDDF_CONFIG = {
+    "filename": "data/logs/rddf.csv",
+    "max_rows": 1000,              # 메모리 링 크기
+    "queue_size": 10000,           # 쓰기 큐 최대 길이 (초과 시 드롭)
+    "batch_size": 500,             # 한 번에 기록하는 최대 행 수
+    "flush_interval": 0.5,         # 초
+    "fsync_interval": 2.0,         # 초
+    "rotate_bytes": 10 * 1024 * 1024,
+    "rotate_seconds": 3600,
+    "backup_count": 5,
+    "restart_backoff": 1.0,        # 기록 스레드가 오류로 끝난 뒤 다시 띄울 때까지 기다리는 시간 (초, 실패할 때마다 두 배)
+    "max_restarts": 5,             # 연속으로 이만큼 실패하면 더 띄우지 않고 행을 드롭한다
+    "format": "csv",               # "csv": 텍스트 한 파일, "segments": 열 단위 이진 세그먼트 (시각/yaw/명령 포함)
+    "segment_block_rows": 1024,    # 세그먼트 블록 하나의 행 수 (fsync 주기마다 모인 만큼도 쓴다)
+    "segment_bytes": 64 * 1024 * 1024,
+    "max_segments": 0              # 보관할 세그먼트 수 (0이면 모두)
+}
+
+# 지도 설정 (CSV는 .npy로 컴파일되어 memmap으로 읽힌다)
+MAP_CONFIG = {
+    "csv_path": "data/map/interpolated_map_with_distance.csv"
+}
+
+# 지도 인덱스 설정
+MAP_INDEX_CONFIG = {
+    "cell_size": 5.0,          # 그리드 셀 크기 (m)
+    "max_ring": 4,             # 그리드 탐색 최대 링 수, 초과 시 전체 탐색
+    "window_behind": 5.0,      # 직전 매칭점 기준 뒤쪽 탐색 거리 (m)
+    "window_ahead": 20.0,      # 직전 매칭점 기준 앞쪽 탐색 거리 (m)
+    "lost_distance": 3.0       # 이 거리 이상 벗어나면 위치를 잃은 것으로 보고 재탐색
+}
+
+# 제어 루프 스케줄러 설정 (overrun_policy: "skip" | "catch_up")
+SCHEDULER_CONFIG = {
+    "planning_hz": 10,
+    "localization_hz": 20,
+    "control_hz": 20,
+    "lod_hz": 2,               # 대시보드 궤적 LOD를 RDDF 링에서 따라잡는 주기 (링 1000행이 넘치기 전에)
+    "overrun_policy": "skip",
+    "max_catch_up": 3
+}
+
+# 경로 추종 설정 (mode: "manual" | "pure_pursuit" | "stanley")
+# 각도는 +z 방향이 0도, +x 방향이 +90도 (지도 heading 열과 같은 기준)
+TRACKING_CONFIG = {
+    "mode": "manual",
+    "lookahead_min": 3.0,      # 최소 전방 주시 거리 (m)
+    "lookahead_gain": 1.0,     # 속도(m/s)당 추가 전방 주시 거리 (s)
+    "lookahead_max": 20.0,
+    "stanley_k": 1.0,          # Stanley 횡방향 오차 이득
+    "stanley_soft": 1.0        # 저속에서 발산을 막는 속도 보정 (m/s)
+}
+
+# 곡률 기반 속도 프로파일 (경로 추종 모드에서 지도 점마다 목표 속도 상한)
+SPEED_PROFILE_CONFIG = {
+    "enabled": True,
+    "max_speed_kh": 60.0,      # 직선 구간 최고 속도
+    "lateral_accel": 2.0,      # 허용 횡가속도 (m/s^2), 코너 속도 = sqrt(a / |곡률|)
+    "accel": 1.5,              # 가속 한계 (m/s^2, 앞 방향 패스)
+    "decel": 3.0,              # 감속 한계 (m/s^2, 뒤 방향 패스)
+    "end_speed_kh": 0.0,       # 지도 끝점 속도 (None이면 제한 없음)
+    "curvature_window": 5      # 곡률 이동 평균 창 (점 개수, 잡음 완화)
+}
+
+# 자세 추정 (EKF) 설정. 제어 시점까지 자세를 예측해 /info 이후 지연을 보정한다.
+ESTIMATOR_CONFIG = {
+    "enabled": True,
+    "timestamp_key": "timestamp",  # /info 패킷의 보낸 쪽 시각 (초, 없으면 도착 시각 사용)
+    "history": 64,                 # 순서가 뒤바뀐 샘플을 다시 적용할 수 있는 이력 길이
+    "max_predict": 0.5,            # 최대 예측 구간 (초), 더 오래된 샘플은 여기까지만 외삽
+    "pos_std": 0.1,                # 위치 측정 표준편차 (m)
+    "yaw_std_deg": 1.0,
+    "speed_std": 0.2,              # m/s
+    "accel_std": 2.0,              # 가속도 공정 잡음 (m/s^2)
+    "yaw_accel_std_deg": 60.0      # 각가속도 공정 잡음 (deg/s^2)
+}
+
+# 경로 계획 설정
+PLANNER_CONFIG = {
+    "cell_size": 2.0,          # 점유 격자 셀 크기 (m)
+    "margin": 20.0,            # 지도 범위 바깥 여유 (m)
+    "road_width": 8.0,         # 지도 경로 주변 저비용 영역 폭 (m)
+    "off_road_cost": 3.0,      # 경로 밖 셀 비용 배수
+    "obstacle_radius": 2.0,    # 장애물 팽창 반경 (m)
+    "max_expansions": 200000,
+    "cache_size": 64
+}
+
+# 장애물 공간 해시 설정
+OBSTACLE_CONFIG = {
+    "cell_size": 4.0,          # 공간 해시 셀 크기 (m)
+    "max_obstacles": 20000,    # 차량당 최대 장애물 수
+    "max_ring": 64,            # 최근접 탐색 최대 링 (셀 단위)
+    "vehicle_radius": 1.5,     # 충돌 검사용 차체 반경 (m), 계획기 팽창 반경보다 작게
+    "stop_horizon": 1.5,       # 이 시간(초) 동안의 예측 궤적이 장애물과 겹치면 정지
+    "min_lookahead": 4.0,      # 느리거나 멈춰 있어도 예측 궤적은 최소 이 거리(m)만큼 앞을 본다
+    "clear_hold": 1.0,         # 정지한 뒤 장애물이 이 시간(초) 동안 계속 안 보여야 다시 출발
+    "footprint_steps": 6       # 예측 궤적 샘플 수
+}
+
+# 다중 차량 설정 (요청의 vehicle_id로 구분, 없으면 default_id)
+VEHICLE_CONFIG = {
+    "default_id": "default",
+    "max_vehicles": 64,         # 차량마다 제어 스케줄러 스레드와 RDDF 기록 스레드가 하나씩 생긴다
+    "inherit_keys": ("tracking_mode", "vel_pid", "steer_pid")   # 새 차량이 기본 차량에서 물려받는 설정
+}
+
+# 차량 한 대의 초기 상태
+def initial_state():
+    return {
+        "playerPos": {"x": 0, "z": 0, "y": 0},
+        "pre_playerPos": {"x": 0, "z": 0, "y": 0},
+        "tank_cur_vel_ms": 0.0,
+        "tank_tar_vel_kh": 0.0,
+        "profile_speed_kh": None,
+        "tank_cur_yaw_deg": 0.0,
+        "tank_tar_yaw_deg": 0.0,
+        "cmd_speed_ms": 0.0,
+        "cmd_yaw_deg": 0.0,
+        "track_yaw_deg": None,
+        "vel_data": TimeSeriesBuffer(GRAPH_CONFIG['history'], ("speed_kh",)),
+        "del_playerPos": TimeSeriesBuffer(GRAPH_CONFIG['history'], ("x", "z")),
+        "destination": None,
+        "obstacles": [],
+        "obstacles_version": 0,
+        "blocking_obstacle": None,
+        "path": [],
+        "last_command": None,
+        "nearest_point": None,
+        "error_distance": 0.0,
+        "map_data": None,
+        "map_points": None,
+        "map_distance": None,
+        "nearest_idx": None,
+        "tracking_mode": TRACKING_CONFIG['mode'],
+        "lookahead_point": None,
+        "cross_track_error": 0.0,
+        "est_playerPos": None,
+        "est_speed_ms": None,
+        "est_yaw_deg": None,
+        "est_yaw_rate_deg": None,
+        "est_age_s": None,
+        "map_progress": 0.0,
+        "vel_pid": PID_CONFIG.copy(),
+        "steer_pid": PID_CONFIG_DEG.copy(),
+        "rddf_data": TimeSeriesBuffer(RDDF_CONFIG['max_rows'], ("x", "z", "y", "speed")),
+        "rddf_lod": TrajectoryLOD(LOD_CONFIG['levels'], LOD_CONFIG['trajectory_capacity'], LOD_CONFIG['window'])
+    }
+
+# 상태 키마다 쓸 수 있는 구역 (한 키를 두 구역이 쓰면 서로의 새 값을 옛 값으로 덮어쓸 수 있다)
+# - telemetry: /info로 받은 측정값과 그 기록
+# - control: 추정(est_*), 지도 매칭, 제어 출력(cmd_*)과 명령
+# - planning: 목적지, 장애물, 경로, 지도
+# - tuning: 대시보드/운전자가 정하는 목표값과 게인
+STATE_OWNERS = {
+    **dict.fromkeys(("playerPos", "pre_playerPos", "tank_cur_vel_ms", "tank_cur_yaw_deg", "vel_data",
+                     "del_playerPos", "rddf_data", "rddf_lod"), "telemetry"),
+    **dict.fromkeys(("est_playerPos", "est_speed_ms", "est_yaw_deg", "est_yaw_rate_deg", "est_age_s",
+                     "cmd_speed_ms", "cmd_yaw_deg", "track_yaw_deg", "profile_speed_kh", "last_command",
+                     "blocking_obstacle", "nearest_point", "error_distance", "nearest_idx", "cross_track_error",
+                     "map_progress", "lookahead_point"), "control"),
+    **dict.fromkeys(("destination", "obstacles", "obstacles_version", "path", "map_data", "map_points",
+                     "map_distance"), "planning"),
+    **dict.fromkeys(("tank_tar_vel_kh", "tank_tar_yaw_deg", "tracking_mode", "vel_pid", "steer_pid"), "tuning")
+}
+
+# 공유 데이터 (버전 스냅샷 저장소, 쓰기는 SHARED.section(도메인)으로). 기본 차량의 상태이기도 하다.
+SHARED = StateStore(initial_state(), owners=STATE_OWNERS)
 
 # 지도 데이터 로드
 try:
-    df = pd.read_csv("data/map/interpolated_map_with_distance.csv")
-    SHARED['map_points'] = df[['x', 'z', 'y']].values
+    publish_map(SHARED, load_map(MAP_CONFIG['csv_path']))
 except FileNotFoundError:
-    SHARED['map_points'] = np.array([[0, 0, 0], [10, 10, 10], [20, 20, 20], [30, 30, 30]])
\ No newline at end of file
+    publish_map(SHARED, build_map_geometry(np.array([[0, 0, 0], [10, 10, 10], [20, 20, 20], [30, 30, 30]])))
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+import itertools
+import threading
+import time
+from collections import deque, namedtuple
+from utils.config import EVENT_CONFIG
+
+# 이벤트 종류 (pose: /info 수신 자세, command: 제어 명령, pid: 게인 변경, obstacles: 장애물 변경)
+EVENT_TYPES = ("pose", "command", "pid", "obstacles")
+
+Event = namedtuple("Event", ("seq", "time", "type", "vehicle", "data"))
+
+# 구독자 한 명의 큐. 가득 차면 가장 오래된 이벤트를 버리고 개수만 센다 (발행자는 기다리지 않는다).
+class Subscription:
+    def __init__(self, bus, types=None, vehicles=None, maxlen=EVENT_CONFIG['queue_size']):
+        self.bus = bus
+        self.types = frozenset(types) if types else None
+        self.vehicles = frozenset(vehicles) if vehicles else None
+        self.dropped = 0
+        self.closed = False
+        self._queue = deque(maxlen=maxlen)
+        self._cond = threading.Condition(threading.Lock())
+
+    def accepts(self, event_type, vehicle_id):
+        return ((self.types is None or event_type in self.types) and
+                (self.vehicles is None or vehicle_id in self.vehicles))
+
+    def put(self, event):
+        with self._cond:
+            if len(self._queue) == self._queue.maxlen:
+                self.dropped += 1
+            self._queue.append(event)
+            self._cond.notify()
+
+    # 쌓인 이벤트를 모두 꺼낸다. timeout이 있으면 비어 있을 때 그만큼 기다린다.
+    def drain(self, timeout=None):
+        with self._cond:
+            if not self._queue and timeout and not self.closed:
+                self._cond.wait(timeout)
+            events = list(self._queue)
+            self._queue.clear()
+            return events
+
+    def close(self):
+        self.bus.unsubscribe(self)
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+# 프로세스 내부 발행/구독. 구독자 목록은 통째로 교체하므로 발행 쪽은 락 없이 순회한다.
+# 구독자가 없으면 publish()는 바로 돌아간다 (제어 경로 비용 없음).
+class EventBus:
+    def __init__(self, max_subscribers=EVENT_CONFIG['max_subscribers']):
+        self.max_subscribers = max_subscribers
+        self._subscribers = ()
+        self._lock = threading.Lock()
+        self._seq = itertools.count(1)
+        self.published = 0
+
+    def __len__(self):
+        return len(self._subscribers)
+
+    def subscribe(self, types=None, vehicles=None, maxlen=EVENT_CONFIG['queue_size']):
+        unknown = set(types or ()) - set(EVENT_TYPES)
+        if unknown:
+            raise ValueError(f"unknown event types: {', '.join(sorted(unknown))}")
+        subscription = Subscription(self, types, vehicles, maxlen)
+        with self._lock:
+            if len(self._subscribers) >= self.max_subscribers:
+                raise ValueError(f"too many subscribers (max {self.max_subscribers})")
+            self._subscribers = self._subscribers + (subscription,)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers = tuple(s for s in self._subscribers if s is not subscription)
+
+    # data는 발행 후 수정하지 않는 dict
+    def publish(self, event_type, vehicle_id, data):
+        subscribers = self._subscribers
+        if not subscribers:
+            return None
+        event = None
+        for subscription in subscribers:
+            if subscription.accepts(event_type, vehicle_id):
+                if event is None:
+                    event = Event(next(self._seq), time.time(), event_type, vehicle_id, data)
+                subscription.put(event)
+        if event is not None:
+            self.published += 1
+        return event
+
+BUS = EventBus()
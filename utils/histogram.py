@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+import bisect
+import threading
+
+# 밀리초 단위 기본 구간 (마지막 구간은 +Inf)
+DEFAULT_BUCKETS_MS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 25.0, 50.0, 100.0, 250.0, 1000.0)
+
+# 고정 구간 누적 히스토그램 (관측은 O(log 구간 수))
+class Histogram:
+    def __init__(self, buckets=DEFAULT_BUCKETS_MS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.count += 1
+            self.total += value
+            if value > self.max:
+                self.max = value
+
+    def quantile(self, q):
+        with self._lock:
+            counts = list(self.counts)
+            count = self.count
+            top = self.max
+        if count == 0:
+            return 0.0
+        rank = q * count
+        seen = 0
+        for i, c in enumerate(counts):
+            seen += c
+            if seen >= rank:
+                return self.buckets[i] if i < len(self.buckets) else top
+        return top
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "buckets": self.buckets,
+                "counts": list(self.counts),
+                "count": self.count,
+                "sum": self.total,
+                "max": self.max
+            }
@@ -0,0 +1,296 @@
+# -*- coding: utf-8 -*-
+# 그래프 전송량을 화면 크기에 맞추는 단순화(LOD) 도구
+# - lttb: 시계열 (Largest-Triangle-Three-Buckets)
+# - Douglas–Peucker: 경로. 점마다 "이 허용 오차까지는 남는다"는 중요도를 한 번 구해 두면
+#   어떤 허용 오차의 결과든 중요도 비교 한 번으로 얻는다 (정적 지도 피라미드).
+# - TrajectoryLOD: 실시간 궤적. 수준마다 들어오는 점을 바로 단순화해 따로 보관한다.
+#   요청 경로에서는 만들지 않고, 스케줄러 작업과 읽는 쪽이 RDDF 링에서 밀린 행을 가져와 이어 만든다.
+# 선택 결과는 (xs, zs) 배열이며, 보이는 구간이 끊기는 자리에는 NaN을 넣는다 (to_list가 None으로 바꾼다).
+import copy
+import math
+import threading
+# (utils.config가 차량 초기 상태에 TrajectoryLOD를 넣으므로 설정 값은 호출하는 쪽이 LOD_CONFIG에서 넘긴다)
+import numpy as np
+from utils.timeseries import TimeSeriesBuffer
+
+# 시계열을 threshold개 점으로 줄인 인덱스 (첫/마지막 점 포함)
+def lttb(x, y, threshold):
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    edges = np.floor(np.linspace(1, n - 1, threshold - 1)).astype(np.int64)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        nlo, nhi = (edges[i + 1], edges[i + 2]) if i + 2 < len(edges) else (n - 1, n)
+        avg_x, avg_y = x[nlo:nhi].mean(), y[nlo:nhi].mean()
+        # 이전 선택점, 후보, 다음 구간 평균이 이루는 삼각형 넓이 (x2)
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+def _segment_distances(points, a, b):
+    ab = b - a
+    length2 = float(ab @ ab)
+    if length2 == 0.0:
+        return np.hypot(points[:, 0] - a[0], points[:, 1] - a[1])
+    t = np.clip(((points - a) @ ab) / length2, 0.0, 1.0)
+    closest = a + t[:, None] * ab
+    return np.hypot(points[:, 0] - closest[:, 0], points[:, 1] - closest[:, 1])
+
+# 점마다 Douglas–Peucker에서 남는 최대 허용 오차 (양 끝점은 inf).
+# 자식 구간의 값은 부모 값을 넘지 않게 잘라 두어 importance > eps가 곧 허용 오차 eps의 결과가 된다.
+def dp_importance(points):
+    points = np.asarray(points, dtype=np.float64)[:, :2]
+    n = len(points)
+    importance = np.zeros(n)
+    if n == 0:
+        return importance
+    importance[0] = importance[-1] = np.inf
+    stack = [(0, n - 1, np.inf)]
+    while stack:
+        i, j, parent = stack.pop()
+        if j - i < 2:
+            continue
+        dist = _segment_distances(points[i + 1:j], points[i], points[j])
+        k = int(np.argmax(dist))
+        value = min(float(dist[k]), parent)
+        k += i + 1
+        importance[k] = value
+        stack.append((i, k, value))
+        stack.append((k, j, value))
+    return importance
+
+def douglas_peucker(points, epsilon):
+    return np.nonzero(dp_importance(points) > epsilon)[0]
+
+# 보이는 영역 (x0, x1, z0, z1)에 걸치는 점만 남기고, 끊긴 자리에 NaN을 넣는다.
+# 영역 밖으로 나가는 선이 잘리지 않도록 보이는 점의 바로 앞뒤 점도 남긴다.
+def clip_to_viewport(xs, zs, viewport):
+    xs = np.asarray(xs, dtype=np.float64)
+    zs = np.asarray(zs, dtype=np.float64)
+    if viewport is None or len(xs) == 0:
+        return xs, zs
+    x0, x1, z0, z1 = viewport
+    inside = (xs >= x0) & (xs <= x1) & (zs >= z0) & (zs <= z1)
+    keep = inside.copy()
+    keep[1:] |= inside[:-1]
+    keep[:-1] |= inside[1:]
+    positions = np.nonzero(keep)[0]
+    if len(positions) == 0:
+        return xs[:0], zs[:0]
+    breaks = np.nonzero(np.diff(positions) > 1)[0] + 1
+    out_x = np.insert(xs[positions], breaks, np.nan)
+    out_z = np.insert(zs[positions], breaks, np.nan)
+    return out_x, out_z
+
+# 화면 한 픽셀에 해당하는 거리 = 이 이하의 오차는 보이지 않는다
+def viewport_tolerance(viewport, extent, pixels):
+    x0, x1, z0, z1 = viewport if viewport is not None else extent
+    return max(x1 - x0, z1 - z0, 0.0) / pixels
+
+def _extent(xs, zs):
+    if len(xs) == 0:
+        return 0.0, 0.0, 0.0, 0.0
+    return float(np.nanmin(xs)), float(np.nanmax(xs)), float(np.nanmin(zs)), float(np.nanmax(zs))
+
+def _stride(xs, zs, max_points):
+    if len(xs) <= max_points:
+        return xs, zs
+    step = int(math.ceil(len(xs) / max_points))
+    return xs[::step], zs[::step]
+
+# 정적 경로 (지도)의 LOD 피라미드. 수준별 인덱스를 미리 만들어 두고 보이는 영역으로 고른다.
+class PathLOD:
+    def __init__(self, points, levels):
+        self.source = points
+        self.points = np.array(np.asarray(points, dtype=np.float64)[:, :2])
+        self.importance = dp_importance(self.points)
+        self.levels = tuple(sorted(levels))
+        self.indices = [np.nonzero(self.importance > eps)[0] if eps > 0 else np.arange(len(self.points))
+                        for eps in self.levels]
+        self.extent = _extent(self.points[:, 0], self.points[:, 1])
+
+    # 픽셀 크기보다 거친 수준 중 가장 세밀한 것부터, 보이는 점이 max_points 이하가 될 때까지 거칠게
+    def select(self, viewport, max_points, pixels):
+        tolerance = viewport_tolerance(viewport, self.extent, pixels)
+        start = max([i for i, eps in enumerate(self.levels) if eps <= tolerance] or [0])
+        xs = zs = None
+        for level in range(start, len(self.levels)):
+            idx = self.indices[level]
+            xs, zs = clip_to_viewport(self.points[idx, 0], self.points[idx, 1], viewport)
+            if len(xs) <= max_points:
+                return xs, zs
+        return _stride(xs, zs, max_points)
+
+    def level_sizes(self):
+        return [len(idx) for idx in self.indices]
+
+_shared_lock = threading.Lock()
+_shared_lod = None
+
+# 같은 지도에 대해 한 번만 만든다 (다른 프로세스에서 받은 사본이면 내용으로 비교)
+def shared_path_lod(points, levels):
+    global _shared_lod
+    with _shared_lock:
+        cached = _shared_lod
+        if cached is not None and cached.levels == tuple(sorted(levels)) and (cached.source is points or (
+                len(cached.points) == len(points) and np.array_equal(cached.points, np.asarray(points)[:, :2]))):
+            return cached
+        _shared_lod = PathLOD(points, levels)
+        return _shared_lod
+
+# 실시간 궤적의 수준별 단순화. 수준마다 마지막으로 남긴 점(anchor) 이후의 점들이
+# anchor -> 새 점 선분에서 허용 오차 안에 있는 동안은 남기지 않고, 벗어나면 직전 점을 남긴다.
+# 수준마다 용량이 같으므로 거친 수준일수록 더 긴 과거를 담는다.
+# 기다리는 점들은 (수준, window + 1, 2) 배열에 두고, 새 점이 올 때 모든 수준의 이탈 검사를 한 번에 한다.
+class TrajectoryLOD:
+    def __init__(self, levels, capacity, window):
+        self.levels = tuple(sorted(levels))
+        self.capacity = capacity
+        self.window = window
+        self.kept = [TimeSeriesBuffer(capacity, ("x", "z")) for _ in self.levels]
+        self._pending = np.zeros((0, window + 1, 2))
+        self._pending_len = np.zeros(0, dtype=np.int64)
+        self._anchors = np.zeros((0, 2))
+        self._index_levels()
+        self._pending = np.zeros((len(self._coarse), window + 1, 2))
+        self._pending_len = np.zeros(len(self._coarse), dtype=np.int64)
+        self._anchors = np.zeros((len(self._coarse), 2))
+        self._lock = threading.Lock()
+        self.count = 0
+        # 받은 행 수 (NaN이라 건너뛴 행 포함): 같은 행을 받는 TimeSeriesBuffer의 seq와 맞춘다
+        self.rows = 0
+
+    def _append(self, x, z):
+        self.count += 1
+        first = self.count == 1
+        for level in self._fine if not first else range(len(self.levels)):
+            self.kept[level].append((x, z), t=float(self.count))
+        if first:
+            self._anchors[:] = (x, z)
+            return
+        if not self._coarse:
+            return
+        # d: anchor -> 새 점, rel: anchor -> 기다리는 점들
+        lens = self._pending_len
+        pending = self._pending
+        pending[self._slots, lens] = (x, z)
+        lens += 1
+        d = pending[self._slots, lens - 1] - self._anchors
+        rel = pending - self._anchors[:, None, :]
+        # 기다리던 점(새 점 제외)에서 anchor -> 새 점 선분까지의 거리 제곱
+        length2 = np.maximum((d * d).sum(axis=1), 1e-300)
+        t = np.matmul(rel, d[:, :, None])[:, :, 0] / length2[:, None]
+        np.clip(t, 0.0, 1.0, out=t)
+        offset = rel - t[:, :, None] * d[:, None, :]
+        deviated = (offset * offset).sum(axis=2) > self._eps2
+        deviated &= self._columns < (lens - 1)[:, None]
+        flush = deviated.any(axis=1)
+        flush |= lens > self.window
+        if not flush.any():
+            return
+        for slot in np.flatnonzero(flush):
+            n = lens[slot]
+            previous = pending[slot, n - 2]
+            self.kept[self._coarse[slot]].append((float(previous[0]), float(previous[1])), t=float(self.count - 1))
+            self._anchors[slot] = previous
+            pending[slot, 0] = pending[slot, n - 1]
+            lens[slot] = 1
+
+    # 허용 오차가 0보다 큰 수준만 기다리는 점을 둔다 (0이면 모든 점을 남긴다)
+    def _index_levels(self):
+        self._fine = [level for level, eps in enumerate(self.levels) if eps <= 0]
+        self._coarse = [level for level, eps in enumerate(self.levels) if eps > 0]
+        self._slots = np.arange(len(self._coarse))
+        self._columns = np.arange(self.window + 1)[None, :]
+        self._eps2 = np.array([[self.levels[level] ** 2] for level in self._coarse]).reshape(-1, 1)
+
+    def append(self, x, z):
+        with self._lock:
+            self.rows += 1
+            if x is None or z is None or x != x or z != z:
+                return
+            self._append(float(x), float(z))
+
+    def _extend(self, rows):
+        for row in rows:
+            self.rows += 1
+            x, z = row[0], row[1]
+            if x is not None and z is not None and x == x and z == z:
+                self._append(float(x), float(z))
+
+    def extend(self, rows):
+        with self._lock:
+            self._extend(rows)
+
+    # 같은 행을 받는 버퍼에서 아직 받지 않은 행을 가져와 이어 만든다.
+    # 링이 이미 덮어쓴 행은 건너뛴다 (그 구간은 궤적이 직선으로 이어진다).
+    def catch_up(self, buffer):
+        seq, _, rows = buffer.since(self.rows)
+        with self._lock:
+            start = seq - len(rows)
+            self.rows = max(self.rows, start)
+            self._extend(rows[self.rows - start:])
+
+    # 같은 행을 받는 버퍼의 since() 결과 (seq, 값)에서 아직 받지 않은 행만 넣는다. 빠진 행이 있으면 False
+    def merge(self, seq, rows):
+        with self._lock:
+            start = seq - len(rows)
+            if start > self.rows:
+                return False
+            self._extend(rows[self.rows - start:])
+            return True
+
+    # 수준의 남긴 점 + 아직 남기지 않은 최신 점 (선이 현재 위치까지 이어지도록)
+    def _points(self, level):
+        _, kept = self.kept[level].window()
+        if level in self._coarse:
+            slot = self._coarse.index(level)
+            n = self._pending_len[slot]
+            if n:
+                kept = np.vstack((kept, self._pending[slot, n - 1:n]))
+        return kept[:, 0], kept[:, 1]
+
+    # 전체 궤적을 다 담고 있는(용량을 넘지 않은) 수준 중 보이는 점이 max_points 이하인 가장 세밀한 것.
+    # 모두 넘쳤으면 가장 거친 수준.
+    def select(self, viewport, max_points):
+        with self._lock:
+            if self.count == 0:
+                return np.zeros(0), np.zeros(0)
+            candidates = [level for level in range(len(self.levels)) if self.kept[level].seq <= self.capacity]
+            xs = zs = None
+            for level in candidates or [len(self.levels) - 1]:
+                xs, zs = clip_to_viewport(*self._points(level), viewport)
+                if len(xs) <= max_points:
+                    return xs, zs
+            return _stride(xs, zs, max_points)
+
+    def level_sizes(self):
+        return [len(kept) for kept in self.kept]
+
+    # 대시보드 프로세스로 보낼 때 (제어 스레드가 쓰는 중일 수 있어 락 안에서 복사)
+    def __getstate__(self):
+        with self._lock:
+            return {"levels": self.levels, "capacity": self.capacity, "window": self.window,
+                    "kept": [copy.copy(kept) for kept in self.kept], "pending": self._pending.copy(),
+                    "pending_len": self._pending_len.copy(), "anchors": self._anchors.copy(),
+                    "count": self.count, "rows": self.rows}
+
+    def __setstate__(self, state):
+        self.levels = state["levels"]
+        self.capacity = state["capacity"]
+        self.window = state["window"]
+        self.kept = state["kept"]
+        self._index_levels()
+        self._pending = state["pending"]
+        self._pending_len = state["pending_len"]
+        self._anchors = state["anchors"]
+        self.count = state["count"]
+        self.rows = state["rows"]
+        self._lock = threading.Lock()
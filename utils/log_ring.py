@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+# 고정 크기 이진 링 파일 로그 (가장 오래된 레코드부터 덮어쓴다)
+# 메시지는 포맷하지 않고 템플릿과 인자를 그대로 저장해 읽을 때 포맷한다.
+#
+# 사용법: python -m utils.log_ring data/logs/control.ring [--tail 50]
+import argparse
+import json
+import logging
+import mmap
+import os
+import struct
+import time
+
+RING_MAGIC = b"RLOG"
+RING_VERSION = 1
+# magic, version, capacity, head, tail, count, next_seq
+HEADER = struct.Struct("<4sHQQQQQ")
+HEADER_SIZE = 64
+# length, seq, created, levelno, lineno, suppressed, name_len, msg_len, args_len
+RECORD = struct.Struct("<IQdBIIHII")
+WRAP_MARKER = 0
+
+def _encode_arg(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return repr(value)
+
+def encode_record(record, seq):
+    name = record.name.encode("utf-8")
+    msg = str(record.msg).encode("utf-8")
+    args = record.args if isinstance(record.args, (tuple, list)) else ((record.args,) if record.args else ())
+    payload = json.dumps(list(args), default=_encode_arg, separators=(",", ":")).encode("utf-8")
+    length = RECORD.size + len(name) + len(msg) + len(payload)
+    head = RECORD.pack(length, seq, record.created, record.levelno, record.lineno,
+                       getattr(record, "suppressed", 0), len(name), len(msg), len(payload))
+    return head + name + msg + payload
+
+def decode_record(buf, offset):
+    length, seq, created, levelno, lineno, suppressed, name_len, msg_len, args_len = RECORD.unpack_from(buf, offset)
+    pos = offset + RECORD.size
+    name = bytes(buf[pos:pos + name_len]).decode("utf-8")
+    pos += name_len
+    msg = bytes(buf[pos:pos + msg_len]).decode("utf-8")
+    pos += msg_len
+    args = json.loads(bytes(buf[pos:pos + args_len]).decode("utf-8"))
+    return {
+        "seq": seq, "created": created, "level": logging.getLevelName(levelno), "name": name,
+        "lineno": lineno, "suppressed": suppressed, "msg": msg, "args": args
+    }
+
+def format_record(entry):
+    try:
+        message = entry["msg"] % tuple(entry["args"]) if entry["args"] else entry["msg"]
+    except (TypeError, ValueError):
+        message = f"{entry['msg']} {entry['args']}"
+    stamp = time.strftime("%H:%M:%S", time.localtime(entry["created"])) + f".{int(entry['created'] % 1 * 1000):03d}"
+    suffix = f" (+{entry['suppressed']} suppressed)" if entry["suppressed"] else ""
+    return f"{stamp} {entry['level']}:{entry['name']}:{entry['lineno']}: {message}{suffix}"
+
+class BinaryRingHandler(logging.Handler):
+    def __init__(self, path, capacity):
+        super().__init__()
+        self.path = path
+        self.capacity = capacity
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        fresh = not os.path.exists(path) or os.path.getsize(path) != HEADER_SIZE + capacity
+        self._file = open(path, "w+b" if fresh else "r+b")
+        if fresh:
+            self._file.truncate(HEADER_SIZE + capacity)
+        self._map = mmap.mmap(self._file.fileno(), HEADER_SIZE + capacity)
+        magic, version, cap, head, tail, count, next_seq = HEADER.unpack_from(self._map, 0)
+        if fresh or magic != RING_MAGIC or version != RING_VERSION or cap != capacity:
+            head = tail = count = next_seq = 0
+        self.head, self.tail, self.count, self.next_seq = head, tail, count, next_seq
+        self._write_header()
+
+    def _write_header(self):
+        HEADER.pack_into(self._map, 0, RING_MAGIC, RING_VERSION, self.capacity,
+                         self.head, self.tail, self.count, self.next_seq)
+
+    def _length_at(self, offset):
+        if offset + 4 > self.capacity:
+            return WRAP_MARKER
+        return struct.unpack_from("<I", self._map, HEADER_SIZE + offset)[0]
+
+    # 가장 오래된 레코드 하나를 버린다
+    def _evict(self):
+        length = self._length_at(self.tail)
+        if length == WRAP_MARKER:
+            self.tail = 0
+            return
+        self.tail += length
+        self.count -= 1
+        if self.count == 0:
+            self.tail = self.head
+
+    def _reserve(self, length):
+        if self.head + length > self.capacity:
+            # 끝부분에 남은 레코드를 비우고 처음으로 돌아간다
+            while self.count and self.tail >= self.head:
+                self._evict()
+            if self.head + 4 <= self.capacity:
+                struct.pack_into("<I", self._map, HEADER_SIZE + self.head, WRAP_MARKER)
+            self.head = 0
+            if self.count == 0:
+                self.tail = 0
+        while self.count and self.head <= self.tail < self.head + length:
+            self._evict()
+
+    def emit(self, record):
+        try:
+            data = encode_record(record, self.next_seq)
+            if len(data) > self.capacity // 4:
+                return
+            self._reserve(len(data))
+            if self.count == 0:
+                self.tail = self.head
+            self._map[HEADER_SIZE + self.head:HEADER_SIZE + self.head + len(data)] = data
+            self.head += len(data)
+            self.count += 1
+            self.next_seq += 1
+            self._write_header()
+        except Exception:
+            self.handleError(record)
+
+    def close(self):
+        self.acquire()
+        try:
+            if self._map is not None:
+                self._map.flush()
+                self._map.close()
+                self._file.close()
+                self._map = None
+        finally:
+            self.release()
+        super().close()
+
+# 오래된 순서로 레코드를 돌려준다
+def read_ring(path):
+    with open(path, "rb") as f:
+        buf = f.read()
+    magic, version, capacity, head, tail, count, next_seq = HEADER.unpack_from(buf, 0)
+    if magic != RING_MAGIC or version != RING_VERSION:
+        raise ValueError(f"{path} is not a log ring file")
+    data = memoryview(buf)[HEADER_SIZE:]
+    offset = tail
+    entries = []
+    while len(entries) < count:
+        length = struct.unpack_from("<I", data, offset)[0] if offset + 4 <= capacity else WRAP_MARKER
+        if length == WRAP_MARKER:
+            offset = 0
+            continue
+        entries.append(decode_record(data, offset))
+        offset += length
+    return entries
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("path")
+    parser.add_argument("--tail", type=int, default=0, help="마지막 N개만 출력")
+    parser.add_argument("--json", action="store_true", help="레코드를 JSON 한 줄씩 출력")
+    args = parser.parse_args()
+    entries = read_ring(args.path)
+    for entry in entries[-args.tail:] if args.tail else entries:
+        print(json.dumps(entry, ensure_ascii=False) if args.json else format_record(entry))
+
+if __name__ == "__main__":
+    main()
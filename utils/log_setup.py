@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+# 제어 경로용 비동기 로깅 설정
+# 호출 스레드에서는 호출 위치별 속도 제한 검사 후 레코드를 큐에 넣기만 하고,
+# 메시지 포맷과 콘솔/링 파일 기록은 QueueListener 스레드가 한다.
+import atexit
+import logging
+import logging.handlers
+import queue
+import threading
+from utils.config import LOGGING_CONFIG
+from utils.log_ring import BinaryRingHandler
+
+# 호출 위치(파일, 줄)마다 토큰 버킷으로 초당 레코드 수를 제한한다.
+# 제한 중에는 sample_every번째 레코드만 통과시키고, 버려진 개수는 다음 통과 레코드의 suppressed에 붙인다.
+# WARNING 이상은 제한하지 않는다.
+class RateLimitFilter(logging.Filter):
+    def __init__(self, rate=LOGGING_CONFIG['rate_per_site'], burst=LOGGING_CONFIG['burst'],
+                 sample_every=LOGGING_CONFIG['sample_every']):
+        super().__init__()
+        self.rate = rate
+        self.burst = burst
+        self.sample_every = sample_every
+        self._sites = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING or self.rate <= 0:
+            return True
+        key = (record.pathname, record.lineno)
+        now = record.created
+        with self._lock:
+            site = self._sites.get(key)
+            if site is None:
+                site = self._sites[key] = [float(self.burst), now, 0]
+            tokens, last, suppressed = site
+            tokens = min(float(self.burst), tokens + (now - last) * self.rate)
+            if tokens >= 1.0 or (self.sample_every and (suppressed + 1) % self.sample_every == 0):
+                site[0], site[1], site[2] = max(0.0, tokens - 1.0), now, 0
+                record.suppressed = suppressed
+                return True
+            site[0], site[1], site[2] = tokens, now, suppressed + 1
+            return False
+
+# 기본 QueueHandler.prepare()는 호출 스레드에서 메시지를 포맷하므로, 같은 프로세스 안에서는 레코드를 그대로 넘긴다.
+# 큐가 가득 차면 기다리지 않고 버린 뒤 개수만 센다.
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+_listener = None
+_setup_lock = threading.Lock()
+
+def setup_logging(level=LOGGING_CONFIG['level'], ring_path=LOGGING_CONFIG['ring_path'],
+                  ring_bytes=LOGGING_CONFIG['ring_bytes'], console=LOGGING_CONFIG['console']):
+    global _listener
+    with _setup_lock:
+        if _listener is not None:
+            return _listener
+        handlers = []
+        if console:
+            stream = logging.StreamHandler()
+            stream.setFormatter(logging.Formatter(LOGGING_CONFIG['console_format']))
+            handlers.append(stream)
+        if ring_path:
+            handlers.append(BinaryRingHandler(ring_path, ring_bytes))
+        log_queue = queue.Queue(maxsize=LOGGING_CONFIG['queue_size'])
+        queue_handler = DeferredQueueHandler(log_queue)
+        queue_handler.addFilter(RateLimitFilter())
+
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(queue_handler)
+        root.setLevel(level)
+
+        _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown_logging)
+        return _listener
+
+def shutdown_logging():
+    global _listener
+    with _setup_lock:
+        if _listener is None:
+            return
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+import hashlib
+import json
+import logging
+import os
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 컴파일된 지도 배열의 열 구성 (행 = 지도 점)
+MAP_COLUMNS = {
+    "x": 0,
+    "z": 1,
+    "y": 2,
+    "s": 3,            # 누적 경로 거리 (m)
+    "tx": 4,           # 단위 접선 벡터 x
+    "tz": 5,           # 단위 접선 벡터 z
+    "heading": 6,      # 진행 방향 (deg, +z가 0, +x 방향이 +90)
+    "curvature": 7     # 곡률 (1/m, 오른쪽으로 꺾이면 양수)
+}
+MAP_FORMAT_VERSION = 1
+
+def _checksum(path):
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _artifact_paths(csv_path):
+    root, _ = os.path.splitext(csv_path)
+    return root + ".npy", root + ".meta.json"
+
+def build_map_geometry(points, distance=None):
+    points = np.asarray(points, dtype=np.float64)
+    data = np.zeros((len(points), len(MAP_COLUMNS)), dtype=np.float64)
+    data[:, :3] = points[:, :3]
+    xz = points[:, :2]
+    if distance is None:
+        distance = np.concatenate(([0.0], np.linalg.norm(np.diff(xz, axis=0), axis=1)))
+    s = np.cumsum(distance)
+    data[:, MAP_COLUMNS['s']] = s
+    if len(points) < 2:
+        return data
+
+    tangent = np.gradient(xz, axis=0)
+    norm = np.hypot(tangent[:, 0], tangent[:, 1])
+    norm[norm == 0] = 1.0
+    tangent /= norm[:, None]
+    data[:, MAP_COLUMNS['tx']] = tangent[:, 0]
+    data[:, MAP_COLUMNS['tz']] = tangent[:, 1]
+
+    theta = np.unwrap(np.arctan2(tangent[:, 0], tangent[:, 1]))
+    data[:, MAP_COLUMNS['heading']] = np.degrees(np.arctan2(tangent[:, 0], tangent[:, 1]))
+    ds = np.gradient(s)
+    dtheta = np.gradient(theta)
+    data[:, MAP_COLUMNS['curvature']] = np.divide(dtheta, ds, out=np.zeros_like(ds), where=ds > 1e-9)
+    return data
+
+def compile_map(csv_path, npy_path=None, meta_path=None):
+    default_npy, default_meta = _artifact_paths(csv_path)
+    npy_path = npy_path or default_npy
+    meta_path = meta_path or default_meta
+    table = np.genfromtxt(csv_path, delimiter=",", names=True, dtype=np.float64)
+    table = np.atleast_1d(table)
+    points = np.column_stack((table['x'], table['z'], table['y']))
+    distance = table['distance'] if 'distance' in table.dtype.names else None
+    data = build_map_geometry(points, distance)
+
+    # 쓰는 도중에 다른 프로세스가 읽지 않도록 임시 파일에 쓰고 교체한다
+    tmp_path = npy_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        np.save(f, data)
+    os.replace(tmp_path, npy_path)
+    stat = os.stat(csv_path)
+    meta = {
+        "version": MAP_FORMAT_VERSION,
+        "source": os.path.basename(csv_path),
+        "sha1": _checksum(csv_path),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "rows": len(data),
+        "columns": MAP_COLUMNS
+    }
+    with open(meta_path, "w") as f:
+        json.dump(meta, f, indent=2)
+    logger.info("Compiled map %s -> %s (%d points)", csv_path, npy_path, len(data))
+    return npy_path
+
+def _is_fresh(csv_path, npy_path, meta_path):
+    if not (os.path.exists(npy_path) and os.path.exists(meta_path)):
+        return False
+    try:
+        with open(meta_path) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return False
+    if meta.get("version") != MAP_FORMAT_VERSION:
+        return False
+    stat = os.stat(csv_path)
+    # 크기와 수정 시각이 같으면 해시 계산을 생략한다
+    if meta.get("size") == stat.st_size and meta.get("mtime_ns") == stat.st_mtime_ns:
+        return True
+    return meta.get("sha1") == _checksum(csv_path)
+
+# CSV가 바뀌었을 때만 다시 컴파일하고, 결과는 memmap으로 읽어 모든 소비자가 같은 배열을 공유한다
+def load_map(csv_path):
+    npy_path, meta_path = _artifact_paths(csv_path)
+    if not _is_fresh(csv_path, npy_path, meta_path):
+        compile_map(csv_path, npy_path, meta_path)
+    return np.load(npy_path, mmap_mode="r")
+
+# 지도 관련 상태 키 (차량이 여러 대여도 같은 배열을 읽기 전용으로 공유)
+MAP_STATE_KEYS = ("map_data", "map_points", "map_distance")
+
+def publish_map(shared, map_data):
+    with shared.section('planning') as state:
+        state['map_data'] = map_data
+        state['map_points'] = map_data[:, :3]
+        state['map_distance'] = map_data[:, MAP_COLUMNS['s']]
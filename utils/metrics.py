@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+import threading
+from utils.histogram import Histogram
+
+# 프로세스 전역 지표 저장소 + Prometheus 텍스트 형식 출력.
+# 히스토그램은 밀리초로 관측하고 출력할 때 초 단위로 바꾼다.
+# 다른 모듈이 이미 갖고 있는 통계(스케줄러, 락 등)는 수집 함수(collector)로 긁을 때만 읽는다.
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._help = {}
+        self._collectors = []
+
+    def histogram(self, name, help_text="", **labels):
+        key = (name, tuple(sorted(labels.items())))
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(key, Histogram())
+                self._help.setdefault(name, help_text)
+        return histogram
+
+    def observe(self, name, value_ms, help_text="", **labels):
+        self.histogram(name, help_text, **labels).observe(value_ms)
+
+    # collector()는 ("histogram", 이름, 설명, 라벨, Histogram.snapshot()) 또는
+    # ("gauge"|"counter", 이름, 설명, 라벨, 값) 튜플들을 돌려준다
+    def register_collector(self, collector):
+        with self._lock:
+            if collector not in self._collectors:
+                self._collectors.append(collector)
+
+    def collect(self):
+        with self._lock:
+            histograms = list(self._histograms.items())
+            collectors = list(self._collectors)
+        for (name, labels), histogram in histograms:
+            yield "histogram", name, self._help.get(name, ""), dict(labels), histogram.snapshot()
+        for collector in collectors:
+            yield from collector()
+
+    def render(self):
+        families = {}
+        for kind, name, help_text, labels, value in self.collect():
+            family = families.setdefault(name, (kind, help_text, []))
+            family[2].append((labels, value))
+        lines = []
+        for name, (kind, help_text, samples) in families.items():
+            if help_text:
+                lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                if kind == "histogram":
+                    lines.extend(_render_histogram(name, labels, value))
+                else:
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+def _format_value(value):
+    if value == float('inf'):
+        return "+Inf"
+    return repr(float(value))
+
+def _render_histogram(name, labels, snapshot):
+    lines = []
+    cumulative = 0
+    for bound, count in zip(snapshot["buckets"], snapshot["counts"]):
+        cumulative += count
+        lines.append(f"{name}_bucket{_format_labels(dict(labels, le=_format_value(bound / 1000.0)))} {cumulative}")
+    lines.append(f"{name}_bucket{_format_labels(dict(labels, le='+Inf'))} {snapshot['count']}")
+    lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(snapshot['sum'] / 1000.0)}")
+    lines.append(f"{name}_count{_format_labels(labels)} {snapshot['count']}")
+    return lines
+
+METRICS = MetricsRegistry()
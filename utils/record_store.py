@@ -0,0 +1,351 @@
+# -*- coding: utf-8 -*-
+# 열(column) 단위 이진 레코드 저장소 (추가 전용 세그먼트 파일 + 인덱스 푸터)
+# 세그먼트 = 헤더(스키마 JSON) + 블록들 + (닫을 때) 인덱스 푸터와 트레일러.
+# 블록 = 블록 헤더(행 수, 첫 seq, 시각 범위) + 열마다 연속 배열 (8바이트 정렬).
+# 읽기는 파일을 memmap으로 열어 시간 범위에 걸치는 블록의 열 배열 뷰만 잘라낸다 (파일 전체를 읽지 않는다).
+# 첫 열은 시각(float64)이며 단조 증가로 맞춰 기록한다. 닫히지 않은 세그먼트(비정상 종료)는 블록을 훑어 복구한다.
+#
+# 사용법: python -m utils.record_store data/logs/rddf [--start T] [--end T] [--csv]
+import argparse
+import csv
+import glob
+import json
+import os
+import struct
+import sys
+import threading
+import time
+import numpy as np
+
+SEGMENT_MAGIC = b"RSEG"
+SEGMENT_VERSION = 1
+# magic, version, schema_len
+SEGMENT_HEADER = struct.Struct("<4sHxxI")
+BLOCK_MAGIC = b"RBLK"
+# magic, rows, first_seq, t_min, t_max
+BLOCK_HEADER = struct.Struct("<4sIQdd")
+INDEX_MAGIC = b"RIDX"
+INDEX_DTYPE = np.dtype([("offset", "<u8"), ("rows", "<u8"), ("first_seq", "<u8"), ("t_min", "<f8"), ("t_max", "<f8")])
+# magic, blocks, index_offset, rows
+TRAILER = struct.Struct("<4sIQQ")
+ALIGN = 8
+SEGMENT_SUFFIX = ".seg"
+
+def _align(size):
+    return (size + ALIGN - 1) // ALIGN * ALIGN
+
+def _block_size(columns, rows):
+    return BLOCK_HEADER.size + sum(_align(rows * dtype.itemsize) for _, dtype in columns)
+
+def _normalize_columns(columns):
+    columns = [(str(name), np.dtype(dtype).newbyteorder("<")) for name, dtype in columns]
+    if not columns or columns[0][1] != np.dtype("<f8"):
+        raise ValueError("the first column must be a float64 timestamp")
+    return columns
+
+def segment_paths(directory, prefix="segment"):
+    return sorted(glob.glob(os.path.join(directory, f"{prefix}_*{SEGMENT_SUFFIX}")))
+
+# 세그먼트 하나에 블록을 이어 쓴다. seal()이 인덱스 푸터를 붙이고 닫는다.
+class SegmentWriter:
+    def __init__(self, path, columns, first_seq=0):
+        self.path = path
+        self.columns = _normalize_columns(columns)
+        self.first_seq = first_seq
+        self.rows = 0
+        self.index = []
+        self.opened_at = time.monotonic()
+        schema = json.dumps({"columns": [[name, dtype.str] for name, dtype in self.columns],
+                             "first_seq": first_seq}).encode("utf-8")
+        header = SEGMENT_HEADER.pack(SEGMENT_MAGIC, SEGMENT_VERSION, len(schema)) + schema
+        self._file = open(path, "xb")
+        self._file.write(header + b"\0" * (_align(len(header)) - len(header)))
+        self._file.flush()
+
+    @property
+    def size(self):
+        return self._file.tell()
+
+    # arrays: 열 순서대로 길이가 같은 배열들
+    def write_block(self, arrays, first_seq):
+        rows = len(arrays[0])
+        if rows == 0:
+            return
+        t = np.asarray(arrays[0], dtype=np.float64)
+        parts = [BLOCK_HEADER.pack(BLOCK_MAGIC, rows, first_seq, float(t[0]), float(t[-1]))]
+        for (_, dtype), values in zip(self.columns, arrays):
+            data = np.ascontiguousarray(values, dtype=dtype).tobytes()
+            parts.append(data + b"\0" * (_align(len(data)) - len(data)))
+        offset = self._file.tell()
+        # 블록은 한 번에 써서 읽는 쪽이 블록 헤더와 크기로 끝까지 쓰였는지 판단할 수 있게 한다
+        self._file.write(b"".join(parts))
+        self._file.flush()
+        self.index.append((offset, rows, first_seq, float(t[0]), float(t[-1])))
+        self.rows += rows
+
+    def sync(self):
+        os.fsync(self._file.fileno())
+
+    def seal(self):
+        index = np.array(self.index, dtype=INDEX_DTYPE)
+        offset = self._file.tell()
+        self._file.write(index.tobytes() + TRAILER.pack(INDEX_MAGIC, len(index), offset, self.rows))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+
+# 세그먼트 읽기 (memmap). 닫히지 않은 세그먼트는 온전한 블록까지만 본다.
+class Segment:
+    def __init__(self, path):
+        self.path = path
+        size = os.path.getsize(path)
+        if size < SEGMENT_HEADER.size:
+            raise ValueError(f"{path} is not a record segment")
+        self._map = np.memmap(path, dtype=np.uint8, mode="r")
+        magic, version, schema_len = SEGMENT_HEADER.unpack_from(self._map, 0)
+        if magic != SEGMENT_MAGIC or version != SEGMENT_VERSION:
+            raise ValueError(f"{path} is not a record segment")
+        schema = json.loads(bytes(self._map[SEGMENT_HEADER.size:SEGMENT_HEADER.size + schema_len]).decode("utf-8"))
+        self.columns = _normalize_columns(schema["columns"])
+        self.first_seq = schema["first_seq"]
+        self.data_offset = _align(SEGMENT_HEADER.size + schema_len)
+        self.index, self.sealed, self.end_offset = self._read_index(size)
+
+    def _read_index(self, size):
+        if size >= self.data_offset + TRAILER.size:
+            magic, count, index_offset, _ = TRAILER.unpack_from(self._map, size - TRAILER.size)
+            if magic == INDEX_MAGIC and index_offset + count * INDEX_DTYPE.itemsize == size - TRAILER.size:
+                index = np.frombuffer(self._map, INDEX_DTYPE, count, index_offset)
+                return index, True, index_offset
+        return self._scan(size)
+
+    # 트레일러가 없으면 블록 헤더를 따라가며 온전한 블록만 모은다
+    def _scan(self, size):
+        entries = []
+        offset = self.data_offset
+        while offset + BLOCK_HEADER.size <= size:
+            magic, rows, first_seq, t_min, t_max = BLOCK_HEADER.unpack_from(self._map, offset)
+            end = offset + _block_size(self.columns, rows)
+            if magic != BLOCK_MAGIC or rows == 0 or end > size:
+                break
+            entries.append((offset, rows, first_seq, t_min, t_max))
+            offset = end
+        return np.array(entries, dtype=INDEX_DTYPE), False, offset
+
+    @property
+    def rows(self):
+        return int(self.index["rows"].sum())
+
+    @property
+    def time_range(self):
+        if not len(self.index):
+            return None
+        return float(self.index["t_min"][0]), float(self.index["t_max"][-1])
+
+    def column_names(self):
+        return [name for name, _ in self.columns]
+
+    # 블록 b의 i번째 열 뷰 (복사 없음)
+    def _column(self, block, i):
+        rows = int(self.index["rows"][block])
+        offset = int(self.index["offset"][block]) + BLOCK_HEADER.size
+        for _, dtype in self.columns[:i]:
+            offset += _align(rows * dtype.itemsize)
+        dtype = self.columns[i][1]
+        return self._map[offset:offset + rows * dtype.itemsize].view(dtype)
+
+    # t0 <= 시각 < t1 인 행을 블록 단위 뷰 dict로
+    def iter_range(self, t0=-np.inf, t1=np.inf, columns=None):
+        names = self.column_names()
+        wanted = [names.index(name) for name in (columns or names)]
+        index = self.index
+        blocks = np.nonzero((index["t_max"] >= t0) & (index["t_min"] < t1))[0]
+        for block in blocks:
+            t = self._column(block, 0)
+            lo = int(np.searchsorted(t, t0, side="left"))
+            hi = int(np.searchsorted(t, t1, side="left"))
+            if hi > lo:
+                yield {names[i]: self._column(block, i)[lo:hi] for i in wanted}
+
+    def close(self):
+        self._map = None
+
+# 비정상 종료로 남은 세그먼트에 온전한 블록까지의 인덱스를 붙여 닫는다
+def seal_segment(path):
+    segment = Segment(path)
+    if segment.sealed:
+        return False
+    index, end, rows = np.array(segment.index), segment.end_offset, segment.rows
+    segment.close()
+    with open(path, "r+b") as f:
+        f.truncate(end)
+        f.seek(end)
+        f.write(index.tobytes() + TRAILER.pack(INDEX_MAGIC, len(index), end, rows))
+        f.flush()
+        os.fsync(f.fileno())
+    return True
+
+def iter_range(directory, t0=-np.inf, t1=np.inf, columns=None, prefix="segment"):
+    for path in segment_paths(directory, prefix):
+        try:
+            segment = Segment(path)
+        except ValueError:
+            continue
+        span = segment.time_range
+        if span is None or span[1] < t0 or span[0] >= t1:
+            continue
+        yield from segment.iter_range(t0, t1, columns)
+
+# 시간 범위의 행을 열별 배열로 (범위 크기만큼만 복사한다)
+def read_range(directory, t0=-np.inf, t1=np.inf, columns=None, prefix="segment"):
+    chunks = list(iter_range(directory, t0, t1, columns, prefix))
+    if not chunks:
+        return {}
+    return {name: np.concatenate([chunk[name] for chunk in chunks]) for name in chunks[0]}
+
+# 디렉터리 하나를 세그먼트 묶음으로 쓰는 저장소. 행은 block_rows개씩 모아 한 블록으로 쓰고,
+# 세그먼트가 segment_bytes나 segment_seconds를 넘으면 닫고 새 세그먼트를 연다.
+# max_segments가 있으면 가장 오래된 세그먼트부터 지운다.
+class RecordStore:
+    def __init__(self, directory, columns, block_rows=1024, segment_bytes=64 * 1024 * 1024,
+                 segment_seconds=0, max_segments=0, prefix="segment"):
+        self.directory = directory
+        self.columns = _normalize_columns(columns)
+        self.block_rows = block_rows
+        self.segment_bytes = segment_bytes
+        self.segment_seconds = segment_seconds
+        self.max_segments = max_segments
+        self.prefix = prefix
+        self.rolls = 0
+        self.blocks = 0
+        self._pending = [[] for _ in self.columns]
+        # 빈 값(None)은 실수 열이면 NaN, 정수 열이면 0
+        self._missing = [np.nan if dtype.kind == "f" else 0 for _, dtype in self.columns]
+        self._writer = None
+        self._last_time = -np.inf
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self.seq = self._recover()
+
+    # 닫히지 않은 세그먼트를 닫고, 이어서 쓸 seq를 구한다 (세그먼트 파일은 항상 새로 연다).
+    # 온전한 블록이 하나도 없는 세그먼트는 지우고, 읽을 수 없는 파일은 .bad로 옮겨
+    # 다음 세그먼트가 같은 이름(segment_<seq>)으로 열릴 때 부딪히지 않게 한다.
+    def _recover(self):
+        seq = 0
+        for path in segment_paths(self.directory, self.prefix):
+            try:
+                seal_segment(path)
+                segment = Segment(path)
+            except ValueError:
+                if os.path.getsize(path) < SEGMENT_HEADER.size:
+                    os.remove(path)
+                else:
+                    os.replace(path, path + ".bad")
+                continue
+            if not len(segment.index):
+                segment.close()
+                os.remove(path)
+                continue
+            seq = max(seq, segment.first_seq + segment.rows)
+            if segment.time_range is not None:
+                self._last_time = max(self._last_time, segment.time_range[1])
+            segment.close()
+        return seq
+
+    def __len__(self):
+        return self.seq + len(self._pending[0])
+
+    # row: 열 순서대로 된 값 (첫 값이 시각, None이면 지금)
+    def append(self, row):
+        with self._lock:
+            self._append(row)
+            if len(self._pending[0]) >= self.block_rows:
+                self._flush()
+
+    def extend(self, rows):
+        with self._lock:
+            for row in rows:
+                self._append(row)
+                if len(self._pending[0]) >= self.block_rows:
+                    self._flush()
+
+    def _append(self, row):
+        t = time.time() if row[0] is None else float(row[0])
+        # 시각은 단조 증가로 맞춘다 (시간 범위 조회는 블록 안 정렬을 가정)
+        t = self._last_time = max(t, self._last_time)
+        self._pending[0].append(t)
+        for values, missing, value in zip(self._pending[1:], self._missing[1:], row[1:]):
+            values.append(missing if value is None else value)
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        rows = len(self._pending[0])
+        if rows == 0:
+            return
+        if self._writer is None:
+            path = os.path.join(self.directory, f"{self.prefix}_{self.seq:012d}{SEGMENT_SUFFIX}")
+            self._writer = SegmentWriter(path, self.columns, self.seq)
+        self._writer.write_block(self._pending, self.seq)
+        self._pending = [[] for _ in self.columns]
+        self.seq += rows
+        self.blocks += 1
+        too_big = self.segment_bytes and self._writer.size >= self.segment_bytes
+        too_old = self.segment_seconds and time.monotonic() - self._writer.opened_at >= self.segment_seconds
+        if too_big or too_old:
+            self._roll()
+
+    def _roll(self):
+        self._writer.seal()
+        self._writer = None
+        self.rolls += 1
+        if self.max_segments:
+            paths = segment_paths(self.directory, self.prefix)
+            for old in paths[:max(0, len(paths) - self.max_segments)]:
+                os.remove(old)
+
+    def sync(self):
+        with self._lock:
+            if self._writer is not None:
+                self._writer.sync()
+
+    def close(self):
+        with self._lock:
+            self._flush()
+            if self._writer is not None:
+                self._roll()
+
+    # 디스크에 쓴 블록만 읽는다 (모아 두고 아직 쓰지 않은 행은 flush() 뒤에 보인다)
+    def iter_range(self, t0=-np.inf, t1=np.inf, columns=None):
+        return iter_range(self.directory, t0, t1, columns, self.prefix)
+
+    def read_range(self, t0=-np.inf, t1=np.inf, columns=None):
+        return read_range(self.directory, t0, t1, columns, self.prefix)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("directory")
+    parser.add_argument("--prefix", default="segment")
+    parser.add_argument("--start", type=float, default=-np.inf, help="시작 시각 (epoch 초, 포함)")
+    parser.add_argument("--end", type=float, default=np.inf, help="끝 시각 (epoch 초, 제외)")
+    parser.add_argument("--csv", action="store_true", help="범위의 행을 CSV로 출력")
+    args = parser.parse_args()
+    if args.csv:
+        writer = csv.writer(sys.stdout, lineterminator="\n")
+        header = None
+        for chunk in iter_range(args.directory, args.start, args.end, prefix=args.prefix):
+            if header is None:
+                header = list(chunk)
+                writer.writerow(header)
+            writer.writerows(zip(*(chunk[name].tolist() for name in header)))
+        return
+    for path in segment_paths(args.directory, args.prefix):
+        segment = Segment(path)
+        span = segment.time_range or (float("nan"), float("nan"))
+        print(f"{os.path.basename(path)} {'sealed' if segment.sealed else 'open'} blocks={len(segment.index)} "
+              f"rows={segment.rows} t=[{span[0]:.3f}, {span[1]:.3f}]")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+# 프로세스 사이에 최신 상태 한 벌을 넘기는 공유 메모리 영역 (쓰는 쪽 하나, 읽는 쪽 여럿)
+# seqlock: 쓰는 쪽은 seq를 홀수로 올리고 본문을 쓴 뒤 다시 짝수로 올린다.
+# 읽는 쪽은 seq가 짝수이고 복사 전후에 같을 때만 그 복사본을 쓴다. 어느 쪽도 락을 잡지 않는다.
+import logging
+import struct
+import time
+from multiprocessing import shared_memory
+
+logger = logging.getLogger(__name__)
+
+SHM_MAGIC = b"SQLK"
+# magic, seq, length, 읽는 쪽 heartbeat (seq/length/heartbeat는 8바이트 정렬)
+HEADER = struct.Struct("<4s4xQQd")
+HEADER_SIZE = 64
+SEQ = struct.Struct("<Q")
+SEQ_OFFSET = 8
+LENGTH_OFFSET = 16
+HEARTBEAT = struct.Struct("<d")
+HEARTBEAT_OFFSET = 24
+
+class SeqlockRegion:
+    def __init__(self, name=None, size=None, create=False):
+        if create:
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=HEADER_SIZE + size)
+            HEADER.pack_into(self.shm.buf, 0, SHM_MAGIC, 0, 0, 0.0)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+            if bytes(self.shm.buf[:4]) != SHM_MAGIC:
+                self.shm.close()
+                raise ValueError(f"{name} is not a seqlock region")
+        self.owner = create
+        self.capacity = self.shm.size - HEADER_SIZE
+        self.writes = 0
+        self.retries = 0
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    # 마지막으로 쓴 seq (본문 복사 없이 바뀌었는지 확인용)
+    def seq(self):
+        return SEQ.unpack_from(self.shm.buf, SEQ_OFFSET)[0]
+
+    # 읽는 쪽이 살아 있다고 알린다 (time.monotonic은 프로세스 사이에 공통인 시스템 시계)
+    def touch(self):
+        HEARTBEAT.pack_into(self.shm.buf, HEARTBEAT_OFFSET, time.monotonic())
+
+    # 읽는 쪽이 마지막으로 touch()한 시각 (한 번도 안 했으면 0)
+    def heartbeat(self):
+        return HEARTBEAT.unpack_from(self.shm.buf, HEARTBEAT_OFFSET)[0]
+
+    # 본문 교체 (쓰는 쪽은 한 스레드만)
+    def write(self, payload):
+        size = len(payload)
+        if size > self.capacity:
+            raise ValueError(f"payload {size} bytes exceeds region capacity {self.capacity}")
+        buf = self.shm.buf
+        seq = self.seq()
+        SEQ.pack_into(buf, SEQ_OFFSET, seq + 1)
+        buf[HEADER_SIZE:HEADER_SIZE + size] = payload
+        SEQ.pack_into(buf, LENGTH_OFFSET, size)
+        SEQ.pack_into(buf, SEQ_OFFSET, seq + 2)
+        self.writes += 1
+        return seq + 2
+
+    # 반환: (seq, 본문 bytes). 아직 쓴 적이 없으면 (0, None).
+    # 쓰는 도중이면 잠깐 쉬고 다시 읽고, attempts번 모두 실패하면 None을 돌려준다.
+    def read(self, attempts=100, backoff=0.0005):
+        buf = self.shm.buf
+        for _ in range(attempts):
+            before = self.seq()
+            if before & 1:
+                self.retries += 1
+                time.sleep(backoff)
+                continue
+            if before == 0:
+                return 0, None
+            size = SEQ.unpack_from(buf, LENGTH_OFFSET)[0]
+            payload = bytes(buf[HEADER_SIZE:HEADER_SIZE + min(size, self.capacity)])
+            if self.seq() == before:
+                return before, payload
+            self.retries += 1
+        return None
+
+    def close(self):
+        self.shm.close()
+        if self.owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from types import MappingProxyType
+from utils.histogram import Histogram
+
+# 쓰기 구역 (도메인별로 락이 분리되어 서로를 기다리지 않는다)
+STATE_DOMAINS = ("telemetry", "control", "planning", "tuning")
+
+_MISSING = object()
+
+# section()을 연 호출 위치 ("파일:함수"). contextmanager 때문에 두 단계 위 프레임이 호출자다.
+def _call_site():
+    code = sys._getframe(3).f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+# 특정 버전의 상태. 최상위 키는 읽기 전용이며 값은 교체만 하고 제자리에서 수정하지 않는다.
+# 예외: 시계열 버퍼(TimeSeriesBuffer: vel_data, del_playerPos, rddf_data)와 궤적 LOD(TrajectoryLOD: rddf_lod)는
+# 모든 스냅샷이 같은 객체를 공유하고 telemetry 구역이 제자리에 쓴다. 이 객체들은 자체 락으로 보호되며,
+# 옛 스냅샷에서 꺼내도 최신 내용이 보이므로 버전 대신 seq(증분 커서)로 읽어야 한다.
+class Snapshot:
+    __slots__ = ("version", "data")
+
+    def __init__(self, version, data):
+        self.version = version
+        self.data = data
+
+    def __getitem__(self, key):
+        return self.data[key]
+
+    def __contains__(self, key):
+        return key in self.data
+
+    def get(self, key, default=None):
+        return self.data.get(key, default)
+
+# 쓰기 구역 안에서 사용하는 핸들. 변경 사항을 모았다가 구역을 나갈 때 쓴 키만 한 번에 발행한다.
+# 키마다 쓸 수 있는 구역이 하나뿐이므로 (store.owners) 다른 구역이 읽어 둔 옛 값으로 덮어쓸 수 없다.
+class SectionWriter:
+    def __init__(self, store, domain):
+        self.store = store
+        self.domain = domain
+        self.updates = {}
+
+    def _check_owner(self, key):
+        owner = self.store.owners.get(key, self.domain)
+        if owner != self.domain:
+            raise ValueError(f"state key {key!r} is owned by the {owner!r} section, not {self.domain!r}")
+
+    def __getitem__(self, key):
+        value = self.updates.get(key, _MISSING)
+        if value is _MISSING:
+            return self.store.snapshot()[key]
+        return value
+
+    def __setitem__(self, key, value):
+        self._check_owner(key)
+        self.updates[key] = value
+
+    def __contains__(self, key):
+        return key in self.updates or key in self.store.snapshot()
+
+    def get(self, key, default=None):
+        value = self.updates.get(key, _MISSING)
+        if value is _MISSING:
+            return self.store.snapshot().get(key, default)
+        return value
+
+    def update(self, values):
+        values = dict(values)
+        for key in values:
+            self._check_owner(key)
+        self.updates.update(values)
+
+# owners: {키: 구역}. 목록에 없는 키는 어느 구역에서나 쓸 수 있다.
+class StateStore:
+    def __init__(self, initial, domains=STATE_DOMAINS, instrument=True, owners=None):
+        self._snapshot = Snapshot(0, MappingProxyType(dict(initial)))
+        self.owners = dict(owners or {})
+        self._locks = {domain: threading.Lock() for domain in domains}
+        self._publish_lock = threading.Lock()
+        self._local = threading.local()
+        self.instrument = instrument
+        # (도메인, 호출 위치) -> (락 대기 시간, 락 보유 시간) 히스토그램 (ms)
+        self.lock_stats = {}
+
+    def _record_lock(self, domain, site, wait_ms, hold_ms):
+        stats = self.lock_stats.get((domain, site))
+        if stats is None:
+            stats = self.lock_stats.setdefault((domain, site), (Histogram(), Histogram()))
+        stats[0].observe(wait_ms)
+        stats[1].observe(hold_ms)
+
+    # 읽기: 락 없이 최신 스냅샷 참조를 가져온다
+    def snapshot(self):
+        return self._snapshot
+
+    @property
+    def version(self):
+        return self._snapshot.version
+
+    def __getitem__(self, key):
+        return self._snapshot[key]
+
+    def __contains__(self, key):
+        return key in self._snapshot
+
+    def get(self, key, default=None):
+        return self._snapshot.get(key, default)
+
+    # 쓰기: 이전 스냅샷을 복사한 새 스냅샷으로 교체 (복사 비용은 키 개수에 비례)
+    def publish(self, updates):
+        if not updates:
+            return self._snapshot
+        with self._publish_lock:
+            data = dict(self._snapshot.data)
+            data.update(updates)
+            self._snapshot = Snapshot(self._snapshot.version + 1, MappingProxyType(data))
+            return self._snapshot
+
+    def __setitem__(self, key, value):
+        self.publish({key: value})
+
+    @contextmanager
+    def section(self, domain):
+        active = getattr(self._local, "writers", None)
+        if active is None:
+            active = self._local.writers = {}
+        # 같은 스레드에서 같은 구역을 다시 열면 바깥 구역의 핸들을 그대로 쓴다
+        writer = active.get(domain)
+        if writer is not None:
+            yield writer
+            return
+        if not self.instrument:
+            with self._locks[domain]:
+                writer = active[domain] = SectionWriter(self, domain)
+                try:
+                    yield writer
+                finally:
+                    del active[domain]
+                self.publish(writer.updates)
+            return
+        site = _call_site()
+        requested = time.perf_counter()
+        with self._locks[domain]:
+            acquired = time.perf_counter()
+            writer = active[domain] = SectionWriter(self, domain)
+            try:
+                yield writer
+            finally:
+                del active[domain]
+            self.publish(writer.updates)
+            released = time.perf_counter()
+        self._record_lock(domain, site, (acquired - requested) * 1000.0, (released - acquired) * 1000.0)
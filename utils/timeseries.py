@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+import threading
+import time
+import numpy as np
+
+# 고정 용량 시계열 링 버퍼 (길이 capacity 배열 하나).
+# 읽는 쪽(대시보드, 브리지 스레드)은 /info 쓰기와 동시에 돌므로 조회는 락 안에서 복사본을 돌려준다.
+# 복사는 어차피 하므로 끝을 넘어가는 구간은 앞뒤 두 조각을 이어 붙여 복사한다 (쓰기는 한 번만).
+class TimeSeriesBuffer:
+    def __init__(self, capacity, columns, dtype=np.float64, clock=time.monotonic):
+        self.capacity = int(capacity)
+        self.columns = tuple(columns)
+        self.index = {name: i for i, name in enumerate(self.columns)}
+        self.clock = clock
+        self._data = np.full((self.capacity, len(self.columns)), np.nan, dtype=dtype)
+        self._time = np.zeros(self.capacity, dtype=np.float64)
+        self._seq = 0
+        self._last_time = -np.inf
+        self._lock = threading.Lock()
+
+    # 지금까지 들어온 전체 샘플 수 (증분 조회 커서로 쓴다)
+    @property
+    def seq(self):
+        return self._seq
+
+    def __len__(self):
+        return min(self._seq, self.capacity)
+
+    def append(self, row, t=None):
+        with self._lock:
+            t = self.clock() if t is None else t
+            # 시각은 단조 증가로 맞춘다 (시간 구간 조회는 정렬을 가정)
+            t = self._last_time = max(t, self._last_time)
+            i = self._seq % self.capacity
+            self._data[i] = row
+            self._time[i] = t
+            self._seq += 1
+
+    def extend(self, rows, times=None):
+        with self._lock:
+            self._extend(rows, times)
+
+    def _extend(self, rows, times):
+        rows = np.asarray(rows, dtype=self._data.dtype).reshape(-1, len(self.columns))
+        n = len(rows)
+        if times is None:
+            times = np.full(n, self.clock())
+        times = np.maximum.accumulate(np.maximum(np.asarray(times, dtype=np.float64), self._last_time))
+        if n > self.capacity:
+            rows, times = rows[-self.capacity:], times[-self.capacity:]
+            self._seq += n - self.capacity
+            n = self.capacity
+        slots = (self._seq + np.arange(n)) % self.capacity
+        self._data[slots] = rows
+        self._time[slots] = times
+        if n:
+            self._last_time = float(times[-1])
+        self._seq += n
+
+    # 다른 사본의 since() 결과 (seq, 시각, 값)를 이어 붙인다. 이미 있는 샘플은 건너뛰고,
+    # 사이에 빠진 샘플이 있으면 False (링 전체를 덮는 결과면 빠진 것을 버리고 그대로 받는다)
+    def merge(self, seq, times, rows):
+        with self._lock:
+            start = seq - len(rows)
+            if start > self._seq:
+                if len(rows) < self.capacity:
+                    return False
+                self._seq = start
+            skip = self._seq - start
+            self._extend(rows[skip:], times[skip:])
+            return True
+
+    # seq까지의 최근 count개 (시각, 값) 복사본 (락 안에서 부른다)
+    def _copy(self, seq, count):
+        count = min(count, seq, self.capacity)
+        start = (seq - count) % self.capacity
+        end = start + count
+        if end <= self.capacity:
+            return self._time[start:end].copy(), self._data[start:end].copy()
+        end -= self.capacity
+        return (np.concatenate((self._time[start:], self._time[:end])),
+                np.concatenate((self._data[start:], self._data[:end])))
+
+    # 최근 count개 (없으면 전체)의 (시각, 값) 복사본
+    def window(self, count=None):
+        with self._lock:
+            return self._copy(self._seq, self.capacity if count is None else count)
+
+    # cursor 이후에 들어온 샘플 (링 용량을 넘게 밀렸으면 남아 있는 것만). 반환: (새 cursor, 시각, 값)
+    # cursor=0이면 seq와 전체 창을 한 번에 읽는다
+    def since(self, cursor):
+        with self._lock:
+            seq = self._seq
+            return (seq,) + self._copy(seq, max(0, seq - (cursor or 0)))
+
+    # t0 <= 시각 < t1 인 샘플
+    def time_range(self, t0=-np.inf, t1=np.inf):
+        times, data = self.window()
+        lo = int(np.searchsorted(times, t0, side='left'))
+        hi = int(np.searchsorted(times, t1, side='left'))
+        return times[lo:hi], data[lo:hi]
+
+    def column(self, name, count=None):
+        return self.window(count)[1][:, self.index[name]]
+
+    # 피클 (다른 프로세스로 넘길 때): 락과 시계는 빼고 남아 있는 창과 seq만 보낸다
+    def __getstate__(self):
+        seq, times, data = self.since(0)
+        return {"capacity": self.capacity, "columns": self.columns, "seq": seq, "times": times, "data": data}
+
+    def __setstate__(self, state):
+        self.__init__(state["capacity"], state["columns"], state["data"].dtype)
+        self._seq = state["seq"] - len(state["data"])
+        self.extend(state["data"], state["times"])
+
+    def clear(self):
+        with self._lock:
+            self._seq = 0
+            self._last_time = -np.inf